@@ -6,126 +6,122 @@
 """
 
 import argparse
-import subprocess
 import sys
-import shutil
-from pathlib import Path
-
-def run_script(script_name, *args):
-    """运行指定的生成脚本或模块"""
-    try:
-        if "." in script_name:
-            # 模块形式：scripts.home.generator
-            module_parts = script_name.split(".")
-            module_name = ".".join(module_parts[:-1])
-            func_name = module_parts[-1]
-
-            # 动态导入模块
-            module = __import__(module_name, fromlist=[func_name])
-            func = getattr(module, func_name)
-            # 调用生成函数
-            func(*args)
-        else:
-            # 传统脚本形式
-            script_path = Path(__file__).parent / "scripts" / f"{script_name}.py"
-            if not script_path.exists():
-                print(f"错误：脚本 {script_name}.py 不存在")
-                return False
-
-            cmd = [sys.executable, str(script_path)] + list(args)
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-
-        print(f"✅ {script_name} 生成完成")
-        return True
-    except Exception as e:
-        print(f"❌ {script_name} 生成失败：{e}")
-        return False
-
-def clean_html_dirs():
-    """清理HTML目录下的动态生成内容，确保与data目录完全同步"""
-    html_dir = Path(__file__).parent / "html"
-
-    # 需要清理的目录（对应各个模块）
-    dirs_to_clean = ["blog", "project", "docs", "contact", "resume"]
-
-    cleaned_count = 0
-    for dir_name in dirs_to_clean:
-        target_dir = html_dir / dir_name
-        if target_dir.exists():
-            shutil.rmtree(target_dir)
-            print(f"🗑️ 已清理: {target_dir}")
-            cleaned_count += 1
-
-    if cleaned_count > 0:
-        print(f"✅ 清理完成，共清理了 {cleaned_count} 个目录")
-    else:
-        print("ℹ️ 无需清理，所有目录都是干净的")
+import time
+
+# 只导入任务表；构建流程和各生成模块（Jinja2 等依赖）在执行对应命令时才导入
+from scripts.common.tasks import DEFAULT_WORKERS, VALID_TARGETS
+
+# 特殊命令（不是页面目标）
+COMMANDS = ["serve-build", "batch", "bench-startup", "nginx"]
 
 def main():
     parser = argparse.ArgumentParser(description="统一页面生成器")
     parser.add_argument(
         "targets",
         nargs="*",
-        help="要生成的页面（默认：all）"
+        help="要生成的页面（默认：all）；serve-build 启动常驻构建进程；batch [页面...] 批量构建 --sites 中的站点；bench-startup [页面...] 测量各目标的启动耗时；nginx 根据输出清单生成 nginx 配置"
     )
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
         help="显示详细输出"
     )
+    parser.add_argument(
+        "--fragment-cache",
+        action="store_true",
+        help="启用磁盘片段缓存（.cache/fragments），热重建时复用已渲染的片段"
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="调试构建：不压缩 HTML，保留模板缩进和注释"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="serve-build 监听地址（默认：127.0.0.1）"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="serve-build 监听端口（默认：8765）"
+    )
+    parser.add_argument(
+        "--sites",
+        default="sites.json",
+        help="batch 使用的站点列表文件（默认：sites.json）"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"batch 并发构建的站点数（默认：{DEFAULT_WORKERS}）"
+    )
+    parser.add_argument(
+        "--nginx-output",
+        default="nginx.generated.conf",
+        help="nginx 生成的配置文件路径（默认：nginx.generated.conf）"
+    )
 
     args = parser.parse_args()
 
-    # 定义生成任务映射
-    tasks = {
-        "home": "scripts.home.generator.generate_home_html",
-        "resume": "scripts.sections.resume.generator.generate_resume_page",
-        "blog": "scripts.sections.blog.generator.scan_and_generate_blogs_and_home",
-        "project": "scripts.sections.project.generator.scan_and_generate_projects_and_home",
-        "docs": "scripts.sections.docs.generator.generate_docs_page_and_home",
-        "stack": "scripts.sections.stack.generator.generate_stack_page_and_home",
-        "contact": "scripts.sections.contact.generator.generate_contact_page_and_home",
-        "error": "scripts.common.error_pages.generate_error_pages",
-    }
-
     # 处理默认值和验证
     targets = args.targets if args.targets else ["all"]
 
+    if targets == ["nginx"]:
+        from scripts.common.nginx_conf import generate_nginx_config
+        return 0 if generate_nginx_config(args.nginx_output) else 1
+
+    if targets[0] == "bench-startup":
+        from scripts.common.startup_bench import run_startup_bench
+        return run_startup_bench(targets[1:])
+
+    batch = targets[0] == "batch"
+    if batch:
+        targets = targets[1:] or ["all"]
+
     # 验证参数
-    valid_targets = ["home", "resume", "blog", "project", "docs", "stack", "contact", "error", "all"]
-    for target in targets:
-        if target not in valid_targets:
-            parser.error(f"无效选择: '{target}' (选择: {', '.join(valid_targets)})")
+    if targets != ["serve-build"]:
+        for target in targets:
+            if target not in VALID_TARGETS:
+                parser.error(f"无效选择: '{target}' (选择: {', '.join(VALID_TARGETS + COMMANDS)})")
+
+    from scripts.common.fragments import enable_persistent_fragments
+    from scripts.common.output import enable_minify
+    enable_persistent_fragments(args.fragment_cache)
+    enable_minify(not args.debug)
+
+    if targets == ["serve-build"]:
+        from scripts.common.daemon import serve_build
+        return serve_build(args.host, args.port, minified=not args.debug)
+
+    from scripts.common.build import (
+        build_sites, build_succeeded, load_sites, print_batch_report, print_build_report, run_build
+    )
+
+    if batch:
+        sites = load_sites(args.sites)
+        if not sites:
+            parser.error(f"无法读取站点列表: {args.sites}")
+        start = time.perf_counter()
+        results = build_sites(sites, targets, workers=args.workers)
+        print_batch_report(results, time.perf_counter() - start)
+        return 0 if all(build_succeeded(r) for r in results) else 1
 
     # 执行生成任务
-    success_count = 0
-    total_count = 0
-
-    if "all" in targets:
-        targets = list(tasks.keys())
-
-    # 在生成之前清理HTML目录（只清理会生成内容的模块）
-    modules_to_clean = ["blog", "project", "docs", "contact", "resume"]
-    if any(target in modules_to_clean for target in targets):
-        print("🧹 开始清理HTML目录...")
-        clean_html_dirs()
-        print()
-
-    for target in targets:
-        if target in tasks:
-            total_count += 1
-            # 直接运行对应的脚本或模块
-            if run_script(tasks[target]):
-                success_count += 1
-        else:
-            print(f"警告：未知目标 '{target}'")
-    
+    result = run_build(targets)
+
     # 输出结果统计
-    if total_count > 0:
-        print(f"\n📊 生成统计：{success_count}/{total_count} 成功")
-        if success_count == total_count:
+    if result['total'] > 0:
+        print_build_report(result, minified=not args.debug)
+        if build_succeeded(result):
             print("🎉 所有页面生成完成！")
             return 0
+        elif result['success'] == result['total']:
+            print("❌ 页面体积超出预算（page_budget_mode 为 fail）")
+            return 1
         else:
             print("⚠️ 部分页面生成失败")
             return 1
@@ -134,4 +130,4 @@ def main():
         return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
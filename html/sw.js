@@ -0,0 +1,125 @@
+// 由 python gen.py 根据输出文件生成，请勿手工修改
+// 整体修订号：预缓存的文件变化时随之变化，浏览器据此安装新版本
+const REVISION = "ebaf4f6ef139";
+const PRECACHE = "precache";
+const RUNTIME = "pages";
+const RUNTIME_MAX_ENTRIES = 50;
+const OFFLINE_FALLBACK = "home.html";
+
+// [相对站点根目录的路径, 内容修订号]
+const PRECACHE_ENTRIES = [["_assets/636fc87065006e16.png", "636fc8706500"], ["assets/css/21b8c6fdea67.css", "f2c0640200e0"], ["assets/css/70326afb0eee.css", "ebfb695904dd"], ["assets/css/fd746be76d0a.css", "4d5f504f1059"], ["assets/css/highlight.eec2722993.css", "f78c3620f4b2"], ["blog/index.html", "48d023901fed"], ["blog/\u6295\u8d44\u7ec4\u5408\u4f18\u5316/content.html", "4d825072a6be"], ["blog/\u6570\u5b57\u6e38\u6c11\u751f\u6d3b/content.html", "b8a3e3c584e2"], ["blog/\u6d4b\u8bd5\u7684\u535a\u5ba2/content.html", "4691695fc1c5"], ["docs/index.html", "d0291a07045c"], ["home.html", "359a491ff444"], ["project/index.html", "5d0f548deace"], ["project/\u533a\u5757\u94fe\u6295\u7968\u5e73\u53f0/content.html", "077f2e3efc6e"], ["project/\u6d4b\u8bd5\u7684\u6587\u6863/content.html", "a2107e596ca3"], ["project/\u6d4b\u8bd5\u7684\u6587\u68632/content.html", "95c1ce22d0f8"], ["resume/index.html", "a81b2393a2db"]];
+
+const SCOPE = self.registration.scope;
+const toUrl = (path) => new URL(path, SCOPE).href;
+const REVISIONS = new Map(PRECACHE_ENTRIES.map(([path, revision]) => [toUrl(path), revision]));
+
+// 缓存的响应带上修订号，安装新版本时只重新下载修订号变化的文件
+async function withRevision(response, revision) {
+    const headers = new Headers(response.headers);
+    headers.delete("Content-Encoding");
+    headers.delete("Content-Length");
+    headers.set("X-Precache-Revision", revision);
+    return new Response(await response.blob(), {
+        status: response.status,
+        statusText: response.statusText,
+        headers
+    });
+}
+
+self.addEventListener("install", (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        await Promise.all([...REVISIONS].map(async ([url, revision]) => {
+            const cached = await cache.match(url);
+            if (cached && cached.headers.get("X-Precache-Revision") === revision) {
+                return;
+            }
+            const response = await fetch(url, { cache: "no-cache" });
+            if (!response.ok) {
+                throw new Error(`预缓存失败 ${url}: ${response.status}`);
+            }
+            await cache.put(url, await withRevision(response, revision));
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener("activate", (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        for (const request of await cache.keys()) {
+            if (!REVISIONS.has(request.url)) {
+                await cache.delete(request);
+            }
+        }
+        for (const name of await caches.keys()) {
+            if (name !== PRECACHE && name !== RUNTIME) {
+                await caches.delete(name);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+async function trimRuntimeCache(cache) {
+    const keys = await cache.keys();
+    for (const request of keys.slice(0, Math.max(0, keys.length - RUNTIME_MAX_ENTRIES))) {
+        await cache.delete(request);
+    }
+}
+
+// 页面：先返回缓存，同时在后台向服务器重新验证并更新缓存
+async function staleWhileRevalidate(event, url) {
+    const cached = await caches.match(url);
+    const network = fetch(event.request).then(async (response) => {
+        if (response.ok && response.type === "basic" && !response.redirected) {
+            if (REVISIONS.has(url)) {
+                const cache = await caches.open(PRECACHE);
+                await cache.put(url, await withRevision(response.clone(), REVISIONS.get(url)));
+            } else {
+                const cache = await caches.open(RUNTIME);
+                await cache.put(url, response.clone());
+                await trimRuntimeCache(cache);
+            }
+        }
+        return response;
+    });
+
+    if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+    }
+    try {
+        return await network;
+    } catch (error) {
+        const fallback = event.request.mode === "navigate" ? await caches.match(toUrl(OFFLINE_FALLBACK)) : null;
+        return fallback || Response.error();
+    }
+}
+
+// 带内容哈希的资源：内容不会变化，直接使用缓存
+async function cacheFirst(event, url) {
+    return (await caches.match(url)) || fetch(event.request);
+}
+
+self.addEventListener("fetch", (event) => {
+    const request = event.request;
+    if (request.method !== "GET") {
+        return;
+    }
+    const url = new URL(request.url);
+    url.search = "";
+    url.hash = "";
+    if (url.origin !== self.location.origin || !url.href.startsWith(SCOPE)) {
+        return;
+    }
+    if (url.pathname.endsWith("/")) {
+        url.pathname += url.href === SCOPE ? "home.html" : "index.html";
+    }
+
+    if (request.mode === "navigate" || url.pathname.endsWith(".html")) {
+        event.respondWith(staleWhileRevalidate(event, url.href));
+    } else if (REVISIONS.has(url.href)) {
+        event.respondWith(cacheFirst(event, url.href));
+    }
+});
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资源发布
+从卡片封面、渲染后正文中的 <img>/<a>/<source> 引用以及各模块的配置文件中收集实际用到的文件，
+只把这些文件发布到输出目录；数据目录中未被引用的文件记录下来在构建结束时报告
+（模块 frame.json 中设置 "publish_unreferenced_assets": true 可继续全部复制）。
+
+发布的文件按内容哈希存入 html/_assets/，相同内容只存一份：文章正文中的地址改写为存储地址，
+需要固定地址的文件（文档下载、联系方式图片等）以硬链接指向存储中的文件
+"""
+
+import fnmatch
+import html
+import os
+import re
+import shutil
+from contextvars import ContextVar
+from pathlib import Path
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+from .images import get_image_hash
+from .site import html_path
+
+# 内容寻址存储目录（相对输出目录）
+ASSET_STORE_DIR = "_assets"
+
+# 文章目录中的源文件，不作为资源发布
+ARTICLE_SOURCE_FILES = {'content.md', 'card.json'}
+
+# 编辑器和系统遗留文件：既不发布也不报告
+IGNORED_PATTERNS = ('.*', '*~', '*.swp', '*.tmp', '*.bak', 'Thumbs.db', '__pycache__')
+
+# 生成器自己按内容哈希命名的文件（相对输出目录）：内容寻址存储 _assets/<哈希>.jpg、
+# 关键 CSS 拆出的 assets/css/<哈希>.css、高亮样式表 assets/css/highlight.<哈希>.css、首页延迟加载片段 fragments/home-<区域>.<哈希>.html。
+# 只认这几个位置，数据目录中碰巧以数字或十六进制结尾的文件名（如 report-2024010112.pdf）不算
+FINGERPRINT_PATTERN = re.compile(
+    r'^(?:_assets/[0-9a-f]{16}(?:\.[a-z0-9]+)?'
+    r'|assets/css/(?:highlight\.)?[0-9a-f]{10,64}\.css'
+    r'|fragments/home-[\w-]+\.[0-9a-f]{10,64}\.html)$'
+)
+
+REFERENCE_TAG_PATTERN = re.compile(r'<(?:img|a|source|video|audio)\b[^>]*>', re.IGNORECASE)
+URL_ATTR_PATTERN = re.compile(r'\b(src|href|srcset|poster)\s*=\s*("[^"]*"|\'[^\']*\')', re.IGNORECASE)
+
+# 未引用文件统计（按构建上下文区分）：数据目录 -> [相对路径]
+_unreferenced = ContextVar('unreferenced_assets')
+# 本轮构建用到的存储文件（按构建上下文区分），完整构建结束后据此清理存储
+_stored = ContextVar('stored_assets')
+
+
+def _current_report():
+    report = _unreferenced.get(None)
+    if report is None:
+        report = {}
+        _unreferenced.set(report)
+    return report
+
+
+def get_unreferenced_report():
+    """本次构建中未被引用的文件 [(数据目录, [相对路径])]"""
+    return sorted(_current_report().items())
+
+
+def reset_unreferenced_report():
+    """清空未引用文件统计和存储使用记录（每轮构建开始时调用）"""
+    _unreferenced.set({})
+    _stored.set(set())
+
+
+def _current_stored():
+    stored = _stored.get(None)
+    if stored is None:
+        stored = set()
+        _stored.set(stored)
+    return stored
+
+
+def is_fingerprinted(relative):
+    """是否为生成器按内容哈希命名的文件（内容变化时地址随之变化，可以永久缓存）"""
+    return bool(FINGERPRINT_PATTERN.match(relative))
+
+
+def asset_store_path(digest, suffix):
+    """内容哈希对应的存储路径（相对输出目录）"""
+    return f"{ASSET_STORE_DIR}/{digest[:16]}{suffix.lower()}"
+
+
+def store_asset(file_path):
+    """把文件放入内容寻址存储（同内容只存一份），返回相对输出目录的路径"""
+    file_path = Path(file_path)
+    relative = asset_store_path(get_image_hash(file_path), file_path.suffix)
+    target = html_path(relative)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再改名，中断的构建不会留下不完整的存储文件
+        temp = target.with_name(f".{target.name}.tmp")
+        shutil.copy2(file_path, temp)
+        os.replace(temp, target)
+    _current_stored().add(relative)
+    return relative
+
+
+def link_asset(store_relative, dst):
+    """把存储中的文件发布到固定地址（硬链接，跨文件系统时复制）"""
+    src = html_path(store_relative)
+    dst = Path(dst)
+    if dst.exists():
+        if os.path.samefile(src, dst):
+            return
+        # 先删除再链接，避免覆盖写入与存储共享的 inode
+        dst.unlink()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def prune_asset_store():
+    """删除本轮构建没有用到的存储文件（只在完整构建后调用），返回删除数"""
+    store_dir = html_path(ASSET_STORE_DIR)
+    if not store_dir.exists():
+        return 0
+
+    stored = _current_stored()
+    removed = 0
+    for file_path in store_dir.iterdir():
+        if f"{ASSET_STORE_DIR}/{file_path.name}" not in stored:
+            file_path.unlink()
+            removed += 1
+    return removed
+
+
+def resolve_reference(url, base_dir):
+    """
+    把相对地址解析为 base_dir 下的文件
+
+    Returns:
+        str: 相对 base_dir 的路径（POSIX 形式）；远程地址、锚点、目录外或不存在的文件返回 None
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path or parts.path.startswith('/'):
+        return None
+
+    base_dir = Path(base_dir).resolve()
+    target = (base_dir / unquote(parts.path)).resolve()
+    try:
+        relative = target.relative_to(base_dir)
+    except ValueError:
+        return None
+    return relative.as_posix() if target.is_file() else None
+
+
+def _is_ignored(relative):
+    return any(fnmatch.fnmatch(part, pattern) for part in relative.parts for pattern in IGNORED_PATTERNS)
+
+
+def list_source_files(source_dir, exclude=()):
+    """列出目录下（含子目录）可发布的文件，返回相对路径集合"""
+    source_dir = Path(source_dir)
+    files = set()
+    if not source_dir.is_dir():
+        return files
+
+    for file_path in source_dir.rglob('*'):
+        if not file_path.is_file():
+            continue
+        relative = file_path.relative_to(source_dir)
+        if _is_ignored(relative) or relative.as_posix() in exclude:
+            continue
+        files.add(relative.as_posix())
+    return files
+
+
+def rewrite_asset_urls(html_content, resolve):
+    """
+    改写 HTML 中 <img>/<a>/<source>/<video>/<audio> 的地址
+
+    Args:
+        html_content (str): 待处理的 HTML
+        resolve (callable): 原地址 -> 新地址，返回 None 时保持原样
+    """
+    def rewrite_url(url):
+        parts = urlsplit(url)
+        new_path = resolve(url)
+        if new_path is None:
+            return url
+        # 锚点（如 PDF 页码）保留，查询参数对静态文件没有意义
+        return urlunsplit(('', '', new_path, '', parts.fragment))
+
+    def rewrite_attr(match):
+        attr, quoted = match.group(1), match.group(2)
+        quote, value = quoted[0], html.unescape(quoted[1:-1])
+        if attr.lower() == 'srcset':
+            candidates = []
+            for candidate in value.split(','):
+                pieces = candidate.strip().split(None, 1)
+                if pieces:
+                    pieces[0] = rewrite_url(pieces[0])
+                    candidates.append(' '.join(pieces))
+            new_value = ', '.join(candidates)
+        else:
+            new_value = rewrite_url(value.strip())
+        if new_value == value:
+            return match.group(0)
+        return f'{attr}={quote}{html.escape(new_value, quote=True)}{quote}'
+
+    def rewrite_tag(match):
+        return URL_ATTR_PATTERN.sub(rewrite_attr, match.group(0))
+
+    return REFERENCE_TAG_PATTERN.sub(rewrite_tag, html_content or '')
+
+
+def publish_assets(source_dir, output_dir, references, exclude=(), include_unreferenced=False):
+    """
+    发布被引用的文件（存入内容寻址存储，再以硬链接发布到 output_dir 下的原相对路径），
+    并记录未被引用的文件
+
+    Args:
+        source_dir (Path): 数据目录
+        output_dir (Path): 输出目录
+        references (iterable): 引用地址（相对 source_dir）
+        exclude (iterable): 不发布也不报告的源文件（相对路径）
+        include_unreferenced (bool): 是否同时发布未被引用的文件
+
+    Returns:
+        dict: {'published': [相对路径], 'unreferenced': [相对路径]}
+    """
+    available = list_source_files(source_dir, set(exclude))
+    referenced = {path for path in (resolve_reference(url, source_dir) for url in references) if path}
+    published = referenced & available
+    unreferenced = available - referenced
+    if include_unreferenced:
+        published |= unreferenced
+
+    for relative in sorted(published):
+        link_asset(store_asset(Path(source_dir) / relative), Path(output_dir) / relative)
+    if unreferenced:
+        _current_report()[str(source_dir)] = sorted(unreferenced)
+
+    return {'published': sorted(published), 'unreferenced': sorted(unreferenced)}
+
+
+def publish_article_assets(article, html_content, output_dir, include_unreferenced=False, url_base='../../'):
+    """
+    发布文章用到的资源：卡片封面 + 正文中引用的文件
+
+    正文中的本地地址改写为存储地址（url_base 为文章页到输出根目录的前缀）；
+    封面由卡片视图直接引用存储地址，无法放入存储的封面和未引用文件按原相对路径发布
+
+    Returns:
+        tuple: (改写后的正文 HTML, {'published': [相对路径], 'unreferenced': [相对路径]})
+    """
+    source_dir = article.source_dir
+    available = list_source_files(source_dir, ARTICLE_SOURCE_FILES)
+    published = set()
+
+    def resolve(url):
+        relative = resolve_reference(url, source_dir)
+        if relative not in available:
+            return None
+        published.add(relative)
+        return url_base + store_asset(Path(source_dir) / relative)
+
+    html_content = rewrite_asset_urls(html_content, resolve)
+
+    # 封面
+    cover = resolve_reference(article.card.image, source_dir) if article.card.has_local_image else None
+    stable = set()
+    if cover in available:
+        published.add(cover)
+        if article.card.image_asset:
+            store_asset(Path(source_dir) / cover)
+        else:
+            stable.add(cover)
+
+    unreferenced = available - published
+    if include_unreferenced:
+        stable |= unreferenced
+    for relative in sorted(stable):
+        link_asset(store_asset(Path(source_dir) / relative), Path(output_dir) / relative)
+    if unreferenced:
+        _current_report()[str(source_dir)] = sorted(unreferenced)
+
+    return html_content, {'published': sorted(published | stable), 'unreferenced': sorted(unreferenced)}
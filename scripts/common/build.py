@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建流程
+生成任务表、HTML 目录清理、一轮构建的执行与输出变更清单，供 gen.py 和常驻构建进程共用；
+build_sites 在同一进程内用线程池批量构建多个站点，共享模板环境和各类缓存
+"""
+
+import contextvars
+import hashlib
+import importlib
+import json
+import shutil
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .assets import get_unreferenced_report, prune_asset_store, reset_unreferenced_report
+from .chrome import prune_chrome, reset_chrome
+from .config import load_json_file
+from .critical_css import prune_css_assets, reset_css_assets
+from .fragments import finish_fragment_cache, get_fragment_stats, refresh_fragment_cache
+from .highlight import get_highlight_stats, get_highlight_stylesheet, reset_highlight_stats
+from .images import save_image_cache
+from .models import TAXONOMY_DIRS
+from .output import get_size_report, reset_size_report
+from .page_weight import audit_page_weight
+from .precompress import is_precompressed_copy, precompress_outputs
+from .service_worker import write_service_worker
+from .site import DEFAULT_SITE, ROOT_DIR, SiteSpec, get_site, html_path, use_site
+from .tasks import DEFAULT_WORKERS, TASKS, VALID_TARGETS
+
+# 生成前需要清理输出目录的模块
+MODULES_TO_CLEAN = ["blog", "project", "docs", "contact", "resume"]
+
+# 生成分类/标签页面的模块：清理时保留其分类法目录
+TAXONOMY_SECTIONS = ("blog", "project")
+
+# 输出清单文件名（相对输出目录）：列出每个输出文件的大小和 SHA-256，供增量部署比较
+MANIFEST_NAME = "build-manifest.json"
+
+# 已导入的生成函数：目标名 -> 函数
+_task_registry = {}
+
+# 输出文件哈希缓存：输出目录 -> {相对路径: (修改时间, 大小, 哈希)}，用于计算变更清单
+_output_hashes = {}
+
+
+def get_task(name):
+    """
+    按名称获取生成函数（第一次使用时导入所在模块，之后直接复用）
+
+    只导入目标自己的模块，Markdown、Pygments 等重依赖由用到它们的目标在渲染时导入
+    """
+    func = _task_registry.get(name)
+    if func is None:
+        module_name, func_name = TASKS[name].rsplit(".", 1)
+        func = _task_registry[name] = getattr(importlib.import_module(module_name), func_name)
+    return func
+
+
+def run_task(name):
+    """运行指定目标的生成函数"""
+    try:
+        get_task(name)()
+        print(f"✅ {TASKS[name]} 生成完成")
+        return True
+    except Exception as e:
+        print(f"❌ {TASKS[name]} 生成失败：{e}")
+        return False
+
+
+def clean_html_dirs(dirs_to_clean=MODULES_TO_CLEAN):
+    """
+    清理HTML目录下的动态生成内容，确保与data目录完全同步
+
+    分类/标签目录保留，由分类法生成步骤自行比对内容并删除失效页面
+    """
+    cleaned_count = 0
+    for dir_name in dirs_to_clean:
+        target_dir = html_path(dir_name)
+        if target_dir.exists():
+            keep = set(TAXONOMY_DIRS.values()) if dir_name in TAXONOMY_SECTIONS else set()
+            for child in target_dir.iterdir():
+                if child.name in keep:
+                    continue
+                if child.is_dir():
+                    shutil.rmtree(child)
+                else:
+                    child.unlink()
+            print(f"🗑️ 已清理: {target_dir}")
+            cleaned_count += 1
+
+    if cleaned_count > 0:
+        print(f"✅ 清理完成，共清理了 {cleaned_count} 个目录")
+    else:
+        print("ℹ️ 无需清理，所有目录都是干净的")
+
+
+def expand_targets(targets):
+    """展开 all 并去重，保持任务表顺序"""
+    if not targets or "all" in targets:
+        return list(TASKS)
+    return [name for name in TASKS if name in targets]
+
+
+def targets_for_paths(paths):
+    """
+    根据改动的源文件推断需要重新生成的目标
+
+    <数据目录>/<模块>/... 只重建该模块；模板、脚本和全局配置（data/*.json）影响所有页面。
+    相对路径以数据目录的上一级为基准（默认站点即仓库根目录）
+
+    Returns:
+        list: 需要重新生成的目标；没有任何路径对应到模块时返回空列表
+    """
+    site = get_site()
+    global_dirs = (site.templates_dir, ROOT_DIR / "scripts")
+    targets = set()
+    for raw_path in paths:
+        path = Path(raw_path)
+        if not path.is_absolute():
+            path = site.data_dir.parent / path
+        if path == ROOT_DIR / "gen.py" or any(path.is_relative_to(folder) for folder in global_dirs):
+            return list(TASKS)
+        if not path.is_relative_to(site.data_dir):
+            continue
+        parts = path.relative_to(site.data_dir).parts
+        if parts and parts[0] in TASKS:
+            targets.add(parts[0])
+        elif len(parts) <= 1:
+            return list(TASKS)
+    return expand_targets(targets) if targets else []
+
+
+def collect_output_hashes(previous=None):
+    """
+    计算当前站点输出目录下全部文件的内容哈希（修改时间和大小未变的文件复用 previous 中的结果）
+
+    输出清单本身和预压缩的 .gz 不计入
+    """
+    previous = previous or {}
+    html_dir = html_path()
+    hashes = {}
+    if not html_dir.exists():
+        return hashes
+
+    for file_path in sorted(html_dir.rglob('*')):
+        if not file_path.is_file():
+            continue
+        relative = file_path.relative_to(html_dir).as_posix()
+        if relative == MANIFEST_NAME or is_precompressed_copy(relative):
+            continue
+        stat = file_path.stat()
+        cached = previous.get(relative)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            digest = cached[2]
+        else:
+            digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        hashes[relative] = (stat.st_mtime_ns, stat.st_size, digest)
+    return hashes
+
+
+def write_build_manifest(hashes):
+    """
+    写出输出清单（路径排序、不含时间戳，相同输入的两次构建得到相同的清单）
+
+    内容未变化时不重写，保持文件修改时间
+    """
+    manifest = {
+        'version': 1,
+        'files': {relative: {'size': size, 'sha256': digest} for relative, (_, size, digest) in sorted(hashes.items())},
+    }
+    data = json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True) + '\n'
+    manifest_file = html_path(MANIFEST_NAME)
+    if manifest_file.exists() and manifest_file.read_text(encoding='utf-8') == data:
+        return manifest_file
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    manifest_file.write_text(data, encoding='utf-8')
+    return manifest_file
+
+
+def load_build_manifest():
+    """读取当前站点的输出清单，不存在时返回 None"""
+    manifest_file = html_path(MANIFEST_NAME)
+    if not manifest_file.exists():
+        return None
+    return load_json_file(manifest_file)
+
+
+def diff_output(before, after):
+    """比较两次输出快照，返回 {'added', 'modified', 'removed'} 路径列表"""
+    return {
+        'added': sorted(set(after) - set(before)),
+        'modified': sorted(p for p in set(after) & set(before) if after[p][2] != before[p][2]),
+        'removed': sorted(set(before) - set(after)),
+    }
+
+
+def run_build(targets):
+    """
+    为当前站点执行一轮构建
+
+    Args:
+        targets (list): 目标列表（可含 all）
+
+    Returns:
+        dict: 站点、目标、成功数、耗时、缓存统计、页面大小统计、输出变更清单和页面体积审计结果
+    """
+    start = time.perf_counter()
+    site = get_site()
+    targets = expand_targets(targets)
+
+    before = _output_hashes.get(site.out_dir)
+    if before is None:
+        before = collect_output_hashes()
+
+    # 每轮构建开始：刷新片段缓存、重置统计
+    refresh_fragment_cache()
+    reset_highlight_stats()
+    reset_size_report()
+    reset_unreferenced_report()
+    reset_css_assets()
+    reset_chrome()
+
+    # 在生成之前清理HTML目录（只清理本轮会重新生成的模块，其他模块的输出保持不变）
+    dirs_to_clean = [target for target in targets if target in MODULES_TO_CLEAN]
+    if dirs_to_clean:
+        print("🧹 开始清理HTML目录...")
+        clean_html_dirs(dirs_to_clean)
+        print()
+
+    # 代码高亮样式表每次构建只生成一次，各文章页共用
+    if any(target in ("blog", "project") for target in targets):
+        stylesheet = get_highlight_stylesheet()
+        if stylesheet:
+            print(f"🎨 代码高亮样式表: html/{stylesheet}")
+
+    success_count = 0
+    for target in targets:
+        if run_task(target):
+            success_count += 1
+
+    # 完整构建成功后才能确定哪些存储文件和样式文件已不再被引用，清理后输出只由输入决定
+    full_build = targets == list(TASKS) and success_count == len(targets)
+    if full_build:
+        removed = prune_asset_store() + prune_css_assets() + prune_chrome()
+        if removed:
+            print(f"🗑️ 清理未使用的资源文件: {removed} 个")
+    removed_fragments = finish_fragment_cache(prune=full_build)
+    if removed_fragments:
+        print(f"🗑️ 清理未使用的片段缓存: {removed_fragments} 个")
+
+    save_image_cache()
+    after = collect_output_hashes(before)
+    # sw.js 的预缓存列表来自其余输出文件，写出后再补上它自己的哈希
+    if write_service_worker(after):
+        after = collect_output_hashes(after)
+    _output_hashes[site.out_dir] = after
+    write_build_manifest(after)
+    compressed = precompress_outputs(after, before)
+    if compressed:
+        print(f"🗜️ 预压缩文本文件: {compressed} 个")
+
+    # 构建后审计：每个页面的传输体积和请求数，与 frame.json 中的预算比较
+    page_weight = audit_page_weight(after)
+
+    return {
+        'site': site,
+        'targets': targets,
+        'success': success_count,
+        'total': len(targets),
+        'duration': time.perf_counter() - start,
+        'fragments': get_fragment_stats(),
+        'highlight': get_highlight_stats(),
+        'sizes': get_size_report(),
+        'unreferenced': get_unreferenced_report(),
+        'changes': diff_output(before, after),
+        'page_weight': page_weight,
+    }
+
+
+def load_sites(sites_file):
+    """
+    读取批量构建的站点列表
+
+    文件内容为 [{"name": ..., "data": ..., "templates": ..., "out": ...}]，相对路径以该文件所在目录为基准
+
+    Returns:
+        list: SiteSpec 列表，文件无法读取时返回 None
+    """
+    sites_file = Path(sites_file)
+    data = load_json_file(sites_file)
+    if data is None:
+        return None
+    return [SiteSpec.from_dict(item, sites_file.parent) for item in data]
+
+
+def build_site(site=DEFAULT_SITE, targets=("all",)):
+    """
+    构建一个站点（库接口）
+
+    在独立的上下文中执行，统计信息互不干扰，模板环境、Markdown 实例和各类缓存仍在进程内共享
+    """
+    def run():
+        with use_site(site):
+            return run_build(list(targets))
+    return contextvars.copy_context().run(run)
+
+
+def build_sites(sites, targets=("all",), workers=DEFAULT_WORKERS):
+    """
+    批量构建多个站点（库接口）
+
+    Args:
+        sites (list): SiteSpec 列表
+        targets (list): 每个站点的目标
+        workers (int): 线程数
+
+    Returns:
+        list: 与 sites 对应的构建结果
+    """
+    out_dirs = [site.out_dir for site in sites]
+    if len(set(out_dirs)) != len(out_dirs):
+        raise ValueError("多个站点不能使用同一个输出目录")
+
+    workers = max(1, min(workers, len(sites)))
+    if workers == 1:
+        return [build_site(site, targets) for site in sites]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='site') as pool:
+        return list(pool.map(lambda site: build_site(site, targets), sites))
+
+
+def format_size(size):
+    """格式化字节数"""
+    return f"{size / 1024:.1f} KB"
+
+
+def print_size_report(report, minified=True, html_dir=None):
+    """输出每个页面压缩前后的大小（路径相对 html_dir 显示）"""
+    if not report:
+        return
+    html_dir = html_dir or html_path()
+
+    before = sum(item[1] for item in report)
+    after = sum(item[2] for item in report)
+    title = "HTML 压缩" if minified else "HTML 输出（未压缩）"
+    print(f"🗜️ {title}：{len(report)} 个文件，{format_size(before)} → {format_size(after)}")
+
+    # 完整页面逐个列出，卡片/分片等片段只计入总数
+    for output_file, original_size, size, is_page in report:
+        if not is_page:
+            continue
+        try:
+            name = output_file.relative_to(html_dir)
+        except ValueError:
+            name = output_file
+        saved = (1 - size / original_size) * 100 if original_size else 0
+        print(f"   {name}: {format_size(original_size)} → {format_size(size)}（-{saved:.1f}%）")
+
+
+def print_unreferenced_report(report):
+    """输出数据目录中未被任何页面引用、因而没有发布的文件"""
+    total = sum(len(files) for _, files in report)
+    if not total:
+        return
+    print(f"📦 未引用的文件：{total} 个（未发布，可在模块 frame.json 中设置 publish_unreferenced_assets 继续复制）")
+    for source_dir, files in report:
+        for relative in files:
+            print(f"   {source_dir}/{relative}")
+
+
+def print_page_weight_report(report, limit=5):
+    """输出页面体积审计：最重的几个页面和超出预算的页面"""
+    pages = report['pages']
+    if not pages:
+        return
+    total = sum(page['compressed'] for page in pages)
+    print(f"⚖️ 页面体积：{len(pages)} 个页面，平均传输 {format_size(total / len(pages))}，"
+          f"超出预算 {len(report['violations'])} 个")
+    for page in sorted(pages, key=lambda p: (-p['compressed'], p['path']))[:limit]:
+        print(f"   {page['path']}（{page['type']}）: 传输 {format_size(page['compressed'])}，"
+              f"原始 {format_size(page['raw'])}，{page['requests']} 个请求")
+
+    status = "❌" if report['failed'] else "⚠️"
+    for page, problems in report['violations']:
+        print(f"   {status} {page['path']}（{page['type']}）超出预算：{'；'.join(problems)}")
+
+    # 缺失资源和未登记的第三方资源按地址/域名汇总
+    missing = {}
+    for page in pages:
+        for url in page['missing']:
+            missing[url] = missing.get(url, 0) + 1
+    for url, count in sorted(missing.items()):
+        print(f"   ⚠️ 引用的本地资源不存在：{url}（{count} 个页面）")
+    unknown = {}
+    for url in {url for page in pages for url in page['unknown']}:
+        host = urlsplit(url).netloc
+        unknown[host] = unknown.get(host, 0) + 1
+    if unknown:
+        hosts = "，".join(f"{host}（{count} 个地址）" for host, count in sorted(unknown.items()))
+        print(f"   ℹ️ 未登记大小的第三方资源只计请求数（可在 frame.json 的 third_party_weights 中登记）：{hosts}")
+
+
+def build_succeeded(result):
+    """全部目标生成成功，且页面体积没有超出设置为 fail 的预算"""
+    return result['success'] == result['total'] and not result['page_weight']['failed']
+
+
+def print_build_report(result, minified=True):
+    """输出一轮构建的统计信息"""
+    print(f"\n📊 生成统计：{result['success']}/{result['total']} 成功，耗时 {result['duration'] * 1000:.0f} ms")
+    fragment_stats = result['fragments']
+    print(f"🧩 片段缓存：渲染 {fragment_stats['renders']} 个，复用 {fragment_stats['hits']} 次")
+    highlight_stats = result['highlight']
+    print(f"🎨 代码高亮缓存：渲染 {highlight_stats['renders']} 个，复用 {highlight_stats['hits']} 次")
+    print_size_report(result['sizes'], minified=minified, html_dir=result['site'].out_dir)
+    print_unreferenced_report(result['unreferenced'])
+    print_page_weight_report(result['page_weight'])
+    changes = result['changes']
+    print(f"📝 输出变更：新增 {len(changes['added'])}，修改 {len(changes['modified'])}，删除 {len(changes['removed'])}")
+
+
+def print_batch_report(results, duration):
+    """输出批量构建中每个站点的耗时和结果"""
+    print(f"\n📊 批量构建：{len(results)} 个站点，总耗时 {duration * 1000:.0f} ms")
+    for result in results:
+        changes = result['changes']
+        status = "✅" if build_succeeded(result) else "❌"
+        print(f"   {status} {result['site'].name}: {result['success']}/{result['total']} 成功，"
+              f"耗时 {result['duration'] * 1000:.0f} ms，"
+              f"片段复用 {result['fragments']['hits']} 次，"
+              f"变更 +{len(changes['added'])} ~{len(changes['modified'])} -{len(changes['removed'])}")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建缓存工具
+提供缓存目录和内容哈希，供各个构建阶段跨次构建复用结果
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+# 缓存根目录，可通过环境变量 HOMEPAGE_CACHE_DIR 覆盖
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent / ".cache"
+
+
+def get_cache_dir(name):
+    """获取（并创建）某一类缓存的目录"""
+    root = Path(os.environ.get('HOMEPAGE_CACHE_DIR', DEFAULT_CACHE_DIR))
+    cache_dir = root / name
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def write_atomic(file_path, data):
+    """
+    先写临时文件再改名：并发构建的其他线程和中断的构建都不会读到不完整的文件
+
+    data 为 str 时按 UTF-8 写入；临时文件名带进程和线程号，同时写同一文件互不干扰
+    """
+    file_path = Path(file_path)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    temp = file_path.with_name(f".{file_path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    temp.write_bytes(data)
+    os.replace(temp, file_path)
+
+
+def hash_text(*parts):
+    """计算若干字符串片段的 SHA-256"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """分块计算文件的 SHA-256"""
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享页面框架（导航栏、页脚）
+列表页和分类/标签页共用模块的导航栏和页脚（来自模块 frame.json 的 nav_title、nav_buttons、footer_extra）。
+
+默认直接内联到每个页面；data/frame.json 中设置 "chrome_mode": "ssi" 时每个模块的导航栏和页脚
+只写出一份到 html/_chrome/，页面中改为 nginx SSI 指令引用（生成的 nginx 配置随之开启 ssi），
+修改导航或页脚时只有这几个片段变化，各页面内容保持不变
+"""
+
+import re
+from contextvars import ContextVar
+
+from .config import load_frame_config, setup_template_env
+from .site import html_path
+
+# 片段输出目录（相对 html/）
+CHROME_DIR = "_chrome"
+
+CHROME_MODES = ('inline', 'ssi')
+
+SSI_INCLUDE = '<!--# include virtual="/{path}" -->'
+SSI_INCLUDE_PATTERN = re.compile(r'<!--# include virtual="/([^"]+)" -->')
+SSI_MARKER = b'<!--# include '
+
+# 本轮构建渲染的片段（按构建上下文区分）：相对路径 -> HTML
+_rendered = ContextVar('chrome_rendered')
+
+
+def _current_rendered():
+    rendered = _rendered.get(None)
+    if rendered is None:
+        rendered = {}
+        _rendered.set(rendered)
+    return rendered
+
+
+def reset_chrome():
+    """清空本轮记录（每轮构建开始时调用）"""
+    _rendered.set({})
+
+
+def get_chrome_mode():
+    """页面框架的输出方式（data/frame.json 的 chrome_mode，默认 inline）"""
+    mode = load_frame_config('home').get('chrome_mode', 'inline')
+    return mode if mode in CHROME_MODES else 'inline'
+
+
+def is_ssi_enabled():
+    return get_chrome_mode() == 'ssi'
+
+
+def emit_chrome(name, html):
+    """
+    输出一个共享片段
+
+    Args:
+        name (str): 片段名，如 blog-nav（同一站点内唯一，修改配置时保持不变）
+        html (str): 片段 HTML
+
+    Returns:
+        str: 内联模式下原样返回 HTML；SSI 模式下写出片段（本轮只写一次），返回引用它的 SSI 指令
+    """
+    if not is_ssi_enabled():
+        return html
+
+    relative = f"{CHROME_DIR}/{name}.html"
+    rendered = _current_rendered()
+    if relative not in rendered:
+        from .output import write_html
+        write_html(html_path(relative), html)
+        rendered[relative] = html
+    return SSI_INCLUDE.format(path=relative)
+
+
+def render_section_chrome(section, frame_config):
+    """
+    渲染模块列表页/分类页共用的导航栏和页脚
+
+    Returns:
+        dict: {'nav': HTML 或 SSI 指令, 'footer': HTML 或 SSI 指令}
+    """
+    env = setup_template_env()
+    nav_html = env.get_template('components/section_nav.html').render(frame=frame_config)
+    footer_html = env.get_template('components/section_footer.html').render(frame=frame_config)
+    return {
+        'nav': emit_chrome(f"{section}-nav", nav_html),
+        'footer': emit_chrome(f"{section}-footer", footer_html),
+    }
+
+
+def expand_includes(html):
+    """把页面中的 SSI 指令替换为片段内容（用于首屏分析等需要完整标记的场合），找不到的片段保留指令"""
+    if SSI_MARKER.decode() not in html:
+        return html
+    rendered = _current_rendered()
+
+    def replace(match):
+        relative = match.group(1)
+        fragment = rendered.get(relative)
+        if fragment is None and relative.startswith(CHROME_DIR + '/'):
+            fragment_file = html_path(relative)
+            if fragment_file.is_file():
+                fragment = fragment_file.read_text(encoding='utf-8')
+        return match.group(0) if fragment is None else fragment
+
+    return SSI_INCLUDE_PATTERN.sub(replace, html)
+
+
+def has_ssi_include(data):
+    """文件内容（字节）中是否有 SSI 指令"""
+    return SSI_MARKER in data
+
+
+def prune_chrome():
+    """
+    删除本轮构建没有写出的片段（完整构建结束后调用；切回内联模式时清理整个目录）
+
+    Returns:
+        int: 删除的文件数
+    """
+    chrome_dir = html_path(CHROME_DIR)
+    if not chrome_dir.is_dir():
+        return 0
+    rendered = _current_rendered()
+    removed = 0
+    for fragment_file in chrome_dir.glob('*.html'):
+        if f"{CHROME_DIR}/{fragment_file.name}" not in rendered:
+            fragment_file.unlink()
+            removed += 1
+    if not any(chrome_dir.glob('*.html')):
+        for leftover in chrome_dir.iterdir():
+            leftover.unlink()
+        chrome_dir.rmdir()
+    return removed
@@ -5,50 +5,128 @@
 """
 
 import json
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from jinja2 import Environment, FileSystemLoader
 
+from .models import FrameConfig
+from .site import data_path, templates_path
+
+# 可选的高性能 JSON 解析后端
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON 解析缓存：路径 -> (文件签名, 数据)
+_json_cache = {}
+# 合并后的框架配置缓存：(数据目录, 页面名) -> (全局签名, 页面签名, FrameConfig)
+_frame_cache = {}
+
 def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent / "templates"
+    """设置 Jinja2 模板环境（进程内按模板目录共享，多个站点共用同一套模板时只编译一次）"""
+    return _template_env(templates_path())
+
+@lru_cache(maxsize=None)
+def _template_env(template_dir):
     return Environment(
         loader=FileSystemLoader(template_dir),
         trim_blocks=True,
         lstrip_blocks=True
     )
 
+def file_signature(file_path):
+    """文件签名（修改时间 + 大小），文件不存在时返回 None"""
+    try:
+        stat = Path(file_path).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _parse_json(file_path):
+    """解析 JSON 文件，优先使用 orjson"""
+    if orjson is not None:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def freeze_json(value):
+    """把解析出的 JSON 转为只读结构：对象 -> MappingProxyType，数组 -> tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_json(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_json(item) for item in value)
+    return value
+
+def thaw_json(value):
+    """只读结构转回可修改的 dict/list 副本（供需要修改或写回 JSON 的调用方使用）"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw_json(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_json(item) for item in value]
+    return value
+
 def load_json_file(file_path):
-    """加载 JSON 文件"""
+    """
+    加载 JSON 文件（按修改时间缓存）
+
+    返回缓存中的只读结构（对象为 MappingProxyType，数组为 tuple），多个页面和站点共用同一份；
+    需要修改时先用 thaw_json 复制
+    """
+    key = str(file_path)
+    signature = file_signature(file_path)
+
+    cached = _json_cache.get(key)
+    if cached is not None and signature is not None and cached[0] == signature:
+        return cached[1]
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        data = freeze_json(_parse_json(file_path))
     except Exception as e:
         print(f"加载 {file_path} 失败: {e}")
+        _json_cache.pop(key, None)
         return None
 
+    _json_cache[key] = (signature, data)
+    return data
+
+def clear_config_cache():
+    """清空配置缓存（监听模式下每轮构建开始时调用）"""
+    _json_cache.clear()
+    _frame_cache.clear()
+
 def load_frame_config(page_name='home'):
     """加载页面框架配置"""
-    root_dir = Path(__file__).parent.parent.parent
-    data_dir = root_dir / "data"
+    global_frame_file = data_path("frame.json")
+    page_frame_file = data_path(page_name, "frame.json")
+
+    # 两个文件都未变化时直接复用合并结果
+    global_signature = file_signature(global_frame_file)
+    page_signature = file_signature(page_frame_file)
+    cache_key = (global_frame_file, page_name)
+    cached = _frame_cache.get(cache_key)
+    if cached is not None and cached[:2] == (global_signature, page_signature):
+        return cached[2]
 
     # 加载全局框架配置
-    global_frame_file = data_dir / "frame.json"
-    global_frame = load_json_file(global_frame_file) or {}
+    global_frame = (load_json_file(global_frame_file) or {}) if global_signature else {}
 
-    # 加载页面特定框架配置
-    page_frame_file = data_dir / page_name / "frame.json"
-    page_frame = load_json_file(page_frame_file) or {}
+    # 加载页面特定框架配置（页面可以没有自己的 frame.json）
+    page_frame = (load_json_file(page_frame_file) or {}) if page_signature else {}
 
     # 合并配置（页面特定配置覆盖全局配置）
-    frame_config = global_frame.copy()
+    frame_config = dict(global_frame)
     frame_config.update(page_frame)
 
-    return frame_config
+    result = FrameConfig.from_dict(frame_config)
+    _frame_cache[cache_key] = (global_signature, page_signature, result)
+    return result
 
 def load_config():
     """加载全局配置（主要用于首页）"""
-    root_dir = Path(__file__).parent.parent.parent
-    data_dir = root_dir / "data"
+    data_dir = data_path()
 
     # 加载框架配置（首页）
     frame_config = load_frame_config('home')
@@ -67,6 +145,7 @@ def load_config():
         'footer_text': frame_config.get('footer_text', '© 2025 个人主页'),
         'footer_tagline': frame_config.get('footer_tagline', ''),
         'icp_number': frame_config.get('icp_number', ''),
+        'lazy_home_sections': frame_config.get('lazy_home_sections', False),
         'nav_items': []
     }
 
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容加载
+一次性扫描 data/<section>/ 下的文章目录，校验 card.json 并读取 content.md；
+目录内文件未变化时直接复用上次加载的文章（常驻构建进程中保持热缓存）
+"""
+
+
+from .config import file_signature, load_json_file
+from .assets import asset_store_path
+from .images import get_image_hash, get_image_meta
+from .models import Article, Card, CardValidationError, register_term_slugs
+from .site import data_path
+
+# 文章缓存：(文章目录, 模块) -> (目录签名, Article)
+_article_cache = {}
+
+
+def _article_signature(article_dir):
+    """文章目录签名：目录下各文件的名称、修改时间和大小"""
+    return tuple(sorted(
+        (item.name, file_signature(item)) for item in article_dir.iterdir() if item.is_file()
+    ))
+
+
+def load_article(article_dir, section):
+    """加载单篇文章，card.json 缺失或无效时返回 None"""
+    key = (article_dir, section)
+    signature = _article_signature(article_dir)
+    cached = _article_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    article = _read_article(article_dir, section)
+    if article is not None:
+        _article_cache[key] = (signature, article)
+    else:
+        _article_cache.pop(key, None)
+    return article
+
+
+def _read_article(article_dir, section):
+    """读取并校验单篇文章"""
+    card_file = article_dir / "card.json"
+    content_file = article_dir / "content.md"
+
+    if not card_file.exists():
+        print(f"⚠️ 跳过 {article_dir.name}: 缺少 card.json")
+        return None
+
+    card_data = load_json_file(card_file)
+    if not card_data:
+        print(f"⚠️ 跳过 {article_dir.name}: card.json 无效")
+        return None
+
+    # 本地封面图在加载阶段读取固有尺寸和占位图，供模板输出 width/height 和占位背景
+    # 同时确定封面在内容寻址存储中的位置，页面直接引用 html/_assets/ 下的文件
+    image_meta = None
+    image_name = Card.local_image_name(card_data)
+    if image_name:
+        image_file = article_dir / image_name
+        image_meta = get_image_meta(image_file)
+        if image_file.is_file():
+            image_meta['asset'] = asset_store_path(get_image_hash(image_file), image_file.suffix)
+
+    try:
+        card = Card.from_dict(card_data, section, article_dir.name, image_meta)
+    except CardValidationError as e:
+        print(f"⚠️ 跳过 {article_dir.name}: card.json 无效（{e}）")
+        return None
+
+    markdown = None
+    if content_file.exists():
+        try:
+            markdown = content_file.read_text(encoding='utf-8')
+        except Exception as e:
+            print(f"读取内容失败 {content_file}: {e}")
+
+    return Article(card=card, source_dir=article_dir, markdown=markdown)
+
+
+def load_articles(section):
+    """加载某个模块（blog/project）下的全部文章，按日期倒序排列"""
+    data_root = data_path(section)
+
+    articles = []
+    if not data_root.exists():
+        return articles
+
+    # 目录遍历顺序因文件系统而异，按名称排序保证每次构建的处理顺序一致
+    for article_dir in sorted(data_root.iterdir()):
+        if not article_dir.is_dir() or article_dir.name == "__pycache__":
+            continue
+        article = load_article(article_dir, section)
+        if article:
+            articles.append(article)
+
+    # 按日期排序，最新的在前；同一日期按目录名排序（sort 是稳定的，先排次要键）
+    articles.sort(key=lambda a: a.card.slug)
+    articles.sort(key=lambda a: a.card.date, reverse=True)
+
+    # 分类/标签页文件名按全部取值统一分配，避免不同取值写到同一个文件
+    register_term_slugs(section, [article.card for article in articles])
+
+    return articles
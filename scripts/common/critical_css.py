@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+首屏关键 CSS
+从 <head> 的内联样式中挑出首屏标记用到的规则继续内联，其余规则写成带指纹的
+CSS 文件异步加载；外部样式表同样改为异步加载。
+结果按模板集合签名缓存，模板不变时同类页面只计算一次。
+"""
+
+import json
+import os
+import re
+from contextvars import ContextVar
+from pathlib import Path
+
+from .cache import get_cache_dir, hash_text, write_atomic
+from .chrome import expand_includes
+from .fragments import get_template_set_hash
+from .site import html_path
+
+# 模板中标记首屏结束位置的注释；没有标记时以第一个 </header> 为界
+FOLD_MARKER = '<!-- fold -->'
+
+# 含这些指令的 text/tailwindcss 块需要浏览器端编译，不做拆分
+TAILWIND_DIRECTIVES = ('@tailwind', '@apply', '@layer', '@config', 'theme(')
+
+# 非关键 CSS 的输出目录（相对 html/）
+ASSET_DIR = Path("assets") / "css"
+
+
+HEAD_PATTERN = re.compile(r'<head\b[^>]*>.*?</head>', re.IGNORECASE | re.DOTALL)
+STYLE_PATTERN = re.compile(r'(<style\b([^>]*)>)(.*?)</style>', re.IGNORECASE | re.DOTALL)
+STYLESHEET_PATTERN = re.compile(r'<link\b[^>]*\brel=["\']stylesheet["\'][^>]*>', re.IGNORECASE)
+BODY_PATTERN = re.compile(r'<body\b', re.IGNORECASE)
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+PSEUDO_PATTERN = re.compile(r'::?[\w-]+(\([^)]*\))?')
+ATTRIBUTE_PATTERN = re.compile(r'\[[^\]]*\]')
+
+# 内存缓存：键 -> (关键 CSS, 其余 CSS)
+_split_cache = {}
+# 本轮构建引用的非关键 CSS 文件（按构建上下文区分），完整构建结束后据此清理旧文件
+_written = ContextVar('critical_css_assets')
+
+
+def _current_written():
+    written = _written.get(None)
+    if written is None:
+        written = set()
+        _written.set(written)
+    return written
+
+
+def reset_css_assets():
+    """清空本轮引用记录（每轮构建开始时调用）"""
+    _written.set(set())
+
+
+def prune_css_assets():
+    """删除本轮构建没有引用的非关键 CSS 文件（只在完整构建后调用），返回删除数"""
+    asset_dir = html_path(ASSET_DIR)
+    if not asset_dir.exists():
+        return 0
+
+    written = _current_written()
+    removed = 0
+    for file_path in asset_dir.glob("*.css"):
+        # 高亮样式表由 highlight 模块自行管理
+        if file_path.name.startswith("highlight."):
+            continue
+        if file_path.name not in written:
+            file_path.unlink()
+            removed += 1
+    return removed
+
+
+def split_rules(css):
+    """把 CSS 拆成顶层语句列表 [(前导, 块内容或 None)]"""
+    css = COMMENT_PATTERN.sub('', css)
+    rules = []
+    depth = 0
+    start = 0
+    prelude = None
+    for i, ch in enumerate(css):
+        if ch == '{':
+            if depth == 0:
+                prelude = css[start:i].strip()
+                start = i + 1
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:i].strip()))
+                start = i + 1
+        elif ch == ';' and depth == 0:
+            statement = css[start:i].strip()
+            if statement:
+                rules.append((statement, None))
+            start = i + 1
+    return rules
+
+
+def collect_fold_tokens(markup):
+    """收集首屏标记中出现的标签名、class 和 id"""
+    tokens = {
+        'tags': {'html', 'body'},
+        'classes': set(),
+        'ids': set(),
+    }
+    tokens['tags'].update(tag.lower() for tag in re.findall(r'<([a-zA-Z][\w-]*)', markup))
+    for value in re.findall(r'\bclass\s*=\s*["\']([^"\']*)["\']', markup, re.IGNORECASE):
+        tokens['classes'].update(value.split())
+    tokens['ids'].update(re.findall(r'\bid\s*=\s*["\']([^"\']*)["\']', markup, re.IGNORECASE))
+    return tokens
+
+
+def selector_matches(selector, tokens):
+    """判断选择器涉及的标签/class/id 是否都出现在首屏（保守匹配）"""
+    selector = ATTRIBUTE_PATTERN.sub('', PSEUDO_PATTERN.sub('', selector))
+    for compound in re.split(r'[\s>+~]+', selector.strip()):
+        if not compound or compound == '*':
+            continue
+        tag = re.match(r'[a-zA-Z][\w-]*', compound)
+        if tag and tag.group(0).lower() not in tokens['tags']:
+            return False
+        if any(name not in tokens['classes'] for name in re.findall(r'\.([\w-]+)', compound)):
+            return False
+        if any(name not in tokens['ids'] for name in re.findall(r'#([\w-]+)', compound)):
+            return False
+    return True
+
+
+def _format_rule(prelude, body):
+    return f"{prelude} {{ {body} }}" if body is not None else f"{prelude};"
+
+
+def extract_critical(css, tokens):
+    """
+    拆分关键 CSS
+
+    Returns:
+        tuple: (关键 CSS, 其余 CSS)
+    """
+    critical = []
+    rest = []
+    keyframes = []
+
+    for prelude, body in split_rules(css):
+        if body is None:
+            # @import / @charset 等语句必须保留在最前面
+            critical.append(_format_rule(prelude, body))
+        elif prelude.startswith('@media') or prelude.startswith('@supports'):
+            inner_critical, inner_rest = extract_critical(body, tokens)
+            if inner_critical:
+                critical.append(f"{prelude} {{ {inner_critical} }}")
+            if inner_rest:
+                rest.append(f"{prelude} {{ {inner_rest} }}")
+        elif prelude.startswith('@'):
+            keyframes.append((prelude, body))
+        elif any(selector_matches(s, tokens) for s in prelude.split(',')):
+            critical.append(_format_rule(prelude, body))
+        else:
+            rest.append(_format_rule(prelude, body))
+
+    # @keyframes 等随引用它的规则走
+    critical_text = '\n'.join(critical)
+    for prelude, body in keyframes:
+        name = prelude.split()[-1] if ' ' in prelude else ''
+        target = critical if name and name in critical_text else rest
+        target.append(_format_rule(prelude, body))
+
+    return '\n'.join(critical), '\n'.join(rest)
+
+
+def _cached_split(css, tokens):
+    """按模板集合签名 + CSS + 首屏标记特征缓存拆分结果"""
+    key = hash_text(
+        get_template_set_hash(), css,
+        *sorted(tokens['tags']), '|', *sorted(tokens['classes']), '|', *sorted(tokens['ids'])
+    )
+    result = _split_cache.get(key)
+    if result is not None:
+        return result
+
+    cache_file = get_cache_dir('critical') / f"{key}.json"
+    if cache_file.exists():
+        try:
+            result = tuple(json.loads(cache_file.read_text(encoding='utf-8')))
+        except ValueError:
+            result = None
+
+    if result is None:
+        result = extract_critical(css, tokens)
+        write_atomic(cache_file, json.dumps(result, ensure_ascii=False))
+
+    _split_cache[key] = result
+    return result
+
+
+def _async_stylesheet(href):
+    """异步加载样式表（不支持 JS 时回退为普通 link）"""
+    return (
+        f'<link rel="stylesheet" href="{href}" media="print" onload="this.media=\'all\'">'
+        f'<noscript><link rel="stylesheet" href="{href}"></noscript>'
+    )
+
+
+def _write_css_asset(css):
+    """写出非关键 CSS（内容寻址，已存在则跳过），返回相对站点输出目录的路径"""
+    relative = ASSET_DIR / f"{hash_text(css)[:12]}.css"
+    target = html_path(relative)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(target, css + '\n')
+    _current_written().add(relative.name)
+    return relative
+
+
+def get_fold_markup(html):
+    """取出 <body> 到首屏结束位置之间的标记，找不到首屏边界时返回 None"""
+    body = BODY_PATTERN.search(html)
+    if not body:
+        return None
+    end = html.find(FOLD_MARKER, body.start())
+    if end < 0:
+        header_end = html.find('</header>', body.start())
+        if header_end < 0:
+            return None
+        end = header_end + len('</header>')
+    return html[body.start():end]
+
+
+def inline_critical_css(html, output_file):
+    """
+    对完整页面做关键 CSS 处理，片段或找不到首屏边界的页面原样返回
+
+    Args:
+        html (str): 页面 HTML
+        output_file (Path): 页面输出路径，用于计算 CSS 文件的相对地址
+    """
+    head = HEAD_PATTERN.search(html)
+    # SSI 模式下导航栏等共享片段不在页面中，展开后再确定首屏用到的规则
+    fold = get_fold_markup(expand_includes(html)) if head else None
+    if fold is None:
+        return html
+
+    output_file = Path(output_file)
+    html_root = html_path().resolve()
+    try:
+        page_dir = output_file.resolve().parent
+        page_dir.relative_to(html_root)
+    except ValueError:
+        return html
+
+    tokens = collect_fold_tokens(fold)
+
+    def rewrite_style(match):
+        opening, attrs, css = match.group(1), match.group(2), match.group(3)
+        type_match = re.search(r'\btype\s*=\s*["\']([^"\']*)["\']', attrs, re.IGNORECASE)
+        style_type = type_match.group(1).lower() if type_match else 'text/css'
+        if style_type not in ('text/css', 'text/tailwindcss'):
+            return match.group(0)
+        if style_type == 'text/tailwindcss' and any(d in css for d in TAILWIND_DIRECTIVES):
+            return match.group(0)
+
+        critical, rest = _cached_split(css, tokens)
+        if not rest:
+            return match.group(0)
+
+        href = os.path.relpath(html_root / _write_css_asset(rest), page_dir).replace(os.sep, '/')
+        inlined = f"{opening}\n{critical}\n</style>" if critical else ''
+        return inlined + _async_stylesheet(href)
+
+    def rewrite_link(match):
+        tag = match.group(0)
+        if re.search(r'\bmedia\s*=', tag, re.IGNORECASE):
+            return tag
+        href = re.search(r'\bhref\s*=\s*["\']([^"\']*)["\']', tag, re.IGNORECASE)
+        return _async_stylesheet(href.group(1)) if href else tag
+
+    # 先处理外部样式表，避免再次改写拆分后新增的 <link>
+    new_head = STYLESHEET_PATTERN.sub(rewrite_link, head.group(0))
+    new_head = STYLE_PATTERN.sub(rewrite_style, new_head)
+    return html[:head.start()] + new_head + html[head.end():]
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻构建进程
+保持模板环境、Markdown 实例、文章/片段/高亮缓存常驻内存，
+通过本地 HTTP 接口接收重建请求，返回本轮输出变更清单
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .build import VALID_TARGETS, build_succeeded, print_build_report, run_build, targets_for_paths
+
+# 同一时间只执行一轮构建
+_build_lock = threading.Lock()
+# 最近一次构建结果
+_last_result = None
+# 是否压缩输出（只影响统计标题）
+_minified = True
+
+
+def serialize_result(result):
+    """把构建结果转换为可 JSON 序列化的字典"""
+    if result is None:
+        return None
+
+    sizes = []
+    for output_file, original_size, size, is_page in result['sizes']:
+        try:
+            name = output_file.relative_to(result['site'].out_dir).as_posix()
+        except ValueError:
+            name = str(output_file)
+        sizes.append({'path': name, 'original': original_size, 'size': size, 'page': is_page})
+
+    return {
+        'site': result['site'].name,
+        'targets': result['targets'],
+        'success': result['success'],
+        'total': result['total'],
+        'duration_ms': round(result['duration'] * 1000, 1),
+        'fragments': result['fragments'],
+        'highlight': result['highlight'],
+        'sizes': sizes,
+        'unreferenced': [
+            f"{source_dir}/{relative}" for source_dir, files in result['unreferenced'] for relative in files
+        ],
+        'changes': result['changes'],
+        'page_weight': {
+            'pages': [
+                {key: page[key] for key in ('path', 'type', 'raw', 'compressed', 'requests')}
+                for page in result['page_weight']['pages']
+            ],
+            'violations': [
+                {'path': page['path'], 'problems': problems} for page, problems in result['page_weight']['violations']
+            ],
+            'failed': result['page_weight']['failed'],
+        },
+    }
+
+
+def build_once(targets):
+    """加锁执行一轮构建并记录结果"""
+    global _last_result
+    with _build_lock:
+        result = run_build(targets)
+        print_build_report(result, minified=_minified)
+        _last_result = result
+    return result
+
+
+class BuildRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /status  最近一次构建结果
+    POST /build   请求体 {"targets": [...]} 或 {"paths": [...]}，都省略时重建全部
+    """
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/status':
+            self._send_json(404, {'error': f"未知地址: {self.path}"})
+            return
+        self._send_json(200, serialize_result(_last_result))
+
+    def do_POST(self):
+        if self.path != '/build':
+            self._send_json(404, {'error': f"未知地址: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self._send_json(400, {'error': f"请求体不是有效的 JSON: {e}"})
+            return
+        if not isinstance(payload, dict):
+            self._send_json(400, {'error': "请求体必须是 JSON 对象"})
+            return
+
+        for key in ('targets', 'paths'):
+            value = payload.get(key)
+            if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+                self._send_json(400, {'error': f"{key} 必须是字符串数组"})
+                return
+
+        targets = list(payload.get('targets') or [])
+        paths = payload.get('paths')
+        if paths is not None:
+            path_targets = targets_for_paths(paths)
+            if not path_targets:
+                self._send_json(400, {'error': "paths 中的文件都不对应任何模块"})
+                return
+            targets += path_targets
+        targets = targets or ["all"]
+
+        invalid = [target for target in targets if target not in VALID_TARGETS]
+        if invalid:
+            self._send_json(400, {'error': f"无效目标: {', '.join(map(str, invalid))}"})
+            return
+
+        result = build_once(targets)
+        status = 200 if build_succeeded(result) else 500
+        self._send_json(status, serialize_result(result))
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+
+def serve_build(host="127.0.0.1", port=8765, minified=True):
+    """
+    启动常驻构建进程：先完整构建一次预热缓存，然后监听重建请求
+
+    Returns:
+        int: 退出码
+    """
+    global _minified
+    _minified = minified
+
+    print("🔥 预热构建...")
+    build_once(["all"])
+
+    server = HTTPServer((host, port), BuildRequestHandler)
+    print(f"🚀 构建服务已启动: http://{host}:{port}（POST /build，GET /status）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 构建服务已停止")
+    finally:
+        server.server_close()
+    return 0
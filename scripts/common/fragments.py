@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面片段缓存
+同一模板 + 同一上下文 + 同一 URL 基准的片段在一次构建中只渲染一次，
+可选地写入磁盘供下一次构建复用。
+内存缓存按最近使用保留固定数量的片段，常驻构建进程不会无限增长；
+磁盘缓存在完整构建后删除本轮（及同时进行的其他站点构建）没有用到的文件
+"""
+
+import dataclasses
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextvars import ContextVar
+
+from .cache import get_cache_dir, write_atomic
+from .config import setup_template_env
+from .models import CardView
+from .site import templates_path
+
+# 内存缓存保留的片段数（约为几个站点一次完整构建用到的片段数）
+MAX_MEMORY_FRAGMENTS = 4096
+
+# 内存缓存：键 -> HTML，按最近使用排序（键中含模板集合签名，多个站点共用）
+_fragments = OrderedDict()
+# 并发构建多个站点时保护内存缓存和构建计数
+_lock = threading.Lock()
+# 正在进行的构建数，以及这批构建中最早的开始时间（磁盘缓存清理以此为界）
+_active_builds = 0
+_session_start = 0.0
+# 模板集合签名：模板目录 -> 签名（模板有改动时所有片段失效）
+_template_set_hashes = {}
+# 是否启用磁盘缓存
+_persistent = False
+# 命中统计（按构建上下文区分，并发构建多个站点时互不干扰）
+_stats = ContextVar('fragment_stats')
+
+
+def enable_persistent_fragments(enabled=True):
+    """启用/关闭磁盘片段缓存（用于热重建）"""
+    global _persistent
+    _persistent = enabled
+
+
+def _current_stats():
+    stats = _stats.get(None)
+    if stats is None:
+        stats = {'hits': 0, 'renders': 0}
+        _stats.set(stats)
+    return stats
+
+
+def clear_fragment_cache():
+    """清空内存片段缓存（每轮构建开始时调用）"""
+    with _lock:
+        _fragments.clear()
+    _template_set_hashes.clear()
+    _stats.set({'hits': 0, 'renders': 0})
+
+
+def refresh_fragment_cache():
+    """新一轮构建开始：模板有改动时才清空内存片段缓存（常驻进程中保留未失效的片段）"""
+    global _active_builds, _session_start
+    previous = _template_set_hashes.pop(templates_path(), None)
+    changed = previous is not None and get_template_set_hash() != previous
+    with _lock:
+        if changed:
+            _fragments.clear()
+        if _active_builds == 0:
+            _session_start = time.time()
+        _active_builds += 1
+    _stats.set({'hits': 0, 'renders': 0})
+
+
+def finish_fragment_cache(prune=False):
+    """
+    一轮构建结束（与 refresh_fragment_cache 成对调用）
+
+    prune 为 True（完整构建成功）且启用了磁盘缓存时，删除这批构建开始以来没有用到的磁盘片段，返回删除数
+    """
+    global _active_builds
+    with _lock:
+        _active_builds = max(0, _active_builds - 1)
+        since = _session_start
+    if not (prune and _persistent):
+        return 0
+
+    removed = 0
+    for cache_file in get_cache_dir('fragments').glob("*.html"):
+        try:
+            if cache_file.stat().st_mtime < since:
+                cache_file.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _remember(key, html):
+    """放入内存缓存，超出容量时丢弃最久未用的片段"""
+    with _lock:
+        _fragments[key] = html
+        _fragments.move_to_end(key)
+        while len(_fragments) > MAX_MEMORY_FRAGMENTS:
+            _fragments.popitem(last=False)
+
+
+def get_fragment_stats():
+    """获取片段缓存命中统计"""
+    return dict(_current_stats())
+
+
+def get_template_set_hash():
+    """计算当前站点模板目录的内容签名"""
+    template_dir = templates_path()
+    template_set_hash = _template_set_hashes.get(template_dir)
+    if template_set_hash is None:
+        h = hashlib.sha256()
+        for template_file in sorted(template_dir.rglob('*.html')):
+            h.update(str(template_file.relative_to(template_dir)).encode('utf-8'))
+            h.update(template_file.read_bytes())
+        template_set_hash = _template_set_hashes[template_dir] = h.hexdigest()
+    return template_set_hash
+
+
+def _update_digest(h, value):
+    """把上下文中的值按稳定顺序写入摘要"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        h.update(f"{type(value).__name__}:{value!r};".encode('utf-8'))
+    elif isinstance(value, CardView):
+        h.update(b'view(')
+        _update_digest(h, value.card)
+        _update_digest(h, value.image)
+        _update_digest(h, value.url)
+        _update_digest(h, value.summary)
+        _update_digest(h, value.context)
+        _update_digest(h, value.card.term_paths())
+        h.update(b')')
+    elif isinstance(value, Mapping):
+        h.update(b'{')
+        for key in sorted(value, key=str):
+            _update_digest(h, key)
+            _update_digest(h, value[key])
+        h.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        h.update(b'[')
+        for item in value:
+            _update_digest(h, item)
+        h.update(b']')
+    elif dataclasses.is_dataclass(value):
+        h.update(f"{type(value).__name__}(".encode('utf-8'))
+        for field in dataclasses.fields(value):
+            _update_digest(h, field.name)
+            _update_digest(h, getattr(value, field.name))
+        h.update(b')')
+    else:
+        h.update(repr(value).encode('utf-8'))
+
+
+def fragment_key(template_name, url_base, context):
+    """片段缓存键：模板名 + 模板集合签名 + URL 基准 + 上下文摘要"""
+    h = hashlib.sha256()
+    _update_digest(h, template_name)
+    _update_digest(h, get_template_set_hash())
+    _update_digest(h, url_base)
+    _update_digest(h, context)
+    return h.hexdigest()
+
+
+def _touch(cache_file):
+    """更新磁盘片段的修改时间，标记为本轮用到（完整构建后据此清理）"""
+    try:
+        os.utime(cache_file)
+    except OSError:
+        pass
+
+
+def render_fragment(template_name, url_base='', **context):
+    """渲染模板片段，命中缓存时直接返回"""
+    key = fragment_key(template_name, url_base, context)
+
+    stats = _current_stats()
+    cache_file = get_cache_dir('fragments') / f"{key}.html" if _persistent else None
+    with _lock:
+        html = _fragments.get(key)
+        if html is not None:
+            _fragments.move_to_end(key)
+    if html is not None:
+        stats['hits'] += 1
+        if cache_file is not None:
+            _touch(cache_file)
+        return html
+
+    if cache_file is not None:
+        try:
+            html = cache_file.read_text(encoding='utf-8')
+        except OSError:
+            html = None
+        if html is not None:
+            _touch(cache_file)
+            _remember(key, html)
+            stats['hits'] += 1
+            return html
+
+    env = setup_template_env()
+    html = env.get_template(template_name).render(**context)
+    _remember(key, html)
+    stats['renders'] += 1
+
+    if cache_file is not None:
+        write_atomic(cache_file, html)
+
+    return html
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+代码高亮缓存
+按 (语言, 代码, 样式, 选项) 缓存 Pygments 高亮结果，跨文章、跨构建复用；
+配套的高亮样式表只生成一份带指纹的 CSS 文件
+"""
+
+import json
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+
+from .cache import get_cache_dir, hash_text, write_atomic
+from .site import html_path
+
+# 与 mdconfig 中 pymdownx.highlight 的配置保持一致
+HIGHLIGHT_STYLE = 'default'
+HIGHLIGHT_CSS_CLASS = 'highlight'
+
+# 样式表输出目录（相对 html/）
+ASSET_DIR = Path("assets") / "css"
+
+# 内存缓存：键 -> 高亮后的 HTML（多个站点共用）
+_highlight_cache = {}
+# 命中统计（按构建上下文区分）
+_stats = ContextVar('highlight_stats')
+
+
+def _current_stats():
+    stats = _stats.get(None)
+    if stats is None:
+        stats = {'hits': 0, 'renders': 0}
+        _stats.set(stats)
+    return stats
+
+
+def get_highlight_stats():
+    """获取代码高亮缓存命中统计"""
+    return dict(_current_stats())
+
+
+def reset_highlight_stats():
+    """重置命中统计（每轮构建开始时调用）"""
+    _stats.set({'hits': 0, 'renders': 0})
+
+
+@lru_cache(maxsize=None)
+def _library_versions():
+    # 只在渲染 Markdown 时调用，此时 pygments/pymdownx 已由 Markdown 扩展导入；
+    # 未安装 Pygments 时 pymdownx 输出不着色的代码块，版本记为空
+    import pymdownx
+    try:
+        import pygments
+    except ImportError:
+        return '', pymdownx.__version__
+    return pygments.__version__, pymdownx.__version__
+
+
+def highlight_key(src, language, options, classes, id_value, attrs):
+    """高亮缓存键：Pygments/pymdownx 版本 + 样式 + 语言 + 代码 + 代码块选项"""
+    return hash_text(
+        *_library_versions(), HIGHLIGHT_STYLE, HIGHLIGHT_CSS_CLASS,
+        language, src,
+        json.dumps(options, sort_keys=True),
+        json.dumps(classes),
+        id_value,
+        json.dumps(attrs, sort_keys=True)
+    )
+
+
+def cached_highlight_format(src, language, class_name, options, md, **kwargs):
+    """
+    superfences 默认代码块的格式化函数（name 为 '*' 的自定义 fence），
+    命中缓存时跳过词法分析器查找和 Pygments 分词
+    """
+    classes = kwargs.get('classes') or []
+    id_value = kwargs.get('id_value') or ''
+    attrs = kwargs.get('attrs') or {}
+    key = highlight_key(src, language, options, classes, id_value, attrs)
+
+    stats = _current_stats()
+    html = _highlight_cache.get(key)
+    if html is not None:
+        stats['hits'] += 1
+        return html
+
+    cache_file = get_cache_dir('highlight') / f"{key}.html"
+    if cache_file.exists():
+        html = cache_file.read_text(encoding='utf-8')
+        stats['hits'] += 1
+    else:
+        fenced = md.preprocessors['fenced_code_block']
+        html = fenced.highlight(src=src, language=language, options=dict(options), md=md, **kwargs)
+        write_atomic(cache_file, html)
+        stats['renders'] += 1
+
+    _highlight_cache[key] = html
+    return html
+
+
+@lru_cache(maxsize=None)
+def _highlight_css():
+    """与高亮配置匹配的 Pygments 样式（进程内只生成一次），未安装 Pygments 时返回 None"""
+    try:
+        from pygments.formatters import HtmlFormatter
+    except ImportError:
+        print("⚠️ 未安装 Pygments，代码块不着色，跳过高亮样式表")
+        return None
+    css = HtmlFormatter(style=HIGHLIGHT_STYLE).get_style_defs(f'.{HIGHLIGHT_CSS_CLASS}')
+    return css, ASSET_DIR / f"highlight.{hash_text(css)[:10]}.css"
+
+
+def get_highlight_stylesheet():
+    """确保当前站点输出目录中有高亮样式表，返回相对输出目录的路径；未安装 Pygments 时返回 None"""
+    highlight_css = _highlight_css()
+    if highlight_css is None:
+        return None
+    css, relative = highlight_css
+
+    target = html_path(relative)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for old_file in target.parent.glob("highlight.*.css"):
+            old_file.unlink()
+        write_atomic(target, css + '\n')
+
+    return relative.as_posix()
+
+
+def get_highlight_stylesheet_url(html_content, url_base='../../'):
+    """页面含高亮代码块时返回样式表地址（相对页面），否则返回空字符串"""
+    if f'class="{HIGHLIGHT_CSS_CLASS}' not in html_content:
+        return ''
+    stylesheet = get_highlight_stylesheet()
+    return url_base + stylesheet if stylesheet else ''
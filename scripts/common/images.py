@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片处理
+构建时读取图片头获取尺寸、计算低清占位图（按内容哈希缓存），并为 <img> 补充 width/height 和加载属性
+"""
+
+import base64
+import json
+import re
+import struct
+import threading
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote
+
+from .cache import get_cache_dir, hash_file, write_atomic
+
+# 占位图依赖 Pillow（解码）和 NumPy（降采样），只在需要计算占位图时导入，未安装时跳过
+np = None
+Image = None
+
+# 占位图横向像素数，纵向按原图比例计算
+PLACEHOLDER_WIDTH = 8
+
+# 图片元数据缓存：{"files": {路径: [mtime_ns, size, 哈希]}, "images": {哈希: {...}}}
+_index = None
+_index_dirty = False
+# 并发构建多个站点时保护索引的读写
+_index_lock = threading.Lock()
+
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+ATTR_PATTERN = re.compile(r'([\w:-]+)\s*=\s*("[^"]*"|\'[^\']*\')')
+
+
+@lru_cache(maxsize=None)
+def _load_imaging():
+    """按需导入 NumPy 和 Pillow，返回是否可用（先赋值模块再缓存结果，并发构建时不会读到未赋值的模块）"""
+    global np, Image
+    try:
+        import numpy
+        from PIL import Image as PILImage
+    except ImportError:
+        return False
+    np, Image = numpy, PILImage
+    return True
+
+
+def _index_file():
+    return get_cache_dir('images') / "index.json"
+
+
+def _load_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            try:
+                index = json.loads(_index_file().read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                index = {}
+            index.setdefault('files', {})
+            index.setdefault('images', {})
+            _index = index
+    return _index
+
+
+def save_image_cache():
+    """把新增的图片元数据写回缓存文件"""
+    global _index_dirty
+    with _index_lock:
+        if _index is not None and _index_dirty:
+            write_atomic(_index_file(), json.dumps(_index, ensure_ascii=False, sort_keys=True))
+            _index_dirty = False
+
+
+def read_image_size(file_path):
+    """读取图片头获取 (宽, 高)，支持 PNG / GIF / JPEG / WebP，无法识别时返回 None"""
+    with open(file_path, 'rb') as f:
+        head = f.read(32)
+
+        # PNG：IHDR 固定在第 16 字节
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and len(head) >= 24:
+            return struct.unpack('>II', head[16:24])
+
+        # GIF：逻辑屏幕宽高
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+
+        # WebP：VP8 / VP8L / VP8X 三种块
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3fff, height & 0x3fff
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            if chunk == b'VP8X':
+                return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+            return None
+
+        # JPEG：逐段查找 SOF 标记
+        if head[:2] == b'\xff\xd8':
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xff:
+                    return None
+                code = marker[1]
+                if code == 0xff:
+                    f.seek(-1, 1)
+                    continue
+                length_bytes = f.read(2)
+                if len(length_bytes) < 2:
+                    return None
+                length = struct.unpack('>H', length_bytes)[0]
+                if 0xc0 <= code <= 0xcf and code not in (0xc4, 0xc8, 0xcc):
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return width, height
+                f.seek(length - 2, 1)
+
+    return None
+
+
+def get_image_hash(file_path):
+    """获取图片内容哈希（文件未变化时直接复用缓存结果）"""
+    global _index_dirty
+    index = _load_index()
+    file_path = Path(file_path)
+    stat = file_path.stat()
+    key = str(file_path.resolve())
+
+    cached = index['files'].get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    digest = hash_file(file_path)
+    with _index_lock:
+        index['files'][key] = [stat.st_mtime_ns, stat.st_size, digest]
+        _index_dirty = True
+    return digest
+
+
+def get_image_info(file_path):
+    """获取图片元数据 {'hash', 'width', 'height'}，文件不存在或无法识别时返回 None"""
+    global _index_dirty
+    file_path = Path(file_path)
+    if not file_path.is_file():
+        return None
+
+    index = _load_index()
+    digest = get_image_hash(file_path)
+    info = index['images'].get(digest)
+    if info is None:
+        try:
+            size = read_image_size(file_path)
+        except (OSError, struct.error):
+            size = None
+        info = {'width': size[0], 'height': size[1]} if size else {}
+        with _index_lock:
+            index['images'][digest] = info
+            _index_dirty = True
+
+    if not info.get('width'):
+        return None
+    return dict(info, hash=digest)
+
+
+def encode_png(pixels):
+    """把 (高, 宽, 3) 的 uint8 数组编码为 PNG 字节"""
+    height, width, _ = pixels.shape
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    # 每行前加过滤类型 0
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), pixels.reshape(height, width * 3)], axis=1)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(raw.tobytes(), 9))
+        + chunk(b'IEND', b'')
+    )
+
+
+def compute_placeholder(file_path):
+    """
+    计算低清占位图
+
+    Returns:
+        dict: {'color': 主色 '#rrggbb', 'placeholder': 几个像素的 PNG data URI}，
+            依赖缺失或无法解码时返回 None
+    """
+    if not _load_imaging():
+        return None
+
+    with Image.open(file_path) as img:
+        # JPEG 可直接按 DCT 缩放解码，减少像素量
+        img.draft('RGB', (PLACEHOLDER_WIDTH * 16, PLACEHOLDER_WIDTH * 16))
+        img = img.convert('RGBA')
+        background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        pixels = np.asarray(Image.alpha_composite(background, img).convert('RGB'), dtype=np.float32)
+
+    height, width, _ = pixels.shape
+    grid_w = min(PLACEHOLDER_WIDTH, width)
+    grid_h = max(1, min(height, round(grid_w * height / width)))
+
+    # 分块求均值：裁掉除不尽的边缘后 reshape 成 (grid_h, 块高, grid_w, 块宽, 3)
+    block_h, block_w = height // grid_h, width // grid_w
+    blocks = pixels[:grid_h * block_h, :grid_w * block_w].reshape(grid_h, block_h, grid_w, block_w, 3)
+    thumb = blocks.mean(axis=(1, 3)).round().astype(np.uint8)
+
+    color = thumb.reshape(-1, 3).mean(axis=0).round().astype(int)
+    data_uri = "data:image/png;base64," + base64.b64encode(encode_png(thumb)).decode('ascii')
+
+    return {
+        'color': '#{:02x}{:02x}{:02x}'.format(*color),
+        'placeholder': data_uri,
+    }
+
+
+def get_image_meta(file_path):
+    """
+    获取卡片图片的全部构建期元数据
+
+    Returns:
+        dict: {'width', 'height', 'color', 'placeholder'}，未知字段为 0 或空字符串
+    """
+    global _index_dirty
+    meta = {'width': 0, 'height': 0, 'color': '', 'placeholder': ''}
+    info = get_image_info(file_path)
+    if not info:
+        return meta
+    meta.update(width=info['width'], height=info['height'])
+
+    cached = _load_index()['images'][info['hash']]
+    if 'placeholder' not in cached and _load_imaging():
+        try:
+            placeholder = compute_placeholder(file_path) or {}
+        except Exception as e:
+            print(f"⚠️ 生成占位图失败 {file_path}: {e}")
+            placeholder = {}
+        with _index_lock:
+            cached['color'] = placeholder.get('color', '')
+            cached['placeholder'] = placeholder.get('placeholder', '')
+            _index_dirty = True
+
+    meta.update(color=cached.get('color', ''), placeholder=cached.get('placeholder', ''))
+    return meta
+
+
+def get_image_size(file_path):
+    """获取图片 (宽, 高)，未知时返回 (0, 0)"""
+    info = get_image_info(file_path)
+    if not info:
+        return 0, 0
+    return info['width'], info['height']
+
+
+def resolve_local_image(src, base_dir):
+    """把相对地址解析为数据目录中的文件，远程/内联图片返回 None"""
+    if not src or base_dir is None or src.startswith(('http:', 'https:', 'data:', '//', '/')):
+        return None
+    path = unquote(src.split('#')[0].split('?')[0])
+    if path.startswith('./'):
+        path = path[2:]
+    return Path(base_dir) / path
+
+
+def add_image_attributes(html, base_dir=None, eager_count=1):
+    """
+    为 HTML 中的 <img> 补充尺寸与加载属性
+
+    Args:
+        html (str): 待处理的 HTML
+        base_dir (Path): 相对图片地址对应的数据目录
+        eager_count (int): 前几张图片视为首屏图片，不做延迟加载；
+            第一张图片同时加上 fetchpriority="high"
+
+    Returns:
+        str: 处理后的 HTML
+    """
+    position = [0]
+
+    def rewrite(match):
+        tag = match.group(0)
+        attrs = {name.lower() for name, _ in ATTR_PATTERN.findall(tag)}
+        src_match = re.search(r'\bsrc\s*=\s*("([^"]*)"|\'([^\']*)\')', tag, re.IGNORECASE)
+        src = (src_match.group(2) or src_match.group(3) or '') if src_match else ''
+
+        extra = []
+        if 'width' not in attrs and 'height' not in attrs:
+            image_file = resolve_local_image(src, base_dir)
+            if image_file is not None:
+                width, height = get_image_size(image_file)
+                if width:
+                    extra.append(f'width="{width}" height="{height}"')
+
+        index = position[0]
+        position[0] += 1
+        if index < eager_count:
+            if index == 0 and 'fetchpriority' not in attrs:
+                extra.append('fetchpriority="high"')
+        elif 'loading' not in attrs:
+            extra.append('loading="lazy"')
+        if 'decoding' not in attrs:
+            extra.append('decoding="async"')
+
+        if not extra:
+            return tag
+        closing = '/>' if tag.endswith('/>') else '>'
+        body = tag[:-len(closing)].rstrip()
+        return f"{body} {' '.join(extra)} {closing}" if closing == '/>' else f"{body} {' '.join(extra)}>"
+
+    return IMG_TAG_PATTERN.sub(rewrite, html)
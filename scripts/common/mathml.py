@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建时公式转换
+arithmatex（通用模式）输出的 \\( \\) / \\[ \\] 公式在构建时用 latex2mathml 转为 MathML，
+浏览器原生渲染，页面不再加载 MathJax。转换结果按公式内容缓存，跨文章、跨构建复用。
+
+data/frame.json 中设置 "math_render": "mathml" 时启用（默认 "mathjax"，保持客户端渲染）；
+latex2mathml 未安装、公式含不支持的命令或转换失败时保留原始标记，该页面继续由 MathJax 渲染
+"""
+
+import html
+import re
+import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
+
+from .cache import get_cache_dir, hash_text, write_atomic
+from .config import load_frame_config
+
+# arithmatex 通用模式的输出
+ARITHMATEX_CLASS = 'arithmatex'
+MATH_PATTERN = re.compile(
+    r'<span class="arithmatex">\\\((.*?)\\\)</span>|<div class="arithmatex">\\\[(.*?)\\\]</div>',
+    re.DOTALL
+)
+
+# 转换失败的缓存标记（不支持的公式不必每次构建都重试）
+FAILED_MARK = '\0'
+
+# latex2mathml 只在启用 MathML 模式且页面含公式时导入
+converter = None
+
+# 内存缓存：键 -> MathML，转换失败为 None（多个站点共用）
+_mathml_cache = {}
+
+
+@lru_cache(maxsize=None)
+def _load_converter():
+    """按需导入 latex2mathml，返回是否可用（先赋值模块再缓存结果，并发构建时不会读到未赋值的模块）"""
+    global converter
+    try:
+        import latex2mathml.converter as latex2mathml_converter
+    except ImportError:
+        print("⚠️ 未安装 latex2mathml，公式继续由 MathJax 渲染")
+        return False
+    converter = latex2mathml_converter
+    return True
+
+
+def is_enabled():
+    """是否在构建时转换公式（data/frame.json 的 math_render 为 mathml）"""
+    return load_frame_config('home').get('math_render', 'mathjax') == 'mathml'
+
+
+@lru_cache(maxsize=None)
+def _library_version():
+    from importlib.metadata import version
+    return version('latex2mathml')
+
+
+def _is_valid_mathml(mathml):
+    """转换结果是合法的 XML，且没有原样保留的未知命令（如 <mi>\\foo</mi>）"""
+    try:
+        root = ElementTree.fromstring(mathml)
+    except ElementTree.ParseError:
+        return False
+    return not any((element.text or '').startswith('\\') for element in root.iter())
+
+
+def latex_to_mathml(latex, display):
+    """
+    把一个公式转为 MathML（按 latex2mathml 版本 + 显示方式 + 公式缓存）
+
+    Args:
+        latex (str): 公式源码（已反转义 HTML 实体）
+        display (str): inline 或 block
+
+    Returns:
+        str: MathML，无法转换时返回 None
+    """
+    key = hash_text(_library_version(), display, latex)
+    if key in _mathml_cache:
+        return _mathml_cache[key]
+
+    cache_file = get_cache_dir('mathml') / f"{key}.html"
+    if cache_file.exists():
+        mathml = cache_file.read_text(encoding='utf-8')
+    else:
+        try:
+            mathml = converter.convert(latex, display=display)
+        except Exception:
+            mathml = ''
+        if not mathml or not _is_valid_mathml(mathml):
+            print(f"⚠️ 公式无法转换为 MathML，保留给 MathJax 渲染: {latex.strip()[:60]}")
+            mathml = FAILED_MARK
+        write_atomic(cache_file, mathml)
+
+    result = None if mathml == FAILED_MARK else mathml
+    _mathml_cache[key] = result
+    return result
+
+
+def render_math(html_content):
+    """启用 MathML 模式时把 arithmatex 公式替换为 MathML，转换失败的公式原样保留"""
+    if f'class="{ARITHMATEX_CLASS}"' not in html_content or not is_enabled() or not _load_converter():
+        return html_content
+
+    def replace(match):
+        inline, block = match.groups()
+        display = 'inline' if block is None else 'block'
+        mathml = latex_to_mathml(html.unescape(inline if block is None else block), display)
+        return mathml or match.group(0)
+
+    return MATH_PATTERN.sub(replace, html_content)
+
+
+def needs_mathjax(html_content):
+    """页面中还有未转换的公式时才需要加载 MathJax"""
+    return f'class="{ARITHMATEX_CLASS}' in html_content
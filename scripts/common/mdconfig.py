@@ -2,11 +2,15 @@
 # -*- coding: utf-8 -*-
 """
 Markdown 渲染统一配置
-支持数学公式、Mermaid 图表等扩展功能
+支持数学公式、Mermaid 图表等扩展功能（公式可在构建时转为 MathML，见 mathml.py）
+markdown/pymdownx/Pygments 在第一次渲染时才导入，不渲染 Markdown 的目标不承担导入开销
 """
 
-import markdown
-from pymdownx.superfences import fence_div_format
+import threading
+
+from .highlight import HIGHLIGHT_CSS_CLASS, HIGHLIGHT_STYLE, cached_highlight_format
+from .images import add_image_attributes
+from .mathml import render_math
 
 
 def get_markdown_config():
@@ -18,6 +22,8 @@ def get_markdown_config():
             - extensions: 扩展列表
             - extension_configs: 扩展配置字典
     """
+    from pymdownx.superfences import fence_div_format, highlight_validator
+
     extensions = [
         'pymdownx.superfences', # 增强代码块（支持 Mermaid）- 必须在最前面
         'pymdownx.highlight',   # 代码高亮（与 superfences 兼容）
@@ -35,6 +41,13 @@ def get_markdown_config():
         },
         'pymdownx.superfences': {
             'custom_fences': [
+                {
+                    # 普通代码块：高亮结果按代码内容缓存
+                    'name': '*',
+                    'class': HIGHLIGHT_CSS_CLASS,
+                    'format': cached_highlight_format,
+                    'validator': highlight_validator
+                },
                 {
                     'name': 'mermaid',
                     'class': 'mermaid',
@@ -46,30 +59,45 @@ def get_markdown_config():
         'pymdownx.highlight': {
             'use_pygments': True,
             'noclasses': False,
-            'pygments_style': 'default',
-            'css_class': 'highlight'
+            'pygments_style': HIGHLIGHT_STYLE,
+            'css_class': HIGHLIGHT_CSS_CLASS
         }
     }
     
     return extensions, extension_configs
 
 
-def markdown_to_html(md_content):
+# 每个线程一个 Markdown 实例（实例带转换状态，不能跨线程共用）
+_local = threading.local()
+
+
+def get_markdown():
+    """获取当前线程共享的 Markdown 实例（扩展只初始化一次，每次转换前 reset）"""
+    md = getattr(_local, 'markdown', None)
+    if md is None:
+        import markdown
+        extensions, extension_configs = get_markdown_config()
+        md = _local.markdown = markdown.Markdown(extensions=extensions, extension_configs=extension_configs)
+    return md
+
+
+def markdown_to_html(md_content, base_dir=None):
     """
     将 Markdown 内容转换为 HTML
     
     Args:
         md_content (str): Markdown 格式的内容
+        base_dir (Path): 文章数据目录，用于读取相对路径图片的尺寸
         
     Returns:
-        str: 转换后的 HTML 内容
+        str: 转换后的 HTML 内容（图片已补充尺寸和加载属性，启用 MathML 模式时公式已转换）
     """
-    extensions, extension_configs = get_markdown_config()
-    
-    html_content = markdown.markdown(
-        md_content,
-        extensions=extensions,
-        extension_configs=extension_configs
-    )
+    html_content = get_markdown().reset().convert(md_content)
+
+    # 后处理：图片补充 width/height、loading、decoding 属性
+    html_content = add_image_attributes(html_content, base_dir)
+
+    # 后处理：构建时把公式转为 MathML（未启用或转换失败时保留给 MathJax）
+    html_content = render_math(html_content)
     
     return html_content
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 压缩
+去掉模板缩进、注释和多余空白，同时压缩内联 CSS / JS。
+<pre>、<textarea>、Mermaid 和 MathJax（arithmatex）块内容保持原样。
+"""
+
+import re
+
+# 内容必须原样保留的元素
+PRESERVE_PATTERN = re.compile(
+    r'<(pre|textarea)\b.*?</\1\s*>'
+    r'|<(span|div)\b[^>]*\bclass\s*=\s*["\'][^"\']*\b(?:arithmatex|mermaid)\b[^"\']*["\'][^>]*>.*?</\2\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+SCRIPT_PATTERN = re.compile(r'(<script\b([^>]*)>)(.*?)(</script\s*>)', re.IGNORECASE | re.DOTALL)
+STYLE_PATTERN = re.compile(r'(<style\b[^>]*>)(.*?)(</style\s*>)', re.IGNORECASE | re.DOTALL)
+# 普通注释；保留 IE 条件注释和 SSI 指令（<!--# ... -->）
+COMMENT_PATTERN = re.compile(r'<!--(?!\[if|#)(?!<!).*?-->', re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+CSS_COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_PUNCTUATION_PATTERN = re.compile(r'\s*([{};,])\s*')
+
+# 只有这些 type 的 <script> 会被当作 JS 压缩
+JS_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+
+
+def minify_css(css):
+    """压缩 CSS：去注释、合并空白、去掉标点两侧的空格"""
+    css = CSS_COMMENT_PATTERN.sub('', css)
+    css = WHITESPACE_PATTERN.sub(' ', css)
+    css = CSS_PUNCTUATION_PATTERN.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    """
+    保守地压缩 JS：去掉行首尾空白、空行和整行注释。
+    含模板字符串（反引号）的脚本原样返回，避免改动多行字符串
+    """
+    if '`' in js:
+        return js
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def _script_type(attrs):
+    match = re.search(r'\btype\s*=\s*["\']([^"\']*)["\']', attrs, re.IGNORECASE)
+    return match.group(1).strip().lower() if match else ''
+
+
+def minify_html(html):
+    """压缩 HTML，返回压缩后的字符串"""
+    preserved = []
+
+    def stash(text):
+        preserved.append(text)
+        return f"\x00{len(preserved) - 1}\x00"
+
+    def stash_script(match):
+        opening, attrs, body, closing = match.groups()
+        if _script_type(attrs) in JS_TYPES:
+            body = minify_js(body)
+        return stash(opening + body + closing)
+
+    def stash_style(match):
+        opening, body, closing = match.groups()
+        return stash(opening + minify_css(body) + closing)
+
+    html = SCRIPT_PATTERN.sub(stash_script, html)
+    html = STYLE_PATTERN.sub(stash_style, html)
+    html = PRESERVE_PATTERN.sub(lambda m: stash(m.group(0)), html)
+    html = COMMENT_PATTERN.sub('', html)
+
+    # 空白折叠为一个字符（含换行的保留一个换行，渲染效果等同空格）
+    html = WHITESPACE_PATTERN.sub(lambda m: '\n' if '\n' in m.group(0) else ' ', html).strip()
+
+    return re.sub(r'\x00(\d+)\x00', lambda m: preserved[int(m.group(1))], html)
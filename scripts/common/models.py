@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容模型
+Card / Article / FrameConfig 的紧凑只读结构，加载时按 CARD_FIELDS_GUIDE.md 校验
+"""
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from .cache import hash_text
+from .site import get_site
+
+# 卡片字段规则（与 CARD_FIELDS_GUIDE.md 保持一致）
+CARD_SCHEMAS = {
+    'blog': {
+        'required': {'title': str, 'summary': str, 'date': str, 'status': str},
+        'optional': {'id': str, 'image': str, 'category': str, 'tags': list, 'aliases': list},
+        'visible_status': ('published',),
+    },
+    'project': {
+        'required': {'title': str, 'summary': str, 'date': str, 'status': str},
+        'optional': {
+            'id': str, 'technologies': list, 'image': str,
+            'github_url': str, 'demo_url': str, 'category': str, 'aliases': list
+        },
+        'visible_status': ('published', 'completed', 'in-development'),
+    },
+}
+
+# 日期格式：YYYY-MM 或 YYYY-MM-DD
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}(-\d{2})?$')
+
+# 图片/链接在不同页面中的相对位置
+VIEW_CONTEXTS = ('article', 'list', 'home', 'taxonomy', 'related')
+
+# 各视图中摘要的最大长度（None 表示不截断）
+SUMMARY_LIMITS = {'article': None, 'list': None, 'home': 80, 'taxonomy': None, 'related': 80}
+
+# 分类法：类型 -> 卡片字段（项目的技术栈充当标签）
+TAXONOMY_FIELDS = {
+    'blog': {'category': 'category', 'tag': 'tags'},
+    'project': {'category': 'category', 'tag': 'technologies'},
+}
+
+# 分类法页面目录（相对模块输出目录）
+TAXONOMY_DIRS = {'category': 'categories', 'tag': 'tags'}
+
+# 文件名中不能出现的字符
+TERM_UNSAFE_PATTERN = re.compile(r'[\s/\\?#%&:*"<>|]+')
+# 分页文件名：<文件名>-<页码>
+TERM_PAGE_PATTERN = re.compile(r'^(.*)-(\d+)$')
+
+# 分类/标签文件名：(数据目录, 模块, 分类法) -> {名称: 文件名}，加载文章时按模块的全部取值分配
+_term_slugs = {}
+
+
+class CardValidationError(ValueError):
+    """card.json 不符合字段规则"""
+
+
+def term_slug(name):
+    """分类/标签名对应的文件名（避开各目录的 index.html）"""
+    slug = TERM_UNSAFE_PATTERN.sub('-', name).strip('-') or '-'
+    return f"{slug}-" if slug == 'index' else slug
+
+
+def assign_term_slugs(names):
+    """
+    为同一模块、同一分类法的全部取值分配互不冲突的文件名
+
+    规整后重名（不区分大小写，如 C# 与 C、a b 与 a-b）或与其他取值的分页文件重名
+    （如 foo-2 与 foo 的第 2 页）的取值加上名称哈希后缀；名称本身就是合法文件名的取值保留原文件名
+
+    Returns:
+        dict: {名称: 文件名}
+    """
+    base = {name: term_slug(name) for name in sorted(set(names))}
+    groups = {}
+    for name, slug in base.items():
+        groups.setdefault(slug.casefold(), []).append(name)
+
+    def is_other_page(slug):
+        match = TERM_PAGE_PATTERN.match(slug)
+        return match is not None and match.group(1).casefold() in groups
+
+    slugs = {}
+    for key, group in groups.items():
+        if is_other_page(key):
+            keeper = None
+        elif len(group) == 1:
+            keeper = group[0]
+        else:
+            keeper = next((name for name in group if name == base[name]), None)
+        for name in group:
+            if name == keeper:
+                slugs[name] = base[name]
+
+    used = {slug.casefold() for slug in slugs.values()}
+    for name, slug in base.items():
+        if name in slugs:
+            continue
+        digest = hash_text(name)
+        length = 6
+        while f"{slug}-{digest[:length]}".casefold() in used:
+            length += 1
+        slugs[name] = f"{slug}-{digest[:length]}"
+        used.add(slugs[name].casefold())
+    return slugs
+
+
+def register_term_slugs(section, cards):
+    """按模块的全部卡片分配分类/标签文件名，有冲突被改名的取值时给出提示"""
+    for kind in TAXONOMY_DIRS:
+        slugs = assign_term_slugs(name for card in cards for name in card.terms(kind))
+        key = (get_site().data_dir, section, kind)
+        if _term_slugs.get(key) != slugs:
+            for name, slug in slugs.items():
+                if slug != term_slug(name):
+                    print(f"⚠️ {section} 的分类/标签文件名冲突：{name} → {TAXONOMY_DIRS[kind]}/{slug}.html")
+        _term_slugs[key] = slugs
+
+
+def term_page_path(section, kind, name, page=1):
+    """分类/标签第 page 页相对模块输出目录的路径"""
+    slugs = _term_slugs.get((get_site().data_dir, section, kind), {})
+    slug = slugs.get(name) or term_slug(name)
+    suffix = f"-{page}" if page > 1 else ""
+    return f"{TAXONOMY_DIRS[kind]}/{slug}{suffix}.html"
+
+
+def trim_summary(text, limit):
+    """按字符数截断摘要，超出部分以省略号结尾"""
+    text = text.strip()
+    if limit is None or len(text) <= limit:
+        return text
+    return text[:limit].rstrip(' ，,。.…') + '…'
+
+
+def validate_card_data(card_data, card_type):
+    """按字段规则校验 card.json，返回问题列表"""
+    schema = CARD_SCHEMAS[card_type]
+    problems = []
+
+    if not isinstance(card_data, Mapping):
+        return ["card.json 顶层必须是对象"]
+
+    for field, field_type in schema['required'].items():
+        value = card_data.get(field)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            problems.append(f"缺少必填字段 `{field}`")
+        elif not isinstance(value, field_type):
+            problems.append(f"字段 `{field}` 应为 {field_type.__name__}")
+
+    for field, field_type in schema['optional'].items():
+        value = card_data.get(field)
+        if value is None:
+            continue
+        # 数组字段加载后为只读的 tuple
+        if not isinstance(value, (list, tuple) if field_type is list else field_type):
+            problems.append(f"字段 `{field}` 应为 {field_type.__name__}")
+        elif field_type is list and not all(isinstance(item, str) for item in value):
+            problems.append(f"字段 `{field}` 只能包含字符串")
+
+    date = card_data.get('date')
+    if isinstance(date, str) and date and not DATE_PATTERN.match(date):
+        problems.append(f"日期 `{date}` 应为 YYYY-MM-DD 或 YYYY-MM")
+
+    return problems
+
+
+@dataclass(frozen=True)
+class Card:
+    """博客/项目卡片（只读）"""
+    __slots__ = (
+        'type', 'slug', 'id', 'title', 'summary', 'date', 'status', 'image', 'image_asset',
+        'image_width', 'image_height', 'image_color', 'image_placeholder',
+        'category', 'tags', 'technologies', 'github_url', 'demo_url', 'aliases'
+    )
+
+    type: str
+    slug: str
+    id: str
+    title: str
+    summary: str
+    date: str
+    status: str
+    image: str
+    image_asset: str
+    image_width: int
+    image_height: int
+    image_color: str
+    image_placeholder: str
+    category: str
+    tags: tuple
+    technologies: tuple
+    github_url: str
+    demo_url: str
+    aliases: tuple
+
+    @classmethod
+    def from_dict(cls, card_data, card_type, slug, image_meta=None):
+        """从 card.json 数据创建卡片，不合法时抛出 CardValidationError
+
+        image_meta 为本地封面图的构建期元数据（尺寸、主色、占位图），见 images.get_image_meta，
+        其中 asset 为封面在内容寻址存储中的路径（相对输出目录）
+        """
+        problems = validate_card_data(card_data, card_type)
+        if problems:
+            raise CardValidationError("；".join(problems))
+
+        # 本地图片统一去掉 ./ 前缀，具体路径由视图决定
+        image = card_data.get('image') or ''
+        if image.startswith('./'):
+            image = image[2:]
+        image_meta = image_meta or {}
+
+        return cls(
+            type=card_type,
+            slug=slug,
+            id=card_data.get('id') or slug,
+            title=card_data['title'],
+            summary=card_data['summary'],
+            date=card_data['date'],
+            status=card_data['status'],
+            image=image,
+            image_asset=image_meta.get('asset', ''),
+            image_width=image_meta.get('width', 0),
+            image_height=image_meta.get('height', 0),
+            image_color=image_meta.get('color', ''),
+            image_placeholder=image_meta.get('placeholder', ''),
+            category=card_data.get('category', ''),
+            tags=tuple(card_data.get('tags', ())),
+            technologies=tuple(card_data.get('technologies', ())),
+            github_url=card_data.get('github_url', ''),
+            demo_url=card_data.get('demo_url', ''),
+            aliases=tuple(card_data.get('aliases', ())),
+        )
+
+    @property
+    def is_visible(self):
+        """是否在列表和首页中显示"""
+        return self.status in CARD_SCHEMAS[self.type]['visible_status']
+
+    @property
+    def has_local_image(self):
+        return bool(self.image) and not self.image.startswith('http')
+
+    @staticmethod
+    def local_image_name(card_data):
+        """card.json 中本地封面图的文件名，远程图片或未配置时返回空字符串"""
+        image = (card_data.get('image') or '') if isinstance(card_data, Mapping) else ''
+        if not isinstance(image, str) or image.startswith('http'):
+            return ''
+        return image[2:] if image.startswith('./') else image
+
+    def section_url(self, context):
+        """获取指定页面到模块输出目录（html/<type>/）的相对前缀"""
+        if context in ('article', 'taxonomy', 'related'):
+            return "../"
+        if context == 'list':
+            return ""
+        return f"{self.type}/"
+
+    def root_url(self, context):
+        """获取指定页面到输出根目录（html/）的相对前缀"""
+        if context == 'home':
+            return ""
+        return self.section_url(context) + "../"
+
+    def image_url(self, context):
+        """获取指定页面中的图片地址（已放入内容寻址存储的封面指向 _assets/）"""
+        if not self.has_local_image:
+            return self.image
+        if self.image_asset:
+            return self.root_url(context) + self.image_asset
+        if context == 'article':
+            return f"./{self.image}"
+        return f"{self.section_url(context)}{self.slug}/{self.image}"
+
+    def page_url(self, context):
+        """获取指定页面中的内容页地址"""
+        if context == 'article':
+            return "content.html"
+        return f"{self.section_url(context)}{self.slug}/content.html"
+
+    def terms(self, kind):
+        """获取卡片在某个分类法下的取值（category 至多一个）"""
+        value = getattr(self, TAXONOMY_FIELDS[self.type][kind])
+        if kind == 'category':
+            return (value,) if value else ()
+        return tuple(term for term in value if isinstance(term, str) and term.strip())
+
+    def term_url(self, kind, name, context):
+        """获取指定页面中分类/标签页的地址"""
+        return self.section_url(context) + term_page_path(self.type, kind, name)
+
+    def term_paths(self):
+        """卡片全部分类/标签页相对模块输出目录的路径（文件名取决于同模块的全部取值）"""
+        return tuple(term_page_path(self.type, kind, name) for kind in TAXONOMY_DIRS for name in self.terms(kind))
+
+    def view(self, context):
+        """获取指定页面使用的卡片视图"""
+        if context not in VIEW_CONTEXTS:
+            raise ValueError(f"未知的视图: {context}")
+        return CardView(
+            self,
+            self.image_url(context),
+            self.page_url(context),
+            trim_summary(self.summary, SUMMARY_LIMITS[context]),
+            context
+        )
+
+
+class CardView:
+    """卡片在某一页面中的视图，只覆盖 image、url 和 summary，其余字段取自卡片"""
+    __slots__ = ('card', 'image', 'url', 'summary', 'context')
+
+    def __init__(self, card, image, url, summary, context):
+        self.card = card
+        self.image = image
+        self.url = url
+        self.summary = summary
+        self.context = context
+
+    def __getattr__(self, name):
+        if name == 'card':
+            raise AttributeError(name)
+        return getattr(self.card, name)
+
+    @property
+    def category_url(self):
+        """当前页面中分类页的地址，没有分类时为空字符串"""
+        if not self.card.category:
+            return ''
+        return self.card.term_url('category', self.card.category, self.context)
+
+    def tag_url(self, name):
+        """当前页面中标签页的地址"""
+        return self.card.term_url('tag', name, self.context)
+
+
+@dataclass(frozen=True)
+class Article:
+    """文章：卡片 + 数据目录 + Markdown 正文（只读）"""
+    __slots__ = ('card', 'source_dir', 'markdown')
+
+    card: Card
+    source_dir: object
+    markdown: str
+
+    @property
+    def has_content(self):
+        return self.markdown is not None
+
+
+# FrameConfig 中有固定位置的字段及默认值
+FRAME_FIELDS = {
+    'site_title': '个人主页',
+    'nav_logo': '个人主页',
+    'footer_text': '© 2025 个人主页',
+    'footer_tagline': '',
+    'icp_number': '',
+    'nav_title': '',
+    'page_title': '',
+    'nav_buttons': (),
+    'footer_extra': '',
+}
+
+
+@dataclass(frozen=True)
+class FrameConfig:
+    """合并后的页面框架配置（只读）"""
+    __slots__ = tuple(FRAME_FIELDS) + ('extra',)
+
+    site_title: str
+    nav_logo: str
+    footer_text: str
+    footer_tagline: str
+    icp_number: str
+    nav_title: str
+    page_title: str
+    nav_buttons: tuple
+    footer_extra: str
+    extra: MappingProxyType
+
+    @classmethod
+    def from_dict(cls, frame_data):
+        """从合并后的 frame.json 数据创建配置"""
+        values = {}
+        for field, default in FRAME_FIELDS.items():
+            values[field] = frame_data.get(field, default)
+        values['nav_buttons'] = tuple(
+            MappingProxyType(dict(button)) for button in values['nav_buttons']
+        )
+        extra = {k: v for k, v in frame_data.items() if k not in FRAME_FIELDS}
+        return cls(extra=MappingProxyType(extra), **values)
+
+    def get(self, key, default=None):
+        """兼容字典式读取"""
+        if key in FRAME_FIELDS:
+            return getattr(self, key)
+        return self.extra.get(key, default)
+
+    def __contains__(self, key):
+        return key in FRAME_FIELDS or key in self.extra
+
+    def __getattr__(self, name):
+        # 仅在常规属性不存在时调用：读取页面自定义字段（如 pdf_path）
+        try:
+            return object.__getattribute__(self, 'extra')[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def as_dict(self):
+        """导出为可用于模板渲染的新字典"""
+        context = {field: getattr(self, field) for field in FRAME_FIELDS}
+        context.update(self.extra)
+        return context
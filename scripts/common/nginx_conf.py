@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nginx 配置生成
+根据输出清单（build-manifest.json）生成 nginx.conf：文件名带内容哈希的资源长期缓存（immutable），
+HTML 每次重新验证；open_file_cache 按输出文件数设置，预压缩的 .gz 由 gzip_static 直接发送；
+页面框架为 SSI 模式时开启 ssi，片段目录只允许内部访问；
+不存在的地址返回真正的 404，文章目录地址和改名前的旧地址（card.json 的 aliases）精确重定向
+"""
+
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from .assets import is_fingerprinted
+from .build import MANIFEST_NAME, load_build_manifest
+from .chrome import CHROME_DIR, is_ssi_enabled
+from .config import setup_template_env
+from .content import load_articles
+from .precompress import count_precompressed
+from .service_worker import SW_NAME
+
+# 各类文件的 Cache-Control
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+DEFAULT_CACHE = "public, max-age=3600"
+
+# 与 Dockerfile 保持一致
+NGINX_LISTEN = 83
+NGINX_ROOT = "/usr/share/nginx/html"
+
+# open_file_cache 的最小条目数
+OPEN_FILE_CACHE_MIN = 64
+
+# 文章模块：<模块>/<目录名>/content.html 为文章页
+ARTICLE_SECTIONS = ('blog', 'project')
+
+# 不需要加引号的配置值
+PLAIN_VALUE_PATTERN = re.compile(r'^[A-Za-z0-9_./~%+-]+$')
+
+
+def nginx_quote(value):
+    """按需给配置值加引号"""
+    if PLAIN_VALUE_PATTERN.match(value):
+        return value
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def fingerprint_rules(files):
+    """
+    计算需要长期缓存的地址
+
+    目录下的文件全部带哈希时整个目录用一条正则匹配，否则逐个列出
+
+    Returns:
+        tuple: ([目录正则], [文件地址])
+    """
+    by_dir = {}
+    for relative in files:
+        directory = relative.rsplit('/', 1)[0] if '/' in relative else ''
+        by_dir.setdefault(directory, []).append(relative)
+
+    patterns, exact = [], []
+    for directory, items in sorted(by_dir.items()):
+        fingerprinted = [relative for relative in items if is_fingerprinted(relative)]
+        if not fingerprinted:
+            continue
+        if directory and len(fingerprinted) == len(items):
+            patterns.append(f"~^/{re.escape(directory)}/[^/]+$")
+        else:
+            exact.extend(f"/{relative}" for relative in sorted(fingerprinted))
+    return patterns, exact
+
+
+def collect_redirects(files):
+    """
+    计算精确重定向：文章目录地址 -> 文章页，card.json 中 aliases 登记的旧目录 -> 新文章页
+
+    旧目录仍有输出文件（被其他文章占用）时忽略并提示
+
+    Returns:
+        list: [(原地址, 目标地址)]，按原地址排序
+    """
+    redirects = {}
+    for section in ARTICLE_SECTIONS:
+        for article in load_articles(section):
+            slug = article.card.slug
+            target = f"{section}/{slug}/content.html"
+            if target not in files:
+                continue
+
+            sources = []
+            if f"{section}/{slug}/index.html" not in files:
+                sources += [f"{section}/{slug}", f"{section}/{slug}/"]
+            for alias in article.card.aliases:
+                alias = alias.strip('/')
+                if not alias or alias == slug:
+                    continue
+                old = f"{section}/{alias}"
+                if old in files or any(name.startswith(old + '/') for name in files):
+                    print(f"⚠️ {slug} 的旧地址 /{old}/ 与现有输出冲突，已忽略")
+                    continue
+                sources += [old, f"{old}/", f"{old}/content.html"]
+
+            for source in sources:
+                redirects[f"/{source}"] = "/" + quote(target)
+    return sorted(redirects.items())
+
+
+def render_nginx_config(manifest):
+    """根据输出清单渲染 nginx 配置文本"""
+    files = sorted(manifest.get('files', {}))
+    patterns, exact = fingerprint_rules(files)
+
+    # 每个输出文件和它的 .gz 各占一个条目；再留出同样多的位置缓存不存在的地址（open_file_cache_errors）
+    open_files = len(files) + count_precompressed(files)
+    open_file_cache_max = max(OPEN_FILE_CACHE_MIN, open_files * 2)
+
+    template = setup_template_env().get_template('deploy/nginx.conf')
+    return template.render(
+        listen=NGINX_LISTEN,
+        root=NGINX_ROOT,
+        manifest_url=f"/{MANIFEST_NAME}",
+        immutable_cache=IMMUTABLE_CACHE,
+        revalidate_cache=REVALIDATE_CACHE,
+        default_cache=DEFAULT_CACHE,
+        immutable_patterns=patterns,
+        immutable_files=[nginx_quote(url) for url in exact],
+        revalidate_files=[f"/{SW_NAME}"] if SW_NAME in files else [],
+        redirects=[(nginx_quote(source), target) for source, target in collect_redirects(set(files))],
+        open_file_cache_max=open_file_cache_max,
+        file_count=len(files),
+        ssi=is_ssi_enabled(),
+        chrome_dir=CHROME_DIR,
+    )
+
+
+def generate_nginx_config(output_file):
+    """
+    读取当前站点的输出清单并写出 nginx 配置（需先完成构建）
+
+    Returns:
+        Path: 配置文件路径，没有输出清单时返回 None
+    """
+    manifest = load_build_manifest()
+    if not manifest:
+        print(f"❌ 没有找到 {MANIFEST_NAME}，请先运行 python gen.py all")
+        return None
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(render_nginx_config(manifest), encoding='utf-8')
+    print(f"✅ 生成 nginx 配置: {output_file}（{len(manifest.get('files', {}))} 个输出文件）")
+    return output_file
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 输出管线
+所有生成的 HTML 都经由 write_html 写出，依次经过各个后处理阶段
+"""
+
+from contextvars import ContextVar
+from pathlib import Path
+
+from .critical_css import inline_critical_css
+from .minify import minify_html
+from .service_worker import inject_registration
+
+# 是否压缩 HTML（调试构建时关闭，保留缩进和注释）
+_minify_enabled = True
+# 压缩统计：输出路径 -> (压缩前字节数, 写出字节数, 是否完整页面)；同一文件多次写出时以最后一次为准
+# 按构建上下文区分，并发构建多个站点时各自统计
+_size_report = ContextVar('size_report')
+
+
+def _current_report():
+    report = _size_report.get(None)
+    if report is None:
+        report = {}
+        _size_report.set(report)
+    return report
+
+
+def enable_minify(enabled=True):
+    """启用/关闭 HTML 压缩"""
+    global _minify_enabled
+    _minify_enabled = enabled
+
+
+def get_size_report():
+    """获取本次构建写出的 HTML 大小统计 [(输出路径, 压缩前字节数, 写出字节数, 是否完整页面)]"""
+    return [(path, *sizes) for path, sizes in _current_report().items()]
+
+
+def reset_size_report():
+    """清空大小统计（每轮构建开始时调用）"""
+    _size_report.set({})
+
+
+def write_html(output_file, html, skip_unchanged=False):
+    """
+    对 HTML 做后处理并写入文件（自动创建父目录）
+
+    skip_unchanged 为 True 时，处理后的内容与已有文件相同则不重写（保持修改时间），
+    返回是否写入了文件
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    html = inline_critical_css(html, output_file)
+    html = inject_registration(html, output_file)
+    original_size = len(html.encode('utf-8'))
+
+    if _minify_enabled:
+        html = minify_html(html)
+
+    data = html.encode('utf-8')
+    _current_report()[output_file] = (original_size, len(data), '</html>' in html[-200:].lower())
+    if skip_unchanged and output_file.is_file() and output_file.read_bytes() == data:
+        return False
+    output_file.write_bytes(data)
+    return True
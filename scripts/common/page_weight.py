@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面体积审计
+构建结束后解析输出目录中的每个完整页面，汇总页面本身和它加载的样式、脚本、图片等资源：
+本地资源按输出文件计算原始大小和压缩后大小，第三方 CDN 资源使用登记的大小（THIRD_PARTY_WEIGHTS，
+可在 frame.json 的 third_party_weights 中补充或覆盖），得到每个页面的传输体积和请求数。
+
+预算在 frame.json 的 page_budget 中按页面类型设置，如
+{"article": {"max_kb": 1500, "max_raw_kb": 5000, "max_requests": 12}, "default": {...}}，
+max_kb 为压缩后的传输体积；page_budget_mode 为 "warn"（默认，只提示）或 "fail"（构建失败）。
+模块 frame.json 中的 page_budget 整体覆盖全局设置
+"""
+
+import gzip
+import html
+import re
+from urllib.parse import unquote, urljoin, urlsplit
+
+from .chrome import SSI_INCLUDE_PATTERN, expand_includes
+from .config import load_frame_config
+from .precompress import is_compressible
+from .site import html_path
+
+# 页面类型
+PAGE_TYPES = ('home', 'index', 'article', 'taxonomy', 'error')
+
+# 模块中分类法页面所在目录
+TAXONOMY_DIR_NAMES = ('categories', 'tags')
+
+# 第三方资源登记的大小：地址 -> (原始字节数, 压缩后字节数, 请求数)
+# 请求数包含资源自身加载的字体等子资源（按常见页面实测的近似值）
+THIRD_PARTY_WEIGHTS = {
+    "https://cdn.tailwindcss.com": (407_000, 117_000, 1),
+    "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css": (319_000, 249_000, 3),
+    "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css": (369_000, 287_000, 3),
+    "https://unpkg.com/scrollreveal@4.0.9/dist/scrollreveal.min.js": (25_000, 8_000, 1),
+    "https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js": (1_170_000, 270_000, 1),
+    "https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js": (3_100_000, 820_000, 1),
+}
+
+# 页面加载的资源：脚本、样式表/图标、图片、媒体封面、内嵌框架
+RESOURCE_TAG_PATTERN = re.compile(r'<(script|link|img|video|iframe|embed)\b[^>]*>', re.IGNORECASE)
+RESOURCE_ATTRS = {
+    'script': ('src',),
+    'link': ('href',),
+    'img': ('src',),
+    'video': ('poster',),
+    'iframe': ('src',),
+    'embed': ('src',),
+}
+ATTR_PATTERN = re.compile(r'\b([a-z-]+)\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)', re.IGNORECASE)
+# 会下载资源的 link 类型
+LINK_RELS = ('stylesheet', 'icon', 'preload', 'modulepreload', 'manifest')
+
+# <noscript> 中的回退资源和注释不会被加载
+IGNORED_BLOCK_PATTERN = re.compile(r'<noscript\b.*?</noscript>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+
+
+def classify_page(relative):
+    """
+    页面所属模块和类型
+
+    Returns:
+        tuple: (模块名，根目录页面为 home, 页面类型)
+    """
+    parts = relative.split('/')
+    if len(parts) == 1:
+        return 'home', ('error' if parts[0] == '404.html' else 'home')
+    section = parts[0]
+    if len(parts) == 2:
+        return section, 'index'
+    if parts[1] in TAXONOMY_DIR_NAMES:
+        return section, 'taxonomy'
+    return section, 'article'
+
+
+def _parse_attrs(tag):
+    attrs = {}
+    for name, value in ATTR_PATTERN.findall(tag):
+        if value[:1] in '"\'':
+            value = value[1:-1]
+        attrs[name.lower()] = html.unescape(value).strip()
+    return attrs
+
+
+def extract_resources(page_html):
+    """页面加载的资源地址（去重，保持出现顺序）"""
+    page_html = IGNORED_BLOCK_PATTERN.sub('', page_html)
+    urls = []
+    for match in RESOURCE_TAG_PATTERN.finditer(page_html):
+        tag_name = match.group(1).lower()
+        attrs = _parse_attrs(match.group(0))
+        if tag_name == 'link' and not any(rel in attrs.get('rel', '').lower().split() for rel in LINK_RELS):
+            continue
+        if tag_name == 'img' and not attrs.get('src') and attrs.get('srcset'):
+            attrs['src'] = attrs['srcset'].split(',')[0].split()[0]
+        for attr in RESOURCE_ATTRS[tag_name]:
+            url = attrs.get(attr)
+            if url and not url.startswith(('data:', 'javascript:', '#')) and url not in urls:
+                urls.append(url)
+    return urls
+
+
+def _local_weight(relative, hashes, cache):
+    """本地输出文件的 (原始大小, 压缩后大小)，同一轮审计中复用"""
+    weight = cache.get(relative)
+    if weight is None:
+        size = hashes[relative][1]
+        compressed = size
+        if is_compressible(relative):
+            gz_file = html_path(relative + '.gz')
+            if gz_file.is_file():
+                compressed = gz_file.stat().st_size
+            else:
+                compressed = min(size, len(gzip.compress(html_path(relative).read_bytes(), mtime=0)))
+        weight = cache[relative] = (size, compressed)
+    return weight
+
+
+def measure_page(relative, hashes, third_party, cache):
+    """
+    计算单个页面的传输体积
+
+    Returns:
+        dict: {'path', 'section', 'type', 'raw', 'compressed', 'requests', 'missing', 'unknown'}
+    """
+    section, page_type = classify_page(relative)
+    raw, compressed = _local_weight(relative, hashes, cache)
+    requests = 1
+    missing, unknown = [], []
+
+    page_url = f"https://site.invalid/{relative}"
+    page_html = html_path(relative).read_text(encoding='utf-8')
+    # SSI 引用的片段由 nginx 拼进同一个响应，计入页面本身的体积
+    for include in SSI_INCLUDE_PATTERN.findall(page_html):
+        if include in hashes:
+            include_raw, include_compressed = _local_weight(include, hashes, cache)
+            raw += include_raw
+            compressed += include_compressed
+    for url in extract_resources(expand_includes(page_html)):
+        parts = urlsplit(url)
+        if parts.scheme in ('http', 'https') or url.startswith('//'):
+            full_url = url if parts.scheme else f"https:{url}"
+            weight = third_party.get(full_url)
+            if weight is None:
+                unknown.append(full_url)
+                requests += 1
+                continue
+            raw += weight[0]
+            compressed += weight[1]
+            requests += weight[2]
+            continue
+
+        target = urlsplit(urljoin(page_url, url))
+        if target.netloc != 'site.invalid':
+            continue
+        resource = unquote(target.path).lstrip('/')
+        if resource not in hashes:
+            missing.append(resource)
+            continue
+        resource_raw, resource_compressed = _local_weight(resource, hashes, cache)
+        raw += resource_raw
+        compressed += resource_compressed
+        requests += 1
+
+    return {
+        'path': relative,
+        'section': section,
+        'type': page_type,
+        'raw': raw,
+        'compressed': compressed,
+        'requests': requests,
+        'missing': missing,
+        'unknown': unknown,
+    }
+
+
+def check_budget(page, budget):
+    """返回页面超出预算的项目"""
+    problems = []
+    if not budget:
+        return problems
+    if 'max_kb' in budget and page['compressed'] > budget['max_kb'] * 1024:
+        problems.append(f"传输 {page['compressed'] / 1024:.0f} KB > {budget['max_kb']} KB")
+    if 'max_raw_kb' in budget and page['raw'] > budget['max_raw_kb'] * 1024:
+        problems.append(f"原始 {page['raw'] / 1024:.0f} KB > {budget['max_raw_kb']} KB")
+    if 'max_requests' in budget and page['requests'] > budget['max_requests']:
+        problems.append(f"请求 {page['requests']} > {budget['max_requests']}")
+    return problems
+
+
+def audit_page_weight(hashes):
+    """
+    审计输出目录中的全部完整页面
+
+    Args:
+        hashes (dict): 输出快照 {相对路径: (修改时间, 大小, 哈希)}
+
+    Returns:
+        dict: {'pages': [页面统计], 'violations': [(页面统计, 问题列表)], 'failed': 是否因超出预算而失败}
+    """
+    cache = {}
+    pages = []
+    violations = []
+    failed = False
+    for relative in sorted(hashes):
+        if not relative.endswith('.html'):
+            continue
+        # 片段（卡片、分片、首页延迟区域）不是独立页面
+        with open(html_path(relative), encoding='utf-8') as f:
+            if '<html' not in f.read(512).lower():
+                continue
+
+        section, page_type = classify_page(relative)
+        frame = load_frame_config(section)
+        third_party = dict(THIRD_PARTY_WEIGHTS)
+        third_party.update({url: tuple(weight) for url, weight in (frame.get('third_party_weights') or {}).items()})
+
+        page = measure_page(relative, hashes, third_party, cache)
+        pages.append(page)
+
+        budgets = frame.get('page_budget') or {}
+        problems = check_budget(page, budgets.get(page_type) or budgets.get('default'))
+        if problems:
+            violations.append((page, problems))
+            if frame.get('page_budget_mode', 'warn') == 'fail':
+                failed = True
+
+    return {'pages': pages, 'violations': violations, 'failed': failed}
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 信息提取
+读取页数和文档信息（标题、作者、创建时间等），并把前几页渲染为缩略图，
+结果按 PDF 内容哈希缓存在 .cache/pdf/ 下，PDF 不变时不再解析和渲染。
+
+渲染优先使用 PyMuPDF（fitz），其次是 poppler 的 pdftoppm 命令，都没有时只提取页数和文档信息
+（直接读取 PDF 文本结构，对象流压缩的文件可能取不到）；有 Pillow 时缩略图转为 WebP
+"""
+
+import importlib.util
+import io
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from .cache import get_cache_dir, write_atomic
+from .images import get_image_hash
+
+# 缩略图默认宽度（像素，约为预览区域宽度的 2 倍，高分屏也清晰）
+DEFAULT_THUMBNAIL_WIDTH = 800
+# WebP 质量
+THUMBNAIL_QUALITY = 80
+
+# 文档信息字段：PDF Info 字典的键 -> 输出键
+METADATA_KEYS = {
+    'Title': 'title', 'Author': 'author', 'Subject': 'subject', 'Keywords': 'keywords',
+    'Creator': 'creator', 'Producer': 'producer', 'CreationDate': 'created', 'ModDate': 'modified',
+}
+
+PAGE_PATTERN = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+INFO_PATTERN = re.compile(rb'/(' + b'|'.join(key.encode() for key in METADATA_KEYS) + rb')\s*(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>)')
+PDF_DATE_PATTERN = re.compile(r'^D:(\d{4})(\d{2})?(\d{2})?')
+
+# PyMuPDF 只在渲染时导入（判断渲染方式时只查找模块，不导入），未安装时回退到 pdftoppm
+fitz = None
+# Pillow 用于把渲染结果转为 WebP，未安装时保留 PNG
+Image = None
+
+
+@lru_cache(maxsize=None)
+def _load_fitz():
+    """按需导入 PyMuPDF，返回是否可用（先赋值模块再缓存结果，并发构建时不会读到未赋值的模块）"""
+    global fitz
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf
+        except ImportError:
+            return False
+    fitz = pymupdf
+    return True
+
+
+@lru_cache(maxsize=None)
+def _load_pillow():
+    """按需导入 Pillow，返回是否可用"""
+    global Image
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        return False
+    Image = PILImage
+    return True
+
+
+@lru_cache(maxsize=None)
+def _has_fitz():
+    """是否安装了 PyMuPDF（只查找模块，缓存命中的构建不必付出导入开销）"""
+    return any(importlib.util.find_spec(name) is not None for name in ('pymupdf', 'fitz'))
+
+
+def get_backend():
+    """当前可用的渲染方式：fitz、pdftoppm 或 none"""
+    if _has_fitz():
+        return 'fitz'
+    if shutil.which('pdftoppm'):
+        return 'pdftoppm'
+    return 'none'
+
+
+def _decode_pdf_string(raw):
+    """解码 PDF 字符串（字面量或十六进制，支持 UTF-16 BOM）"""
+    if raw.startswith(b'<'):
+        data = bytes.fromhex(re.sub(rb'\s', b'', raw[1:-1]).decode('ascii'))
+    else:
+        data = re.sub(rb'\\([nrtbf()\\])', lambda m: {
+            b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'
+        }.get(m.group(1), m.group(1)), raw[1:-1])
+    if data.startswith(b'\xfe\xff'):
+        return data[2:].decode('utf-16-be', errors='replace')
+    return data.decode('latin-1')
+
+
+def format_pdf_date(value):
+    """PDF 日期（D:YYYYMMDD...）转为 YYYY-MM-DD，无法识别时原样返回"""
+    match = PDF_DATE_PATTERN.match(value or '')
+    if not match:
+        return value or ''
+    return '-'.join(part for part in match.groups() if part)
+
+
+def read_pdf_structure(pdf_file):
+    """
+    直接从 PDF 文本结构读取页数和文档信息（不依赖第三方库）
+
+    Returns:
+        tuple: (页数，取不到时为 None, {字段: 值})
+    """
+    data = pdf_file.read_bytes()
+    page_count = len(PAGE_PATTERN.findall(data)) or None
+    metadata = {}
+    for key, raw in INFO_PATTERN.findall(data):
+        value = _decode_pdf_string(raw).strip()
+        if value:
+            metadata[METADATA_KEYS[key.decode()]] = value
+    return page_count, metadata
+
+
+def _render_fitz(pdf_file, pages, width):
+    """用 PyMuPDF 读取信息并渲染前 pages 页，返回 (页数, 文档信息, [PNG 字节])"""
+    if not _load_fitz():
+        raise RuntimeError("无法导入 PyMuPDF")
+    images = []
+    with fitz.open(pdf_file) as doc:
+        metadata = {}
+        for key, value in (doc.metadata or {}).items():
+            name = {'creationDate': 'created', 'modDate': 'modified'}.get(key, key)
+            if value and name in METADATA_KEYS.values():
+                metadata[name] = value
+        for index in range(min(pages, doc.page_count)):
+            page = doc.load_page(index)
+            zoom = width / page.rect.width
+            images.append(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).tobytes('png'))
+        return doc.page_count, metadata, images
+
+
+def _render_pdftoppm(pdf_file, pages, width):
+    """用 pdftoppm 渲染前 pages 页，返回 [PNG 字节]"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        subprocess.run(
+            ['pdftoppm', '-png', '-f', '1', '-l', str(pages), '-scale-to-x', str(width), '-scale-to-y', '-1',
+             str(pdf_file), f"{temp_dir}/page"],
+            check=True, capture_output=True
+        )
+        # 输出文件名的页码位数随总页数变化，按页码排序
+        files = sorted(
+            (int(path.stem.rsplit('-', 1)[-1]), path) for path in Path(temp_dir).glob('page-*.png')
+        )
+        return [path.read_bytes() for _, path in files]
+
+
+def _save_thumbnail(png_data, target_stem):
+    """保存缩略图（有 Pillow 时转为 WebP），返回 (文件, 宽, 高)"""
+    if _load_pillow():
+        with Image.open(io.BytesIO(png_data)) as img:
+            width, height = img.size
+            target = target_stem.with_suffix('.webp')
+            output = io.BytesIO()
+            img.convert('RGB').save(output, 'WEBP', quality=THUMBNAIL_QUALITY, method=6)
+        write_atomic(target, output.getvalue())
+        return target, width, height
+
+    # PNG 头中直接读取尺寸
+    width, height = int.from_bytes(png_data[16:20], 'big'), int.from_bytes(png_data[20:24], 'big')
+    target = target_stem.with_suffix('.png')
+    write_atomic(target, png_data)
+    return target, width, height
+
+
+def get_thumbnail_file(name):
+    """缩略图文件名（get_pdf_info 返回的 file.name）对应的缓存路径"""
+    return get_cache_dir('pdf') / name
+
+
+def get_pdf_info(pdf_file, pages=1, width=DEFAULT_THUMBNAIL_WIDTH):
+    """
+    获取 PDF 的页数、文档信息和前 pages 页缩略图（按内容哈希和渲染方式缓存）
+
+    Returns:
+        dict: {'hash', 'page_count', 'metadata', 'backend',
+               'pages': [{'file': 缩略图路径, 'width', 'height'}]}；文件不存在时返回 None
+    """
+    if not pdf_file.is_file():
+        return None
+
+    digest = get_image_hash(pdf_file)
+    backend = get_backend()
+    cache_dir = get_cache_dir('pdf')
+    key = f"{digest[:16]}-{backend}-{pages}-{width}"
+    meta_file = cache_dir / f"{key}.json"
+
+    try:
+        info = json.loads(meta_file.read_text(encoding='utf-8'))
+        if not all((cache_dir / page['file']).is_file() for page in info['pages']):
+            info = None
+    except (OSError, ValueError, KeyError):
+        info = None
+
+    if info is None:
+        page_count, metadata = read_pdf_structure(pdf_file)
+        images = []
+        try:
+            if backend == 'fitz':
+                page_count, fitz_metadata, images = _render_fitz(pdf_file, pages, width)
+                metadata.update(fitz_metadata)
+            elif backend == 'pdftoppm':
+                images = _render_pdftoppm(pdf_file, pages, width)
+        except Exception as e:
+            print(f"⚠️ 渲染 PDF 缩略图失败 {pdf_file.name}: {e}")
+
+        thumbnails = []
+        for index, png_data in enumerate(images, start=1):
+            target, thumb_width, thumb_height = _save_thumbnail(png_data, cache_dir / f"{key}-p{index}")
+            thumbnails.append({'file': target.name, 'width': thumb_width, 'height': thumb_height})
+
+        info = {'page_count': page_count, 'metadata': metadata, 'pages': thumbnails}
+        write_atomic(meta_file, json.dumps(info, ensure_ascii=False, sort_keys=True))
+
+    return {
+        'hash': digest,
+        'backend': backend,
+        'page_count': info['page_count'],
+        'metadata': info['metadata'],
+        'pages': [dict(page, file=cache_dir / page['file']) for page in info['pages']],
+    }
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预压缩
+为 HTML/CSS/JS 等文本输出写出同目录的 .gz 文件，nginx 开启 gzip_static 后直接发送，
+不必每次请求时压缩；gzip 头中不写时间和文件名，相同输入得到相同的 .gz。
+含 SSI 指令的页面和 SSI 片段需要 nginx 拼接后再压缩，不写出 .gz
+"""
+
+import gzip
+import os
+
+from .chrome import CHROME_DIR, has_ssi_include
+from .site import html_path
+
+# 需要预压缩的文本类型
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.json', '.svg', '.xml', '.txt')
+
+# 小于该字节数的文件压缩收益不大，直接发送原文件
+MIN_COMPRESS_SIZE = 256
+
+
+def is_compressible(relative):
+    return relative.lower().endswith(COMPRESSIBLE_SUFFIXES)
+
+
+def is_precompressed_copy(relative):
+    """是否为预压缩生成的 .gz（原文件存在且属于可压缩类型），这类文件不计入输出清单"""
+    if not relative.endswith('.gz'):
+        return False
+    source = relative[:-3]
+    return is_compressible(source) and html_path(source).is_file()
+
+
+def precompress_outputs(hashes, previous=None):
+    """
+    为输出目录中的文本文件写出 .gz，并删除失去原文件的 .gz
+
+    Args:
+        hashes (dict): 本轮输出快照 {相对路径: (修改时间, 大小, 哈希)}
+        previous (dict): 上一轮快照，哈希未变且 .gz 仍在的文件不重新压缩
+
+    Returns:
+        int: 本轮写出的 .gz 数量
+    """
+    previous = previous or {}
+    written = 0
+    for relative, (_, size, digest) in hashes.items():
+        if not is_compressible(relative):
+            continue
+        gz_file = html_path(relative + '.gz')
+        if size < MIN_COMPRESS_SIZE:
+            if gz_file.exists():
+                gz_file.unlink()
+            continue
+        cached = previous.get(relative)
+        if cached and cached[2] == digest and gz_file.exists():
+            continue
+
+        source = html_path(relative).read_bytes()
+        if relative.startswith(CHROME_DIR + '/') or has_ssi_include(source):
+            if gz_file.exists():
+                gz_file.unlink()
+            continue
+        data = gzip.compress(source, compresslevel=9, mtime=0)
+        if len(data) >= size:
+            if gz_file.exists():
+                gz_file.unlink()
+            continue
+        temp = gz_file.with_name(f".{gz_file.name}.tmp")
+        temp.write_bytes(data)
+        os.replace(temp, gz_file)
+        written += 1
+
+    # 原文件已删除的 .gz（模块目录整体清理时会一并删除，这里处理其余情况）
+    html_dir = html_path()
+    if html_dir.exists():
+        for gz_file in html_dir.rglob('*.gz'):
+            source = gz_file.relative_to(html_dir).as_posix()[:-3]
+            if is_compressible(source) and source not in hashes:
+                gz_file.unlink()
+    return written
+
+
+def count_precompressed(relatives):
+    """统计已写出 .gz 的文件数"""
+    return sum(1 for relative in relatives if is_compressible(relative) and html_path(relative + '.gz').is_file())
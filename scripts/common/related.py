@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关文章
+基于标题、标签和正文的 TF-IDF 向量（中文按二元组切分）计算余弦相似度，
+用分块矩阵乘法批量求每篇文章的 top-k 邻居。
+每篇文章的词频按内容哈希缓存，只有改动过的文章需要重新分词。
+"""
+
+import json
+import math
+import re
+from functools import lru_cache
+
+from .cache import get_cache_dir, hash_text, write_atomic
+from .site import site_cache_file
+
+# 相似度计算依赖 NumPy（计算时才导入），未安装时不生成相关文章
+np = None
+
+# 默认相关文章数（可在模块 frame.json 中用 related_count 覆盖）
+DEFAULT_RELATED_COUNT = 3
+
+# 分词规则版本，规则变化时旧缓存自动失效
+TOKENIZER_VERSION = 1
+
+# 标题、标签相对正文的权重（重复计入词频）
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+
+# 参与相似度计算的最大词表大小（按文档频率保留）
+MAX_FEATURES = 8192
+
+# 分块矩阵乘法每块的行数，控制内存占用
+BLOCK_SIZE = 512
+
+WORD_PATTERN = re.compile(r'[a-z][a-z0-9+#.-]*[a-z0-9+#]|[a-z]|[\u4e00-\u9fff]+')
+CODE_FENCE_PATTERN = re.compile(r'```.*?```', re.DOTALL)
+
+
+@lru_cache(maxsize=None)
+def _load_numpy():
+    """按需导入 NumPy，返回是否可用（先赋值模块再缓存结果，并发构建时不会读到未赋值的模块）"""
+    global np
+    try:
+        import numpy
+    except ImportError:
+        return False
+    np = numpy
+    return True
+
+
+def tokenize(text):
+    """分词：英文按单词，中文连续汉字按二元组（单字词保留单字）"""
+    tokens = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        if '\u4e00' <= word[0] <= '\u9fff':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1:
+            tokens.append(word)
+    return tokens
+
+
+def count_terms(card, markdown):
+    """统计一篇文章的加权词频"""
+    counts = {}
+
+    def add(text, weight):
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + weight
+
+    add(card.title, TITLE_WEIGHT)
+    for name in card.terms('tag'):
+        add(name, TAG_WEIGHT)
+    add(CODE_FENCE_PATTERN.sub(' ', markdown or ''), 1)
+    return counts
+
+
+def _load_term_cache(section):
+    cache_file = site_cache_file(get_cache_dir('related'), f"{section}.json")
+    try:
+        return json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_term_cache(section, cache):
+    cache_file = site_cache_file(get_cache_dir('related'), f"{section}.json")
+    write_atomic(cache_file, json.dumps(cache, ensure_ascii=False, sort_keys=True))
+
+
+def get_term_counts(section, articles):
+    """获取每篇文章的词频（按内容哈希复用缓存），返回与 articles 对应的列表"""
+    old_cache = _load_term_cache(section)
+    cache = {}
+    result = []
+
+    for article in articles:
+        card = article.card
+        key = hash_text(TOKENIZER_VERSION, card.title, *card.terms('tag'), article.markdown or '')
+        counts = old_cache.get(key)
+        if counts is None:
+            counts = count_terms(card, article.markdown)
+        cache[key] = counts
+        result.append(counts)
+
+    # 只保留当前文章的缓存，删除的文章随之清理
+    if cache.keys() != old_cache.keys():
+        _save_term_cache(section, cache)
+    return result
+
+
+def build_tfidf_matrix(term_counts):
+    """
+    构建 L2 归一化的 TF-IDF 矩阵（行：文章，列：词）
+
+    只在至少两篇文章中出现的词才影响文章间的相似度，矩阵只保留这些列
+    （最多 MAX_FEATURES 个），但范数按全部词计算，保证余弦值不被放大。
+    """
+    n = len(term_counts)
+    df = {}
+    for counts in term_counts:
+        for term in counts:
+            df[term] = df.get(term, 0) + 1
+
+    idf = {term: math.log((1 + n) / (1 + freq)) + 1 for term, freq in df.items()}
+
+    shared = [term for term, freq in df.items() if freq >= 2]
+    shared.sort(key=lambda term: (-df[term], term))
+    vocabulary = {term: col for col, term in enumerate(shared[:MAX_FEATURES])}
+
+    matrix = np.zeros((n, max(1, len(vocabulary))), dtype=np.float32)
+    norms = np.zeros(n, dtype=np.float32)
+    for row, counts in enumerate(term_counts):
+        if not counts:
+            continue
+        terms = list(counts)
+        weights = np.array([(1 + math.log(counts[t])) * idf[t] for t in terms], dtype=np.float32)
+        norms[row] = np.sqrt(np.dot(weights, weights))
+        cols = np.array([vocabulary.get(t, -1) for t in terms])
+        mask = cols >= 0
+        matrix[row, cols[mask]] = weights[mask]
+
+    norms[norms == 0] = 1
+    return matrix / norms[:, None]
+
+
+def top_k_neighbors(matrix, k, candidates):
+    """
+    分块计算余弦相似度并取每行 top-k
+
+    Args:
+        matrix (ndarray): L2 归一化后的矩阵
+        k (int): 邻居数
+        candidates (ndarray): bool 数组，可作为邻居的行
+
+    Returns:
+        list: 每行的 [(列号, 相似度)]，按相似度降序，只含相似度 > 0 的邻居
+    """
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    neighbors = []
+    if k <= 0:
+        return [[] for _ in range(n)]
+
+    for start in range(0, n, BLOCK_SIZE):
+        scores = matrix[start:start + BLOCK_SIZE] @ matrix.T
+        # 排除自身和不可见的文章
+        rows = np.arange(scores.shape[0])
+        scores[rows, rows + start] = -1
+        scores[:, ~candidates] = -1
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        # 相似度相同时按文章顺序排列，保证输出稳定
+        order = np.lexsort((top, -top_scores), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for cols, values in zip(top.tolist(), top_scores.tolist()):
+            neighbors.append([(c, v) for c, v in zip(cols, values) if v > 0])
+
+    return neighbors
+
+
+def compute_related(section, articles, k=DEFAULT_RELATED_COUNT):
+    """
+    计算每篇文章的相关文章
+
+    Args:
+        section (str): 模块名
+        articles (list): 该模块的全部文章
+        k (int): 每篇文章的相关文章数
+
+    Returns:
+        dict: {slug: [Card]}，只推荐可见的文章；未安装 NumPy 时返回空字典
+    """
+    if len(articles) < 2 or k <= 0 or not _load_numpy():
+        return {}
+
+    term_counts = get_term_counts(section, articles)
+    matrix = build_tfidf_matrix(term_counts)
+    candidates = np.array([article.card.is_visible for article in articles])
+    neighbors = top_k_neighbors(matrix, k, candidates)
+
+    return {
+        article.card.slug: [articles[col].card for col, _ in row]
+        for article, row in zip(articles, neighbors)
+    }
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Service Worker
+构建结束时根据输出快照生成 html/sw.js：预缓存首页、各模块列表页、带内容哈希的 CSS/JS/图标
+以及首页展示的前几篇文章（含封面），页面使用 stale-while-revalidate。
+预缓存列表中每个文件带内容修订号，整体修订号只在这些文件变化时变化，访客只重新下载变化的文件。
+data/frame.json 中设置 "service_worker": false 时改为输出注销旧 Service Worker 的脚本，页面不再注册
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from .assets import is_fingerprinted
+from .cache import hash_text
+from .chrome import CHROME_DIR
+from .config import load_frame_config, setup_template_env
+from .content import load_articles
+from .site import html_path
+
+# Service Worker 文件名（相对输出目录），放在根目录使作用域覆盖整个站点
+SW_NAME = "sw.js"
+
+# 始终预缓存的页面（离线时未缓存的页面回退到首页）
+APP_SHELL = ('home.html',)
+
+# 各模块列表页：<模块>/index.html
+SECTION_INDEX_PATTERN = re.compile(r'^[^/]+/index\.html$')
+
+# 带内容哈希时预缓存的文件类型（首页延迟加载的片段也带哈希）
+PRECACHE_SUFFIXES = ('.css', '.js', '.svg', '.ico', '.woff', '.woff2', '.html')
+
+# 错误页面会出现在任意地址下，相对地址无法指向 sw.js，不插入注册脚本
+UNREGISTERED_PAGES = ('404.html',)
+
+# 预缓存文章的模块，以及每个模块默认预缓存的篇数（与首页预览数量一致）
+ARTICLE_SECTIONS = ('blog', 'project')
+DEFAULT_PRECACHE_ARTICLES = 3
+
+# 修订号长度
+REVISION_LENGTH = 12
+
+REGISTER_SNIPPET = (
+    "<script>if('serviceWorker' in navigator){{window.addEventListener('load',function(){{"
+    "navigator.serviceWorker.register('{url}')}})}}</script>"
+)
+
+
+def is_enabled():
+    """是否启用 Service Worker（data/frame.json 的 service_worker，默认启用）"""
+    return bool(load_frame_config('home').get('service_worker', True))
+
+
+def _precache_articles(hashes, count):
+    """首页展示的前 count 篇文章页及其封面"""
+    paths = []
+    for section in ARTICLE_SECTIONS:
+        cards = [article.card for article in load_articles(section) if article.card.is_visible]
+        for card in cards[:count]:
+            paths.append(f"{section}/{card.slug}/content.html")
+            if card.image_asset:
+                paths.append(card.image_asset)
+    return [path for path in paths if path in hashes]
+
+
+def build_precache_list(hashes):
+    """
+    根据输出快照计算预缓存列表
+
+    Args:
+        hashes (dict): {相对路径: (修改时间, 大小, 哈希)}
+
+    Returns:
+        list: [(相对路径, 修订号)]，按路径排序
+    """
+    paths = {path for path in APP_SHELL if path in hashes}
+    paths.update(path for path in hashes if SECTION_INDEX_PATTERN.match(path))
+    paths.update(
+        path for path in hashes
+        if path.lower().endswith(PRECACHE_SUFFIXES) and is_fingerprinted(path)
+    )
+    count = load_frame_config('home').get('sw_precache_articles', DEFAULT_PRECACHE_ARTICLES)
+    paths.update(_precache_articles(hashes, count))
+    paths.discard(SW_NAME)
+
+    # SSI 模式下页面内容不含导航栏和页脚，页面修订号同时取决于这些片段
+    chrome_digests = [hashes[path][2] for path in sorted(hashes) if path.startswith(CHROME_DIR + '/')]
+    chrome = hash_text(*chrome_digests) if chrome_digests else ''
+
+    def revision(path):
+        digest = hashes[path][2]
+        if chrome and path.endswith('.html') and not is_fingerprinted(path):
+            digest = hash_text(digest, chrome)
+        return digest[:REVISION_LENGTH]
+
+    return [(path, revision(path)) for path in sorted(paths)]
+
+
+def render_service_worker(entries, enabled=True):
+    """渲染 sw.js（整体修订号由预缓存列表决定）"""
+    revision = hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()[:REVISION_LENGTH]
+    template = setup_template_env().get_template('deploy/sw.js')
+    return template.render(enabled=enabled, revision=revision, entries=entries)
+
+
+def write_service_worker(hashes):
+    """
+    根据输出快照写出 sw.js
+
+    Returns:
+        bool: 文件内容是否变化（未变化时不重写，保持修改时间）
+    """
+    enabled = is_enabled()
+    entries = build_precache_list(hashes) if enabled else []
+    data = render_service_worker(entries, enabled)
+
+    sw_file = html_path(SW_NAME)
+    if sw_file.exists() and sw_file.read_text(encoding='utf-8') == data:
+        return False
+    sw_file.parent.mkdir(parents=True, exist_ok=True)
+    sw_file.write_text(data, encoding='utf-8')
+    print(f"📴 Service Worker: 预缓存 {len(entries)} 个文件" if enabled else "📴 Service Worker 已关闭，输出注销脚本")
+    return True
+
+
+def inject_registration(html, output_file):
+    """在完整页面的 </body> 前插入注册脚本，片段和错误页面原样返回"""
+    body_end = html.lower().rfind('</body>')
+    if body_end < 0 or not is_enabled():
+        return html
+
+    html_root = html_path().resolve()
+    output_file = output_file.resolve()
+    try:
+        relative = output_file.relative_to(html_root).as_posix()
+    except ValueError:
+        return html
+    if relative in UNREGISTERED_PAGES:
+        return html
+
+    url = os.path.relpath(html_root / SW_NAME, output_file.parent).replace(os.sep, '/')
+    return html[:body_end] + REGISTER_SNIPPET.format(url=url) + html[body_end:]
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站点目录
+数据、模板和输出目录通过 contextvars 传递给各生成模块，
+同一进程可以依次或并发构建多个站点，共享模板环境、Markdown 实例和各类缓存
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+
+from .cache import hash_text
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+
+@dataclass(frozen=True)
+class SiteSpec:
+    """一个站点的数据目录、模板目录和输出目录"""
+    __slots__ = ('name', 'data_dir', 'templates_dir', 'out_dir')
+    name: str
+    data_dir: Path
+    templates_dir: Path
+    out_dir: Path
+
+    @classmethod
+    def from_dict(cls, data, base_dir=ROOT_DIR):
+        """
+        从配置创建站点（相对路径以 base_dir 为基准）
+
+        Args:
+            data (dict): {'name', 'data', 'templates', 'out'}，templates 省略时使用仓库自带模板
+            base_dir (Path): 相对路径的基准目录
+        """
+        base_dir = Path(base_dir)
+
+        def resolve(value, default=None):
+            if not value:
+                if default is None:
+                    raise ValueError(f"站点配置缺少目录: {data}")
+                return default
+            return (base_dir / value).resolve()
+
+        data_dir = resolve(data.get('data'))
+        return cls(
+            name=data.get('name') or data_dir.parent.name,
+            data_dir=data_dir,
+            templates_dir=resolve(data.get('templates'), ROOT_DIR / "templates"),
+            out_dir=resolve(data.get('out')),
+        )
+
+    @property
+    def cache_name(self):
+        """区分站点的缓存文件名前缀（默认站点沿用原有文件名）"""
+        if self == DEFAULT_SITE:
+            return ''
+        return hash_text(self.data_dir, self.out_dir)[:10] + '-'
+
+
+# 仓库自带的站点：data/ + templates/ -> html/
+DEFAULT_SITE = SiteSpec(
+    name='default',
+    data_dir=ROOT_DIR / "data",
+    templates_dir=ROOT_DIR / "templates",
+    out_dir=ROOT_DIR / "html",
+)
+
+_current_site = ContextVar('current_site', default=DEFAULT_SITE)
+
+
+def get_site():
+    """当前正在构建的站点"""
+    return _current_site.get()
+
+
+@contextmanager
+def use_site(site):
+    """在 with 块内把 site 设为当前站点"""
+    token = _current_site.set(site)
+    try:
+        yield site
+    finally:
+        _current_site.reset(token)
+
+
+def data_path(*parts):
+    """当前站点数据目录下的路径"""
+    return get_site().data_dir.joinpath(*parts)
+
+
+def html_path(*parts):
+    """当前站点输出目录下的路径"""
+    return get_site().out_dir.joinpath(*parts)
+
+
+def templates_path():
+    """当前站点的模板目录"""
+    return get_site().templates_dir
+
+
+def site_cache_file(cache_dir, name):
+    """按站点区分的缓存文件（cache_dir 为 get_cache_dir 返回的目录）"""
+    return cache_dir / f"{get_site().cache_name}{name}"
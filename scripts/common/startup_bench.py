@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准
+在新进程中用 -X importtime 构建单个目标，统计总耗时、导入耗时和导入的重依赖，
+超出预算或导入了不该导入的重依赖时返回失败
+"""
+
+import subprocess
+import sys
+import time
+
+from .site import ROOT_DIR
+from .tasks import TASKS
+
+# 重依赖：只应由渲染 Markdown / 计算相关文章 / 渲染 PDF 缩略图的目标导入
+HEAVY_MODULES = ('markdown', 'pymdownx', 'pygments', 'numpy', 'PIL', 'pymupdf')
+
+# 允许导入重依赖的目标（图片占位图、PDF 缩略图缓存未命中时才会导入 PIL、pymupdf）
+TARGET_HEAVY_MODULES = {
+    'blog': {'markdown', 'pymdownx', 'pygments', 'numpy', 'PIL'},
+    'project': {'markdown', 'pymdownx', 'pygments', 'numpy', 'PIL'},
+    'resume': {'PIL', 'pymupdf'},
+    'docs': {'PIL', 'pymupdf'},
+}
+
+# 导入耗时预算（毫秒），包含解释器自身启动时的导入。
+# 每个目标都要经过 build.py 的输出管线并用 Jinja2 渲染模板，这部分约 110~170 ms，是所有目标的下限
+DEFAULT_IMPORT_BUDGET_MS = 200
+IMPORT_BUDGET_MS = {'blog': 400, 'project': 400, 'resume': 400, 'docs': 400}
+
+BENCH_CODE = (
+    "import contextlib, io\n"
+    "from scripts.common.build import build_succeeded, run_build\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    result = run_build([{target!r}])\n"
+    "raise SystemExit(0 if build_succeeded(result) else 1)\n"
+)
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        tuple: ({顶层模块: 累计微秒}, {全部导入的模块名})
+    """
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('| imported package'):
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        module = name.strip()
+        modules.add(module)
+        # 顶层导入的模块名前只有一个空格
+        if not name.startswith('  '):
+            top_level[module] = top_level.get(module, 0) + cumulative
+    return top_level, modules
+
+
+def measure_target(target):
+    """在新进程中构建一个目标并统计启动开销"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BENCH_CODE.format(target=target)],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    top_level, modules = parse_importtime(completed.stderr)
+    heavy = sorted(name for name in HEAVY_MODULES if name in modules)
+    slowest = sorted(top_level.items(), key=lambda item: -item[1])[:5]
+
+    return {
+        'target': target,
+        'ok': completed.returncode == 0,
+        'wall_ms': wall_ms,
+        'import_ms': sum(top_level.values()) / 1000,
+        'heavy': heavy,
+        'slowest': [(name, us / 1000) for name, us in slowest],
+    }
+
+
+def run_startup_bench(targets=None):
+    """
+    逐个目标测量启动开销并输出报告
+
+    Returns:
+        int: 退出码（全部目标在预算内且没有多余的重依赖时为 0）
+    """
+    targets = [t for t in TASKS if t in targets] if targets and "all" not in targets else list(TASKS)
+    failed = 0
+
+    print("⏱️ 启动耗时基准（每个目标单独启动一个进程）")
+    for target in targets:
+        result = measure_target(target)
+        budget = IMPORT_BUDGET_MS.get(target, DEFAULT_IMPORT_BUDGET_MS)
+        unexpected = set(result['heavy']) - TARGET_HEAVY_MODULES.get(target, set())
+
+        problems = []
+        if not result['ok']:
+            problems.append("构建失败")
+        if result['import_ms'] > budget:
+            problems.append(f"导入超出预算 {budget} ms")
+        if unexpected:
+            problems.append(f"导入了重依赖 {', '.join(sorted(unexpected))}")
+
+        status = "❌" if problems else "✅"
+        print(f"   {status} {target}: 总耗时 {result['wall_ms']:.0f} ms，导入 {result['import_ms']:.0f} ms"
+              f"{'，' + '；'.join(problems) if problems else ''}")
+        slowest = "，".join(f"{name} {ms:.0f} ms" for name, ms in result['slowest'])
+        print(f"      最慢的顶层导入：{slowest}")
+        if problems:
+            failed += 1
+
+    return 1 if failed else 0
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成任务表
+只包含目标名称和参数默认值，不导入任何生成模块；gen.py 解析参数时只需要这里，
+构建流程（build.py）在真正执行构建时才导入
+"""
+
+# 生成任务映射
+TASKS = {
+    "home": "scripts.home.generator.generate_home_html",
+    "resume": "scripts.sections.resume.generator.generate_resume_page",
+    "blog": "scripts.sections.blog.generator.scan_and_generate_blogs_and_home",
+    "project": "scripts.sections.project.generator.scan_and_generate_projects_and_home",
+    "docs": "scripts.sections.docs.generator.generate_docs_page_and_home",
+    "stack": "scripts.sections.stack.generator.generate_stack_page_and_home",
+    "contact": "scripts.sections.contact.generator.generate_contact_page_and_home",
+    "error": "scripts.common.error_pages.generate_error_pages",
+}
+
+VALID_TARGETS = list(TASKS) + ["all"]
+
+# 批量构建默认并发数
+DEFAULT_WORKERS = 4
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分类法页面
+一次遍历卡片建立分类/标签索引，为每个分类和标签生成分页的静态列表页，
+并为每种分类法生成一个带数量的总览页（categories/index.html、tags/index.html）。
+分类/标签目录不参与模块输出目录的构建前清理：处理后内容未变化的页面不重写，
+已不存在的取值（或多余的分页）对应的页面在生成后删除。
+"""
+
+from .chrome import render_section_chrome
+from .config import setup_template_env
+from .models import TAXONOMY_DIRS, term_page_path
+from .output import write_html
+from .site import html_path
+
+# 每页卡片数（可在模块 frame.json 中用 taxonomy_page_size 覆盖）
+DEFAULT_PAGE_SIZE = 10
+
+# 分类法名称
+TAXONOMY_LABELS = {'category': '分类', 'tag': '标签'}
+
+
+def build_taxonomy_index(cards):
+    """
+    一次遍历建立索引
+
+    Args:
+        cards (list): 已按日期倒序排列的卡片
+
+    Returns:
+        dict: {'category': {名称: [卡片]}, 'tag': {名称: [卡片]}}，名称按卡片数量降序、名称升序排列
+    """
+    index = {kind: {} for kind in TAXONOMY_DIRS}
+    for card in cards:
+        for kind, terms in index.items():
+            for name in card.terms(kind):
+                terms.setdefault(name, []).append(card)
+
+    return {
+        kind: dict(sorted(terms.items(), key=lambda item: (-len(item[1]), item[0])))
+        for kind, terms in index.items()
+    }
+
+
+def paginate(items, page_size):
+    """按页切分，至少返回一页"""
+    page_size = max(1, page_size)
+    return [items[i:i + page_size] for i in range(0, len(items), page_size)] or [[]]
+
+
+def get_pagination(section, kind, name, page, total_pages):
+    """生成分页导航数据（地址相对当前分类法页面）"""
+    def page_url(number):
+        return "../" + term_page_path(section, kind, name, number)
+
+    return {
+        'page': page,
+        'total_pages': total_pages,
+        'prev_url': page_url(page - 1) if page > 1 else '',
+        'next_url': page_url(page + 1) if page < total_pages else '',
+        'pages': [{'number': n, 'url': page_url(n)} for n in range(1, total_pages + 1)],
+    }
+
+
+def get_term_links(section, index, kind, url_base=''):
+    """某种分类法全部取值的链接和数量"""
+    return [
+        {'name': name, 'count': len(term_cards), 'url': url_base + term_page_path(section, kind, name)}
+        for name, term_cards in index[kind].items()
+    ]
+
+
+def generate_taxonomy_pages(section, cards, template_name, items_name, total_name, frame_config):
+    """
+    生成某个模块的全部分类/标签页面
+
+    Args:
+        section (str): 模块名（blog / project）
+        cards (list): 可见卡片（按日期倒序）
+        template_name (str): 列表页模板
+        items_name (str): 模板中卡片列表变量名（如 blogs）
+        total_name (str): 模板中总数变量名（如 total_blogs）
+        frame_config (FrameConfig): 模块框架配置
+
+    Returns:
+        dict: {'index': 索引, 'written': 重写的页数, 'unchanged': 未变化的页数, 'removed': 删除的页数}
+    """
+    section_dir = html_path(section)
+    page_size = frame_config.get('taxonomy_page_size', DEFAULT_PAGE_SIZE)
+    index = build_taxonomy_index(cards)
+
+    rendered = set()
+    written = 0
+    env = setup_template_env()
+    # 导航栏和页脚：SSI 模式下为固定的引用指令，修改导航或页脚不会改变各页面的内容
+    chrome = render_section_chrome(section, frame_config)
+
+    def render_page(relative, context):
+        nonlocal written
+        output_file = section_dir / relative
+        rendered.add(output_file)
+        if write_html(output_file, env.get_template(template_name).render(**context), skip_unchanged=True):
+            written += 1
+
+    for kind, terms in index.items():
+        # 总览页：全部取值及数量
+        render_page(f"{TAXONOMY_DIRS[kind]}/index.html", {
+            'page_title': frame_config.page_title,
+            'chrome': chrome,
+            items_name: [],
+            total_name: len(cards),
+            'heading': f"全部{TAXONOMY_LABELS[kind]}",
+            'description': f"共 {len(terms)} 个{TAXONOMY_LABELS[kind]}",
+            'back_url': "../index.html",
+            'taxonomy_terms': get_term_links(section, index, kind, "../"),
+        })
+
+        # 每个取值的分页列表
+        for name, term_cards in terms.items():
+            pages = paginate(term_cards, page_size)
+            for page, page_cards in enumerate(pages, start=1):
+                render_page(term_page_path(section, kind, name, page), {
+                    'page_title': frame_config.page_title,
+                    'chrome': chrome,
+                    items_name: [card.view('taxonomy') for card in page_cards],
+                    total_name: len(term_cards),
+                    'heading': f"{TAXONOMY_LABELS[kind]}：{name}",
+                    'description': f"第 {page}/{len(pages)} 页",
+                    'back_url': f"../{TAXONOMY_DIRS[kind]}/index.html",
+                    'pagination': get_pagination(section, kind, name, page, len(pages)),
+                })
+
+    # 删除已不存在的取值和多余分页的页面（对应的 .gz 由预压缩步骤清理）
+    removed = 0
+    for dir_name in TAXONOMY_DIRS.values():
+        for stale in (section_dir / dir_name).rglob('*.html'):
+            if stale not in rendered:
+                stale.unlink()
+                removed += 1
+
+    return {'index': index, 'written': written, 'unchanged': len(rendered) - written, 'removed': removed}
@@ -5,30 +5,44 @@ Home 页面生成器
 生成完整的首页 HTML
 """
 
-from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
+from scripts.common.cache import hash_text
+from scripts.common.config import load_config, load_frame_config, setup_template_env
+from scripts.common.fragments import render_fragment
+from scripts.common.output import write_html
+from scripts.common.site import html_path
+
+# 首页各预览区域的锚点（与导航 href 一致），开启延迟加载后这些区域可拆成独立片段
+HOME_SECTION_ANCHORS = {
+    'resume': 'resume',
+    'blog': 'blog',
+    'project': 'projects',
+    'docs': 'docs',
+    'stack': 'stack',
+    'contact': 'contact',
+}
+
+# 有独立页面的区域：禁用脚本时延迟加载占位链接到该页面（片段本身没有 <head> 和样式）
+HOME_SECTION_PAGES = {
+    'resume': 'resume/index.html',
+    'blog': 'blog/index.html',
+    'project': 'project/index.html',
+    'docs': 'docs/index.html',
+}
 
 def generate_nav_html(env, config):
     """生成导航栏HTML"""
-    template = env.get_template('nav.html')
-    return template.render(
+    return render_fragment(
+        'nav.html',
+        url_base='home',
         nav_logo=config['nav_logo'],
         nav_items=config['nav_items']
     )
 
 def generate_hero_html(env, config):
     """生成Hero区域HTML"""
-    template = env.get_template('hero.html')
-    return template.render(
+    return render_fragment(
+        'hero.html',
+        url_base='home',
         hero_title=config['hero_title'],
         hero_subtitle=config['hero_subtitle'],
         hero_button_text=config['hero_button_text'],
@@ -37,31 +51,53 @@ def generate_hero_html(env, config):
 
 def generate_footer_html(env, config):
     """生成页脚HTML"""
-    template = env.get_template('footer.html')
-    return template.render(
+    return render_fragment(
+        'footer.html',
+        url_base='home',
         footer_text=config['footer_text'],
         footer_tagline=config['footer_tagline'],
         icp_number=config.get('icp_number', '')  # ICP备案号
     )
 
+def get_lazy_sections(config):
+    """解析 frame.json 中的 lazy_home_sections：true 表示首屏以外全部延迟加载"""
+    option = config.get('lazy_home_sections', False)
+    if option is True:
+        return set(HOME_SECTION_ANCHORS)
+    if isinstance(option, (list, tuple)):
+        return set(option) & set(HOME_SECTION_ANCHORS)
+    return set()
+
+def write_lazy_section(fragments_dir, name, section_html):
+    """把区域HTML写成带内容指纹的片段文件，返回相对首页的地址"""
+    fingerprint = hash_text(section_html)[:10]
+    fragment_name = f"home-{name}.{fingerprint}.html"
+    write_html(fragments_dir / fragment_name, section_html)
+    return f"fragments/{fragment_name}"
+
+def generate_lazy_placeholder_html(name, src, title):
+    """生成延迟加载区域的占位HTML"""
+    return render_fragment(
+        'components/lazy_section.html',
+        url_base='home',
+        anchor=HOME_SECTION_ANCHORS[name],
+        src=src,
+        page_url=HOME_SECTION_PAGES.get(name, ''),
+        title=title
+    )
+
 def generate_home_html():
     """生成完整的首页 HTML"""
     # 设置模板环境
     env = setup_template_env()
 
-    # 导入配置
-    import sys
-    root_dir = Path(__file__).parent.parent.parent
-    sys.path.insert(0, str(root_dir))
-    from scripts.common.config import load_config
-
     # 加载配置
     config = load_config()
     if not config:
         return
 
     # 获取输出路径
-    output_file = root_dir / "html" / "home.html"
+    output_file = html_path("home.html")
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     # 生成各部分HTML
@@ -94,8 +130,32 @@ def generate_home_html():
 
     footer_html = generate_footer_html(env, config)
 
-    # 组合内容HTML
-    content_html = hero_html + resume_preview_html + blog_preview_html + projects_preview_html + docs_preview_html + stack_preview_html + contact_preview_html
+    # 组合内容HTML（首屏以外的区域可按配置拆成片段延迟加载）
+    sections = [
+        ('resume', resume_preview_html),
+        ('blog', blog_preview_html),
+        ('project', projects_preview_html),
+        ('docs', docs_preview_html),
+        ('stack', stack_preview_html),
+        ('contact', contact_preview_html),
+    ]
+    lazy_sections = get_lazy_sections(config)
+
+    fragments_dir = html_path("fragments")
+    if fragments_dir.exists():
+        for old_fragment in fragments_dir.glob("home-*.html"):
+            old_fragment.unlink()
+    if lazy_sections:
+        fragments_dir.mkdir(parents=True, exist_ok=True)
+
+    content_html = hero_html
+    for name, section_html in sections:
+        if name in lazy_sections and section_html:
+            src = write_lazy_section(fragments_dir, name, section_html)
+            title = load_frame_config(name).nav_title or name
+            content_html += generate_lazy_placeholder_html(name, src, title)
+        else:
+            content_html += section_html
 
     # 渲染完整页面
     base_template = env.get_template('base.html')
@@ -107,8 +167,7 @@ def generate_home_html():
     )
 
     # 写入文件
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_html(output_file, html_content)
 
     print(f"Home 页面 HTML 已生成: {output_file}")
 
@@ -5,44 +5,21 @@
 供 gen_home.py 调用
 """
 
-from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-import json
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
-
-def load_json_file(file_path):
-    """加载 JSON 文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"加载 {file_path} 失败: {e}")
-        return None
+from scripts.common.config import load_json_file
+from scripts.common.fragments import render_fragment
+from scripts.common.site import data_path
 
 def generate_resume_preview_html():
     """生成简历预览区域HTML - 供外部调用的接口"""
-    # 设置模板环境
-    env = setup_template_env()
-
     # 读取简历配置数据
-    root_dir = Path(__file__).parent.parent.parent
-    resume_config_file = root_dir / "data" / "resume" / "title.json"
+    resume_config_file = data_path("resume", "title.json")
     resume_config = load_json_file(resume_config_file)
 
     if not resume_config:
         print("无法加载简历配置数据")
         return ""
 
-    template = env.get_template('home/resume_preview.html')
-    return template.render(**resume_config)
+    return render_fragment('home/resume_preview.html', url_base='home', **resume_config)
 
 if __name__ == "__main__":
     html_content = generate_resume_preview_html()
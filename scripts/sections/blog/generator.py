@@ -4,231 +4,154 @@
 基于项目生成器的方式生成博客列表
 """
 
-from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-import json
+from scripts.common.assets import publish_article_assets
+from scripts.common.chrome import render_section_chrome
+from scripts.common.mathml import needs_mathjax
 from scripts.common.mdconfig import markdown_to_html
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
+from scripts.common.config import load_frame_config, load_json_file, setup_template_env
+from scripts.common.content import load_articles
+from scripts.common.fragments import render_fragment
+from scripts.common.highlight import get_highlight_stylesheet_url
+from scripts.common.output import write_html
+from scripts.common.site import data_path, html_path
+from scripts.common.related import DEFAULT_RELATED_COUNT, compute_related
+from scripts.common.taxonomy import generate_taxonomy_pages, get_term_links
+
+# 主页预览卡片数量，以及“加载更多”每个分片包含的卡片数
+PREVIEW_COUNT = 3
+PREVIEW_SHARD_SIZE = 6
+
+def generate_card_html(card, context='article', delay=0, eager=False):
+    """生成博客卡片HTML片段（按页面视图缓存）"""
+    return render_fragment(
+        'components/card.html',
+        url_base=context,
+        card=card.view(context),
+        delay=delay,
+        eager=eager
     )
 
-def load_json_file(file_path):
-    """加载JSON文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"加载 {file_path} 失败: {e}")
-        return None
-
-def prepare_card_data(card_data, category_id, article_name):
-    """准备卡片数据，处理路径和URL"""
-    card = card_data.copy()
-
-    # 处理图片路径
-    if card.get('image'):
-        if card['image'].startswith('http'):
-            # 如果是URL，直接使用
-            card['image'] = card['image']
-        else:
-            # 如果是本地文件，确保是正确的相对路径
-            if not card['image'].startswith('./'):
-                card['image'] = f"./{card['image']}"
-
-    # 生成内容页面URL
-    card['content_url'] = f"content.html"
-    card['url'] = f"blog/{article_name}/content.html"
-
-    # 设置卡片类型
-    card['type'] = 'blog'
-
-    return card
-
-def generate_card_html(card_data):
-    """生成博客卡片HTML片段"""
-    env = setup_template_env()
-    template = env.get_template('components/card.html')
-    return template.render(card=card_data)
-
-def generate_blog_html(card_data, md_html_content):
-    """生成完整博客HTML页面"""
+def generate_blog_html(card, md_html_content, related=()):
+    """生成完整博客HTML页面（related 为相关文章卡片）"""
     env = setup_template_env()
     template = env.get_template('components/article.html')
     return template.render(
-        card=card_data,
+        card=card.view('article'),
         content_html=md_html_content,
+        highlight_css=get_highlight_stylesheet_url(md_html_content),
+        needs_mathjax=needs_mathjax(md_html_content),
+        related=[related_card.view('related') for related_card in related],
         site_title="个人博客"
     )
 
-def get_all_blogs():
-    """自动扫描并获取所有博客"""
-    root_dir = Path(__file__).parent.parent.parent.parent
-    blog_dir = root_dir / "data" / "blog"
-
-    blogs = []
-
-    if blog_dir.exists():
-        # 扫描所有子目录（博客）
-        for blog_dir_item in blog_dir.iterdir():
-            if blog_dir_item.is_dir() and blog_dir_item.name != "__pycache__":
-                card_file = blog_dir_item / "card.json"
-                content_file = blog_dir_item / "content.md"
-                if card_file.exists():
-                    card_data = load_json_file(card_file)
-                    if card_data and card_data.get('status') == 'published':
-                        # 读取博客详细内容
-                        description = ""
-                        if content_file.exists():
-                            try:
-                                with open(content_file, 'r', encoding='utf-8') as f:
-                                    description = f.read()
-                            except Exception as e:
-                                print(f"读取博客内容失败 {content_file}: {e}")
-
-                        card_data['description'] = description
-                        card_data['blog_path'] = blog_dir_item.name
-
-                        # 准备卡片数据（保持原始图片路径）
-                        prepared_card = prepare_card_data(card_data, 'blog', blog_dir_item.name)
-                        blogs.append(prepared_card)
-
-    # 按日期排序，最新的在前
-    blogs.sort(key=lambda x: x.get('date', ''), reverse=True)
-
-    return blogs
-
-def generate_blog_detail_page(blog):
+def get_all_blogs(articles=None):
+    """获取所有已发布博客的卡片（按日期倒序）"""
+    if articles is None:
+        articles = load_articles('blog')
+    return [article.card for article in articles if article.card.is_visible]
+
+def generate_blog_detail_page(article):
     """生成单个博客详细页面"""
     env = setup_template_env()
     template = env.get_template('components/article.html')
 
-    # 准备文章数据
-    article_data = {
-        'title': blog['title'],
-        'summary': blog['summary'],
-        'date': blog['date'],
-        'category': blog.get('category', ''),
-        'type': 'blog',
-        'tags': blog.get('tags', []),
-        'status': blog.get('status', 'published')
-    }
-
     # 处理内容
-    html_content = markdown_to_html(blog.get('description', ''))
+    html_content = markdown_to_html(article.markdown or '', article.source_dir)
 
     html_output = template.render(
-        card=article_data,
-        content=html_content
+        card=article.card.view('article'),
+        content_html=html_content,
+        highlight_css=get_highlight_stylesheet_url(html_content),
+        needs_mathjax=needs_mathjax(html_content)
     )
 
     # 保存文件
-    output_dir = Path(__file__).parent.parent.parent.parent / "html" / "blog" / blog['blog_path']
+    output_dir = html_path("blog", article.card.slug)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     output_file = output_dir / "index.html"
-    output_file.write_text(html_output, encoding='utf-8')
+    write_html(output_file, html_output)
 
-    print(f"✅ 生成博客详情页: {blog['title']}")
+    print(f"✅ 生成博客详情页: {article.card.title}")
 
 def scan_and_generate_blogs():
     """扫描博客目录并生成所有文件"""
     print("🔍 开始扫描博客文章...")
 
     # 设置路径
-    data_root = Path(__file__).parent.parent.parent.parent / "data" / "blog"
-    output_root = Path(__file__).parent.parent.parent.parent / "html" / "blog"
+    data_root = data_path("blog")
+    output_root = html_path("blog")
 
     if not data_root.exists():
         print("❌ 博客数据目录不存在")
         return
 
     # 统计信息
-    total_blogs = 0
     generated_cards = 0
     generated_blogs = 0
 
-    # 扫描博客目录
-    for blog_dir in data_root.iterdir():
-        if not blog_dir.is_dir() or blog_dir.name == "__pycache__":
-            continue
-
-        total_blogs += 1
-        print(f"📁 处理博客: {blog_dir.name}")
-
-        # 检查必需文件
-        card_file = blog_dir / "card.json"
-        content_file = blog_dir / "content.md"
+    # 加载阶段：一次性读取并校验所有博客
+    articles = load_articles('blog')
+    total_blogs = len(articles)
 
-        if not card_file.exists():
-            print(f"⚠️ 跳过 {blog_dir.name}: 缺少 card.json")
-            continue
+    # 相关文章：整个模块一次批量计算
+    related_count = load_frame_config('blog').get('related_count', DEFAULT_RELATED_COUNT)
+    related = compute_related('blog', articles, related_count)
 
-        # 加载卡片数据
-        card_data = load_json_file(card_file)
-        if not card_data:
-            print(f"⚠️ 跳过 {blog_dir.name}: card.json 无效")
-            continue
+    # 默认只发布被引用的资源，frame.json 中开启后未引用的文件也一并复制
+    include_unreferenced = bool(load_frame_config('blog').get('publish_unreferenced_assets', False))
 
-        # 准备卡片数据
-        prepared_card = prepare_card_data(card_data, 'blog', blog_dir.name)
+    for article in articles:
+        card = article.card
+        blog_dir = article.source_dir
+        print(f"📁 处理博客: {blog_dir.name}")
 
         # 创建输出目录
-        output_dir = output_root / blog_dir.name
+        output_dir = output_root / card.slug
         output_dir.mkdir(parents=True, exist_ok=True)
 
         try:
             # 生成卡片HTML
-            card_html = generate_card_html(prepared_card)
+            card_html = generate_card_html(card)
             card_output = output_dir / "card.html"
-            with open(card_output, 'w', encoding='utf-8') as f:
-                f.write(card_html)
+            write_html(card_output, card_html)
             generated_cards += 1
             print(f"✅ 生成卡片: {card_output}")
 
             # 处理内容文件
-            if content_file.exists():
-                # 读取并转换Markdown
-                with open(content_file, 'r', encoding='utf-8') as f:
-                    md_content = f.read()
+            if article.has_content:
+                html_content = markdown_to_html(article.markdown, article.source_dir)
+            else:
+                print(f"⚠️ {blog_dir.name} 缺少 content.md 文件")
+                html_content = ''
 
-                html_content = markdown_to_html(md_content)
+            # 发布正文和卡片引用到的资源文件（存入 html/_assets/，正文中的地址改写为存储地址）
+            html_content, assets = publish_article_assets(article, html_content, output_dir, include_unreferenced)
+            print(f"✅ 发布博客资源: {len(assets['published'])} 个文件")
 
+            if article.has_content:
                 # 生成博客HTML
-                blog_html = generate_blog_html(prepared_card, html_content)
+                blog_html = generate_blog_html(card, html_content, related.get(card.slug, ()))
                 blog_output = output_dir / "content.html"
-                with open(blog_output, 'w', encoding='utf-8') as f:
-                    f.write(blog_html)
+                write_html(blog_output, blog_html)
                 generated_blogs += 1
                 print(f"✅ 生成博客: {blog_output}")
 
-                # 复制博客目录
-                import shutil
-                try:
-                    # 复制整个博客目录，但排除md文件
-                    for item in blog_dir.iterdir():
-                        if item.is_file() and item.name != 'content.md':
-                            shutil.copy2(item, output_dir)
-                        elif item.is_dir():
-                            shutil.copytree(item, output_dir / item.name, dirs_exist_ok=True)
-                    print(f"✅ 复制博客目录: {blog_dir} → {output_dir}")
-                except Exception as e:
-                    print(f"⚠️ 复制博客目录失败: {e}")
-            else:
-                print(f"⚠️ {blog_dir.name} 缺少 content.md 文件")
-
         except Exception as e:
             print(f"❌ 生成失败: {e}")
 
+    # 生成分类/标签页面（列表页复用同一份索引）
+    taxonomy_index = None
+    if total_blogs > 0:
+        try:
+            taxonomy_index = generate_blog_taxonomy_pages(articles)
+        except Exception as e:
+            print(f"❌ 生成博客分类/标签页面失败: {e}")
+
     # 生成博客列表页面
     if total_blogs > 0:
         try:
-            generate_blog_list_page()
+            generate_blog_list_page(articles, taxonomy_index)
         except Exception as e:
             print(f"❌ 生成博客列表页面失败: {e}")
 
@@ -243,7 +166,24 @@ def generate_all_blog_pages():
     """生成所有博客详细页面（兼容旧接口）"""
     return scan_and_generate_blogs()
 
-def generate_blog_list_page():
+def generate_blog_taxonomy_pages(articles=None):
+    """生成博客的分类/标签页面，返回分类法索引"""
+    frame_config = load_frame_config('blog')
+    result = generate_taxonomy_pages(
+        'blog',
+        get_all_blogs(articles),
+        'sections/blog/all_content_page.html',
+        'blogs',
+        'total_blogs',
+        frame_config
+    )
+
+    index = result['index']
+    print(f"🏷️ 博客分类/标签页面: {len(index['category'])} 个分类，{len(index['tag'])} 个标签，"
+          f"重写 {result['written']} 页，未变化 {result['unchanged']} 页，删除 {result['removed']} 页")
+    return index
+
+def generate_blog_list_page(articles=None, taxonomy_index=None):
     """生成博客列表页面（显示所有博客）"""
     print("🏗️ 开始生成博客列表页面...")
 
@@ -251,22 +191,14 @@ def generate_blog_list_page():
     env = setup_template_env()
 
     # 加载框架配置
-    root_dir = Path(__file__).parent.parent.parent.parent
-    frame_file = root_dir / "data" / "blog" / "frame.json"
-    frame_config = load_json_file(frame_file)
+    frame_config = load_frame_config('blog')
 
-    if not frame_config:
+    if not frame_config.nav_title:
         print("❌ 无法加载博客框架配置")
         return
 
-    # 获取所有博客
-    blogs = get_all_blogs()
-
-    # 为博客列表页面调整图片路径（移除./前缀）
-    for blog in blogs:
-        if blog.get('image') and not blog['image'].startswith('http'):
-            if blog['image'].startswith('./'):
-                blog['image'] = blog['image'][2:]  # 移除 ./
+    # 获取所有博客（列表页面视图）
+    blogs = [card.view('list') for card in get_all_blogs(articles)]
 
     if not blogs:
         print("⚠️ 没有博客数据")
@@ -276,50 +208,73 @@ def generate_blog_list_page():
 
     # 生成HTML
     html_content = template.render(
-        frame=frame_config,
+        page_title=frame_config.page_title,
+        chrome=render_section_chrome('blog', frame_config),
         blogs=blogs,
-        total_blogs=len(blogs)
+        total_blogs=len(blogs),
+        taxonomy_terms=get_term_links('blog', taxonomy_index, 'category') if taxonomy_index else []
     )
 
     # 保存文件
-    output_dir = root_dir / "html" / "blog"
+    output_dir = html_path("blog")
     output_dir.mkdir(parents=True, exist_ok=True)
 
     output_file = output_dir / "index.html"
-    output_file.write_text(html_content, encoding='utf-8')
+    write_html(output_file, html_content)
 
     print(f"✅ 生成博客列表页面: {output_file} ({len(blogs)}篇文章)")
     print("📊 博客列表页面生成完成！")
 
-def generate_blogs_preview_html():
-    """生成博客预览区域HTML - 供外部调用的接口"""
-    # 设置模板环境
-    env = setup_template_env()
+def generate_blog_preview_shards(overflow_cards, shard_size=PREVIEW_SHARD_SIZE):
+    """把主页预览之外的博客卡片写成小的 HTML 分片，供主页按需加载，返回分片地址"""
+    output_dir = html_path("blog")
 
-    # 读取博客配置数据
-    root_dir = Path(__file__).parent.parent.parent.parent
-    title_file = root_dir / "data" / "blog" / "title.json"
-    title_data = load_json_file(title_file)
+    # 清理旧分片，避免数量变少后残留
+    for old_shard in output_dir.glob("preview-more-*.html"):
+        old_shard.unlink()
 
-    # 获取所有博客
-    all_blogs = get_all_blogs()
+    shard_urls = []
+    for start in range(0, len(overflow_cards), shard_size):
+        shard_cards = overflow_cards[start:start + shard_size]
+        shard_html = "\n".join(generate_card_html(card, 'home') for card in shard_cards)
 
-    # 限制预览数量（类似项目的3篇）
-    preview_blogs = all_blogs[:3]
+        shard_name = f"preview-more-{len(shard_urls) + 1}.html"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        write_html(output_dir / shard_name, shard_html)
+        shard_urls.append(f"blog/{shard_name}")
 
-    # 为主页预览调整图片路径
-    for blog in preview_blogs:
-        if blog.get('image') and not blog['image'].startswith('http'):
-            if blog['image'].startswith('./'):
-                image_name = blog['image'][2:]  # 移除 ./
-                blog['image'] = f"blog/{blog['blog_path']}/{image_name}"
+    return shard_urls
 
-    template = env.get_template('home/blog_preview.html')
-    return template.render(
+def generate_blogs_preview_html(articles=None):
+    """生成博客预览区域HTML - 供外部调用的接口"""
+    # 读取博客配置数据
+    title_file = data_path("blog", "title.json")
+    title_data = load_json_file(title_file)
+
+    # 获取所有博客
+    all_blogs = get_all_blogs(articles)
+
+    # 限制预览数量（默认3篇），使用主页视图；其余卡片写入分片按需加载
+    preview_count = title_data.get('preview_count', PREVIEW_COUNT) if title_data else PREVIEW_COUNT
+    preview_cards = all_blogs[:preview_count]
+    preview_blogs = [card.view('home') for card in preview_cards]
+    shard_urls = generate_blog_preview_shards(all_blogs[preview_count:])
+
+    # 每张卡片只渲染一次，桌面端和移动端布局共用；博客是首页第一个卡片区，第一张封面是首屏图片，不做延迟加载
+    cards_html = [
+        generate_card_html(card, 'home', delay=index * 200, eager=index == 1)
+        for index, card in enumerate(preview_cards, start=1)
+    ]
+
+    return render_fragment(
+        'home/blog_preview.html',
+        url_base='home',
         title=title_data.get('title', '个人博客') if title_data else '个人博客',
         blogs=preview_blogs,
+        cards_html=cards_html,
+        shard_urls=shard_urls,
         total_count=len(all_blogs),
-        has_more=len(all_blogs) > 3
+        has_more=len(all_blogs) > preview_count
     )
 
 def scan_and_generate_blogs_and_home():
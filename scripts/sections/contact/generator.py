@@ -5,27 +5,13 @@ Contact 联系方式模块生成器
 生成主页联系方式预览
 """
 
-from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-import json
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
+from scripts.common.assets import publish_assets
+from scripts.common.config import load_frame_config, load_json_file
+from scripts.common.fragments import render_fragment
+from scripts.common.site import data_path, html_path
 
-def load_json_file(file_path):
-    """加载 JSON 文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"加载 {file_path} 失败: {e}")
-        return None
+# contact 数据目录中的配置文件，不作为资源发布
+CONTACT_CONFIG_FILES = {'title.json', 'contact.json', 'frame.json'}
 
 def get_contact_icon(contact_type):
     """获取联系方式图标"""
@@ -47,13 +33,9 @@ def get_contact_icon(contact_type):
 
 def generate_contact_preview_html():
     """生成联系方式预览区域HTML"""
-    # 设置模板环境
-    env = setup_template_env()
-
     # 读取配置
-    root_dir = Path(__file__).parent.parent.parent.parent
-    title_file = root_dir / "data" / "contact" / "title.json"
-    contact_file = root_dir / "data" / "contact" / "contact.json"
+    title_file = data_path("contact", "title.json")
+    contact_file = data_path("contact", "contact.json")
 
     title_config = load_json_file(title_file)
     contact_data = load_json_file(contact_file)
@@ -73,8 +55,9 @@ def generate_contact_preview_html():
                 'display_name': get_display_name(contact_type)
             })
 
-    template = env.get_template('home/contact_preview.html')
-    return template.render(
+    return render_fragment(
+        'home/contact_preview.html',
+        url_base='home',
         title=title_config.get('title', '联系方式'),
         subtitle=title_config.get('subtitle', '联系方式介绍'),
         contacts=processed_contacts
@@ -112,42 +95,30 @@ def generate_contact_page_and_home():
         print(f"⚠️ 更新主页预览失败: {e}")
 
 def copy_contact_assets():
-    """复制contact相关的资源文件到html目录"""
-    root_dir = Path(__file__).parent.parent.parent.parent
-    contact_data_dir = root_dir / "data" / "contact"
-    contact_html_dir = root_dir / "html" / "contact"
+    """发布 contact.json 中引用的资源文件（如二维码图片）到html目录"""
+    contact_data_dir = data_path("contact")
+    contact_html_dir = html_path("contact")
 
     if not contact_data_dir.exists():
         return
 
-    # 读取contact数据，找出需要复制的文件
-    contact_file = contact_data_dir / "contact.json"
-    contact_data = load_json_file(contact_file)
+    # 读取contact数据，值为本地文件路径的联系方式才需要发布
+    contact_data = load_json_file(contact_data_dir / "contact.json")
 
     if not contact_data:
         return
 
-    copied_files = 0
+    frame_config = load_frame_config('contact')
+    assets = publish_assets(
+        contact_data_dir,
+        contact_html_dir,
+        [value for value in contact_data.values() if value and isinstance(value, str)],
+        exclude=CONTACT_CONFIG_FILES,
+        include_unreferenced=bool(frame_config.get('publish_unreferenced_assets', False))
+    )
 
-    # 检查每个联系方式的值是否是文件路径
-    for contact_type, value in contact_data.items():
-        if value and isinstance(value, str):
-            # 如果值看起来是文件路径（包含图片扩展名）
-            if any(value.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.svg']):
-                src_file = contact_data_dir / value
-                if src_file.exists():
-                    # 创建目标目录
-                    contact_html_dir.mkdir(parents=True, exist_ok=True)
-                    dst_file = contact_html_dir / value
-
-                    # 复制文件
-                    import shutil
-                    shutil.copy2(src_file, dst_file)
-                    copied_files += 1
-                    print(f"✅ 复制contact资源: {src_file} → {dst_file}")
-
-    if copied_files > 0:
-        print(f"📄 复制contact资源文件: {copied_files}个")
+    if assets['published']:
+        print(f"📄 发布contact资源文件: {len(assets['published'])}个")
 
 if __name__ == "__main__":
     html_content = generate_contact_preview_html()
@@ -3,69 +3,145 @@
 """
 Docs 文档下载模块生成器
 生成文档列表页面和主页预览
+
+文档的大小、修改时间、SHA-256（分块流式计算）、MIME 类型和 PDF 首页缩略图缓存在
+.cache/docs/catalog.json 中，只有大小或修改时间变化的文件重新计算；
+发布时文件按内容哈希存入 html/_assets/，已存在的文件不再复制，只以硬链接发布
 """
 
-from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 import json
-import shutil
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
-
-def load_json_file(file_path):
-    """加载 JSON 文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"加载 {file_path} 失败: {e}")
-        return None
-
-def get_file_info(filename):
-    """获取文件信息"""
-    file_path = Path(__file__).parent.parent.parent.parent / "data" / "docs" / filename
-
-    if file_path.exists():
-        # 获取文件大小
-        size_bytes = file_path.stat().st_size
-        if size_bytes < 1024:
-            size_str = f"{size_bytes}B"
-        elif size_bytes < 1024 * 1024:
-            size_str = f"{size_bytes / 1024:.1f}KB"
-        else:
-            size_str = f"{size_bytes / (1024 * 1024):.1f}MB"
-
-        # 获取文件图标
-        ext = filename.split('.')[-1].lower()
-        icon_map = {
-            'pdf': 'fa-file-pdf',
-            'docx': 'fa-file-word',
-            'doc': 'fa-file-word',
-            'md': 'fa-file-code',
-            'txt': 'fa-file-text',
-            'jpg': 'fa-file-image',
-            'png': 'fa-file-image',
-            'zip': 'fa-file-archive'
-        }
-        icon_class = icon_map.get(ext, 'fa-file')
-
+import mimetypes
+
+from scripts.common.assets import publish_assets, store_asset
+from scripts.common.cache import get_cache_dir, write_atomic
+from scripts.common.config import load_frame_config, load_json_file, setup_template_env, thaw_json
+from scripts.common.fragments import render_fragment
+from scripts.common.images import get_image_hash
+from scripts.common.output import write_html
+from scripts.common.pdf import get_backend, get_pdf_info, get_thumbnail_file
+from scripts.common.site import data_path, html_path, site_cache_file
+
+# docs 数据目录中的配置文件，不作为文档发布
+DOCS_CONFIG_FILES = {'title.json', 'files.json', 'frame.json'}
+
+# 文档元数据缓存文件名
+DOCS_CATALOG_NAME = "catalog.json"
+
+# PDF 缩略图宽度（卡片宽度约 320px，按 2 倍渲染）
+DOCS_THUMBNAIL_WIDTH = 640
+
+# 扩展名 -> Font Awesome 图标
+ICON_MAP = {
+    'pdf': 'fa-file-pdf',
+    'docx': 'fa-file-word',
+    'doc': 'fa-file-word',
+    'md': 'fa-file-code',
+    'txt': 'fa-file-text',
+    'jpg': 'fa-file-image',
+    'png': 'fa-file-image',
+    'zip': 'fa-file-archive'
+}
+
+# mimetypes 在部分 Python 版本中不认识的类型
+EXTRA_MIME_TYPES = {'md': 'text/markdown'}
+
+def format_file_size(size_bytes):
+    """格式化文件大小"""
+    if size_bytes < 1024:
+        return f"{size_bytes}B"
+    elif size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f}KB"
+    return f"{size_bytes / (1024 * 1024):.1f}MB"
+
+def read_doc_metadata(file_path, stat):
+    """计算单个文档的元数据（SHA-256 分块流式计算，PDF 额外渲染首页缩略图）"""
+    ext = file_path.suffix.lower().lstrip('.')
+    mime = mimetypes.guess_type(file_path.name)[0] or EXTRA_MIME_TYPES.get(ext, 'application/octet-stream')
+
+    metadata = {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': get_image_hash(file_path),
+        'mime': mime,
+        'page_count': None,
+        'thumbnail': None,
+        'backend': None,
+    }
+    if mime == 'application/pdf':
+        info = get_pdf_info(file_path, 1, DOCS_THUMBNAIL_WIDTH)
+        metadata['page_count'] = info['page_count']
+        metadata['backend'] = info['backend']
+        if info['pages']:
+            page = info['pages'][0]
+            metadata['thumbnail'] = {'file': page['file'].name, 'width': page['width'], 'height': page['height']}
+    return metadata
+
+def _is_fresh(entry, stat):
+    """缓存的元数据是否仍然有效：文件大小和修改时间未变，PDF 的渲染方式未变且缩略图仍在"""
+    if not entry or entry.get('mtime_ns') != stat.st_mtime_ns or entry.get('size') != stat.st_size:
+        return False
+    if entry.get('mime') == 'application/pdf':
+        if entry.get('backend') != get_backend():
+            return False
+        if entry.get('thumbnail') and not get_thumbnail_file(entry['thumbnail']['file']).is_file():
+            return False
+    return True
+
+def load_docs_catalog(filenames):
+    """
+    读取文档元数据，只重新计算变化的文件
+
+    Returns:
+        tuple: ({文件名: 元数据}, 重新计算的文件数)
+    """
+    catalog_file = site_cache_file(get_cache_dir('docs'), DOCS_CATALOG_NAME)
+    cached = thaw_json(load_json_file(catalog_file) or {}) if catalog_file.exists() else {}
+
+    catalog = {}
+    refreshed = 0
+    for filename in filenames:
+        file_path = data_path("docs", filename)
+        if not file_path.is_file():
+            continue
+        stat = file_path.stat()
+        entry = cached.get(filename)
+        if not _is_fresh(entry, stat):
+            entry = read_doc_metadata(file_path, stat)
+            refreshed += 1
+        catalog[filename] = entry
+
+    if catalog != cached:
+        write_atomic(catalog_file, json.dumps(catalog, ensure_ascii=False, sort_keys=True))
+    return catalog, refreshed
+
+def get_file_info(filename, metadata=None):
+    """获取文件信息（metadata 为 load_docs_catalog 中的元数据，文件不存在时为 None）"""
+    ext = filename.split('.')[-1].lower()
+    icon_class = ICON_MAP.get(ext, 'fa-file')
+
+    if metadata is None:
         return {
-            'size': size_str,
+            'size': '未知',
             'icon': icon_class,
-            'exists': True
+            'exists': False
         }
 
+    # 缩略图放入内容寻址存储，文档页在 html/docs/ 下
+    thumbnail = None
+    if metadata['thumbnail']:
+        thumbnail = dict(
+            metadata['thumbnail'],
+            url=f"../{store_asset(get_thumbnail_file(metadata['thumbnail']['file']))}"
+        )
+
     return {
-        'size': '未知',
-        'icon': 'fa-file',
-        'exists': False
+        'size': format_file_size(metadata['size']),
+        'icon': icon_class,
+        'exists': True,
+        'sha256': metadata['sha256'],
+        'mime': metadata['mime'],
+        'page_count': metadata['page_count'],
+        'thumbnail': thumbnail
     }
 
 def generate_docs_page():
@@ -76,79 +152,71 @@ def generate_docs_page():
     env = setup_template_env()
 
     # 读取配置
-    root_dir = Path(__file__).parent.parent.parent.parent
-    title_file = root_dir / "data" / "docs" / "title.json"
-    files_file = root_dir / "data" / "docs" / "files.json"
-    frame_file = root_dir / "data" / "docs" / "frame.json"
+    title_file = data_path("docs", "title.json")
+    files_file = data_path("docs", "files.json")
 
     title_config = load_json_file(title_file)
     files_config = load_json_file(files_file)
-    frame_config = load_json_file(frame_file)
+    frame_config = load_frame_config('docs')
 
     if not title_config or not files_config:
         print("❌ 无法加载docs配置")
         return
 
-    # 处理文档信息
+    # 处理文档信息（元数据未变化的文件直接复用缓存）
+    catalog, refreshed = load_docs_catalog(
+        [filename for docs in files_config.values() for filename in docs]
+    )
     processed_files = {}
     for category, docs in files_config.items():
         processed_files[category] = {}
         for filename, title in docs.items():
-            file_info = get_file_info(filename)
-            processed_files[category][filename] = {
-                'title': title,
-                'size': file_info['size'],
-                'icon': file_info['icon'],
-                'exists': file_info['exists']
-            }
+            processed_files[category][filename] = dict(get_file_info(filename, catalog.get(filename)), title=title)
 
     # 生成页面
     template = env.get_template('sections/docs/page.html')
     html_content = template.render(
-        frame=frame_config or {},
+        frame=frame_config,
         title_config=title_config,
         files_config=processed_files
     )
 
     # 保存页面
-    output_dir = root_dir / "html" / "docs"
+    output_dir = html_path("docs")
     output_dir.mkdir(parents=True, exist_ok=True)
     output_file = output_dir / "index.html"
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_html(output_file, html_content)
 
-    # 复制文档文件
+    # 发布 files.json 中列出的文档文件
     docs_output_dir = output_dir / "files"
     docs_output_dir.mkdir(exist_ok=True)
 
-    copied_files = 0
-    for category, docs in files_config.items():
-        for filename in docs.keys():
-            src_file = root_dir / "data" / "docs" / filename
-            if src_file.exists():
-                shutil.copy2(src_file, docs_output_dir)
-                copied_files += 1
+    assets = publish_assets(
+        data_path("docs"),
+        docs_output_dir,
+        [filename for docs in files_config.values() for filename in docs],
+        exclude=DOCS_CONFIG_FILES,
+        include_unreferenced=bool(frame_config.get('publish_unreferenced_assets', False))
+    )
+    copied_files = len(assets['published'])
 
     print(f"✅ 生成文档页面: {output_file}")
-    print(f"📄 复制文档文件: {copied_files}个")
+    print(f"📄 发布文档文件: {copied_files}个（重新计算元数据 {refreshed} 个）")
     print("🎉 文档页面生成完成！")
 
 def generate_docs_preview_html():
     """生成文档预览区域HTML"""
-    # 设置模板环境
-    env = setup_template_env()
-
     # 读取配置
-    root_dir = Path(__file__).parent.parent.parent.parent
-    title_file = root_dir / "data" / "docs" / "title.json"
+    title_file = data_path("docs", "title.json")
     title_config = load_json_file(title_file)
 
     if not title_config:
         return ""
 
-    template = env.get_template('home/docs_preview.html')
-    return template.render(
+    return render_fragment(
+        'home/docs_preview.html',
+        url_base='home',
         title=title_config.get('title', '文档下载'),
         subtitle=title_config.get('subtitle', '技术文档和资料下载'),
         docs_url="docs/index.html"
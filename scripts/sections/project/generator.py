@@ -4,233 +4,154 @@
 参考博客预览的方式生成项目列表
 """
 
-from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-import json
+from scripts.common.assets import publish_article_assets
+from scripts.common.chrome import render_section_chrome
+from scripts.common.mathml import needs_mathjax
 from scripts.common.mdconfig import markdown_to_html
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
+from scripts.common.config import load_frame_config, load_json_file, setup_template_env
+from scripts.common.content import load_articles
+from scripts.common.fragments import render_fragment
+from scripts.common.highlight import get_highlight_stylesheet_url
+from scripts.common.output import write_html
+from scripts.common.site import data_path, html_path
+from scripts.common.related import DEFAULT_RELATED_COUNT, compute_related
+from scripts.common.taxonomy import generate_taxonomy_pages, get_term_links
+
+# 主页预览卡片数量，以及“加载更多”每个分片包含的卡片数
+PREVIEW_COUNT = 3
+PREVIEW_SHARD_SIZE = 6
+
+def generate_card_html(card, context='article', delay=0, eager=False):
+    """生成项目卡片HTML片段（按页面视图缓存）"""
+    return render_fragment(
+        'components/card.html',
+        url_base=context,
+        card=card.view(context),
+        delay=delay,
+        eager=eager
     )
 
-def load_json_file(file_path):
-    """加载JSON文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"加载 {file_path} 失败: {e}")
-        return None
-
-def prepare_card_data(card_data, category_id, article_name):
-    """准备卡片数据，处理路径和URL"""
-    card = card_data.copy()
-
-    # 处理图片路径
-    if card.get('image'):
-        if card['image'].startswith('http'):
-            # 如果是URL，直接使用
-            card['image'] = card['image']
-        else:
-            # 如果是本地文件，确保是正确的相对路径
-            if not card['image'].startswith('./'):
-                card['image'] = f"./{card['image']}"
-
-    # 生成内容页面URL
-    card['content_url'] = f"content.html"
-    card['url'] = f"project/{article_name}/content.html"
-
-    # 设置卡片类型
-    card['type'] = 'project'
-
-    return card
-
-def generate_card_html(card_data):
-    """生成项目卡片HTML片段"""
-    env = setup_template_env()
-    template = env.get_template('components/card.html')
-    return template.render(card=card_data)
-
-def generate_project_html(card_data, md_html_content):
-    """生成完整项目HTML页面"""
+def generate_project_html(card, md_html_content, related=()):
+    """生成完整项目HTML页面（related 为相关文章卡片）"""
     env = setup_template_env()
     template = env.get_template('components/article.html')
     return template.render(
-        card=card_data,
+        card=card.view('article'),
         content_html=md_html_content,
+        highlight_css=get_highlight_stylesheet_url(md_html_content),
+        needs_mathjax=needs_mathjax(md_html_content),
+        related=[related_card.view('related') for related_card in related],
         site_title="项目经历"
     )
 
-def get_all_projects():
-    """自动扫描并获取所有项目"""
-    root_dir = Path(__file__).parent.parent.parent.parent
-    project_dir = root_dir / "data" / "project"
-
-    projects = []
-
-    if project_dir.exists():
-        # 扫描所有子目录（项目）
-        for project_dir_item in project_dir.iterdir():
-            if project_dir_item.is_dir() and project_dir_item.name != "__pycache__":
-                card_file = project_dir_item / "card.json"
-                content_file = project_dir_item / "content.md"
-                if card_file.exists():
-                    card_data = load_json_file(card_file)
-                    if card_data and card_data.get('status') in ['published', 'completed', 'in-development']:
-                        # 读取项目详细内容
-                        description = ""
-                        if content_file.exists():
-                            try:
-                                with open(content_file, 'r', encoding='utf-8') as f:
-                                    description = f.read()
-                            except Exception as e:
-                                print(f"读取项目内容失败 {content_file}: {e}")
-
-                        card_data['description'] = description
-                        card_data['project_path'] = project_dir_item.name
-
-                        # 准备卡片数据（保持原始图片路径）
-                        prepared_card = prepare_card_data(card_data, 'project', project_dir_item.name)
-                        projects.append(prepared_card)
-
-    # 按日期排序，最新的在前
-    projects.sort(key=lambda x: x.get('date', ''), reverse=True)
-
-    return projects
-
-def generate_project_detail_page(project):
+def get_all_projects(articles=None):
+    """获取所有可展示项目的卡片（按日期倒序）"""
+    if articles is None:
+        articles = load_articles('project')
+    return [article.card for article in articles if article.card.is_visible]
+
+def generate_project_detail_page(article):
     """生成单个项目详细页面"""
     env = setup_template_env()
     template = env.get_template('components/article.html')
 
-    # 准备文章数据
-    article_data = {
-        'title': project['title'],
-        'summary': project['summary'],
-        'date': project['date'],
-        'category': project['category'],
-        'type': 'project',
-        'technologies': project.get('technologies', []),
-        'demo_url': project.get('demo_url'),
-        'github_url': project.get('github_url'),
-        'status': project.get('status', 'completed')
-    }
-
     # 处理内容
-    html_content = markdown_to_html(project.get('description', ''))
+    html_content = markdown_to_html(article.markdown or '', article.source_dir)
 
     html_output = template.render(
-        card=article_data,
-        content=html_content
+        card=article.card.view('article'),
+        content_html=html_content,
+        highlight_css=get_highlight_stylesheet_url(html_content),
+        needs_mathjax=needs_mathjax(html_content)
     )
 
     # 保存文件
-    output_dir = Path(__file__).parent.parent.parent.parent / "html" / "project" / project['project_path']
+    output_dir = html_path("project", article.card.slug)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     output_file = output_dir / "index.html"
-    output_file.write_text(html_output, encoding='utf-8')
+    write_html(output_file, html_output)
 
-    print(f"✅ 生成项目详情页: {project['title']}")
+    print(f"✅ 生成项目详情页: {article.card.title}")
 
 def scan_and_generate_projects():
     """扫描项目目录并生成所有文件"""
     print("🔍 开始扫描项目...")
 
     # 设置路径
-    data_root = Path(__file__).parent.parent.parent.parent / "data" / "project"
-    output_root = Path(__file__).parent.parent.parent.parent / "html" / "project"
+    data_root = data_path("project")
+    output_root = html_path("project")
 
     if not data_root.exists():
         print("❌ 项目数据目录不存在")
         return
 
     # 统计信息
-    total_projects = 0
     generated_cards = 0
     generated_projects = 0
 
-    # 扫描项目目录
-    for project_dir in data_root.iterdir():
-        if not project_dir.is_dir() or project_dir.name == "__pycache__":
-            continue
-
-        total_projects += 1
-        print(f"📁 处理项目: {project_dir.name}")
-
-        # 检查必需文件
-        card_file = project_dir / "card.json"
-        content_file = project_dir / "content.md"
+    # 加载阶段：一次性读取并校验所有项目
+    articles = load_articles('project')
+    total_projects = len(articles)
 
-        if not card_file.exists():
-            print(f"⚠️ 跳过 {project_dir.name}: 缺少 card.json")
-            continue
+    # 相关文章：整个模块一次批量计算
+    related_count = load_frame_config('project').get('related_count', DEFAULT_RELATED_COUNT)
+    related = compute_related('project', articles, related_count)
 
-        # 加载卡片数据
-        card_data = load_json_file(card_file)
-        if not card_data:
-            print(f"⚠️ 跳过 {project_dir.name}: card.json 无效")
-            continue
+    # 默认只发布被引用的资源，frame.json 中开启后未引用的文件也一并复制
+    include_unreferenced = bool(load_frame_config('project').get('publish_unreferenced_assets', False))
 
-        # 准备卡片数据
-        prepared_card = prepare_card_data(card_data, 'project', project_dir.name)
+    for article in articles:
+        card = article.card
+        project_dir = article.source_dir
+        print(f"📁 处理项目: {project_dir.name}")
 
         # 创建输出目录
-        output_dir = output_root / project_dir.name
+        output_dir = output_root / card.slug
         output_dir.mkdir(parents=True, exist_ok=True)
 
         try:
             # 生成卡片HTML
-            card_html = generate_card_html(prepared_card)
+            card_html = generate_card_html(card)
             card_output = output_dir / "card.html"
-            with open(card_output, 'w', encoding='utf-8') as f:
-                f.write(card_html)
+            write_html(card_output, card_html)
             generated_cards += 1
             print(f"✅ 生成卡片: {card_output}")
 
             # 处理内容文件
-            if content_file.exists():
-                # 读取并转换Markdown
-                with open(content_file, 'r', encoding='utf-8') as f:
-                    md_content = f.read()
+            if article.has_content:
+                html_content = markdown_to_html(article.markdown, article.source_dir)
+            else:
+                print(f"⚠️ {project_dir.name} 缺少 content.md 文件")
+                html_content = ''
 
-                html_content = markdown_to_html(md_content)
+            # 发布正文和卡片引用到的资源文件（存入 html/_assets/，正文中的地址改写为存储地址）
+            html_content, assets = publish_article_assets(article, html_content, output_dir, include_unreferenced)
+            print(f"✅ 发布项目资源: {len(assets['published'])} 个文件")
 
+            if article.has_content:
                 # 生成项目HTML
-                project_html = generate_project_html(prepared_card, html_content)
+                project_html = generate_project_html(card, html_content, related.get(card.slug, ()))
                 project_output = output_dir / "content.html"
-                with open(project_output, 'w', encoding='utf-8') as f:
-                    f.write(project_html)
+                write_html(project_output, project_html)
                 generated_projects += 1
                 print(f"✅ 生成项目: {project_output}")
 
-                # 复制项目目录
-                import shutil
-                try:
-                    # 复制整个项目目录，但排除md文件
-                    for item in project_dir.iterdir():
-                        if item.is_file() and item.name != 'content.md':
-                            shutil.copy2(item, output_dir)
-                        elif item.is_dir():
-                            shutil.copytree(item, output_dir / item.name, dirs_exist_ok=True)
-                    print(f"✅ 复制项目目录: {project_dir} → {output_dir}")
-                except Exception as e:
-                    print(f"⚠️ 复制项目目录失败: {e}")
-            else:
-                print(f"⚠️ {project_dir.name} 缺少 content.md 文件")
-
         except Exception as e:
             print(f"❌ 生成失败: {e}")
 
+    # 生成分类/标签页面（列表页复用同一份索引）
+    taxonomy_index = None
+    if total_projects > 0:
+        try:
+            taxonomy_index = generate_project_taxonomy_pages(articles)
+        except Exception as e:
+            print(f"❌ 生成项目分类/标签页面失败: {e}")
+
     # 生成项目列表页面
     if total_projects > 0:
         try:
-            generate_project_list_page()
+            generate_project_list_page(articles, taxonomy_index)
         except Exception as e:
             print(f"❌ 生成项目列表页面失败: {e}")
 
@@ -245,7 +166,24 @@ def generate_all_project_pages():
     """生成所有项目详细页面（兼容旧接口）"""
     return scan_and_generate_projects()
 
-def generate_project_list_page():
+def generate_project_taxonomy_pages(articles=None):
+    """生成项目的分类/标签页面，返回分类法索引"""
+    frame_config = load_frame_config('project')
+    result = generate_taxonomy_pages(
+        'project',
+        get_all_projects(articles),
+        'sections/project/all_project_page.html',
+        'projects',
+        'total_projects',
+        frame_config
+    )
+
+    index = result['index']
+    print(f"🏷️ 项目分类/标签页面: {len(index['category'])} 个分类，{len(index['tag'])} 个标签，"
+          f"重写 {result['written']} 页，未变化 {result['unchanged']} 页，删除 {result['removed']} 页")
+    return index
+
+def generate_project_list_page(articles=None, taxonomy_index=None):
     """生成项目列表页面（显示所有项目）"""
     print("🏗️ 开始生成项目列表页面...")
 
@@ -253,22 +191,14 @@ def generate_project_list_page():
     env = setup_template_env()
 
     # 加载框架配置
-    root_dir = Path(__file__).parent.parent.parent.parent
-    frame_file = root_dir / "data" / "project" / "frame.json"
-    frame_config = load_json_file(frame_file)
+    frame_config = load_frame_config('project')
 
-    if not frame_config:
+    if not frame_config.nav_title:
         print("❌ 无法加载项目框架配置")
         return
 
-    # 获取所有项目
-    projects = get_all_projects()
-
-    # 为项目列表页面调整图片路径（移除./前缀）
-    for project in projects:
-        if project.get('image') and not project['image'].startswith('http'):
-            if project['image'].startswith('./'):
-                project['image'] = project['image'][2:]  # 移除 ./
+    # 获取所有项目（列表页面视图）
+    projects = [card.view('list') for card in get_all_projects(articles)]
 
     if not projects:
         print("⚠️ 没有项目数据")
@@ -278,50 +208,73 @@ def generate_project_list_page():
 
     # 生成HTML
     html_content = template.render(
-        frame=frame_config,
+        page_title=frame_config.page_title,
+        chrome=render_section_chrome('project', frame_config),
         projects=projects,
-        total_projects=len(projects)
+        total_projects=len(projects),
+        taxonomy_terms=get_term_links('project', taxonomy_index, 'category') if taxonomy_index else []
     )
 
     # 保存文件
-    output_dir = root_dir / "html" / "project"
+    output_dir = html_path("project")
     output_dir.mkdir(parents=True, exist_ok=True)
 
     output_file = output_dir / "index.html"
-    output_file.write_text(html_content, encoding='utf-8')
+    write_html(output_file, html_content)
 
     print(f"✅ 生成项目列表页面: {output_file} ({len(projects)}个项目)")
     print("📊 项目列表页面生成完成！")
 
-def generate_projects_preview_html():
-    """生成项目预览区域HTML - 供外部调用的接口"""
-    # 设置模板环境
-    env = setup_template_env()
+def generate_project_preview_shards(overflow_cards, shard_size=PREVIEW_SHARD_SIZE):
+    """把主页预览之外的项目卡片写成小的 HTML 分片，供主页按需加载，返回分片地址"""
+    output_dir = html_path("project")
 
-    # 读取项目配置数据
-    root_dir = Path(__file__).parent.parent.parent.parent
-    title_file = root_dir / "data" / "project" / "title.json"
-    title_data = load_json_file(title_file)
+    # 清理旧分片，避免数量变少后残留
+    for old_shard in output_dir.glob("preview-more-*.html"):
+        old_shard.unlink()
 
-    # 获取所有项目
-    all_projects = get_all_projects()
+    shard_urls = []
+    for start in range(0, len(overflow_cards), shard_size):
+        shard_cards = overflow_cards[start:start + shard_size]
+        shard_html = "\n".join(generate_card_html(card, 'home') for card in shard_cards)
 
-    # 限制预览数量（类似博客的3篇）
-    preview_projects = all_projects[:3]
+        shard_name = f"preview-more-{len(shard_urls) + 1}.html"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        write_html(output_dir / shard_name, shard_html)
+        shard_urls.append(f"project/{shard_name}")
 
-    # 为主页预览调整图片路径
-    for project in preview_projects:
-        if project.get('image') and not project['image'].startswith('http'):
-            if project['image'].startswith('./'):
-                image_name = project['image'][2:]  # 移除 ./
-                project['image'] = f"project/{project['project_path']}/{image_name}"
+    return shard_urls
 
-    template = env.get_template('home/project_preview.html')
-    return template.render(
+def generate_projects_preview_html(articles=None):
+    """生成项目预览区域HTML - 供外部调用的接口"""
+    # 读取项目配置数据
+    title_file = data_path("project", "title.json")
+    title_data = load_json_file(title_file)
+
+    # 获取所有项目
+    all_projects = get_all_projects(articles)
+
+    # 限制预览数量（默认3篇），使用主页视图；其余卡片写入分片按需加载
+    preview_count = title_data.get('preview_count', PREVIEW_COUNT) if title_data else PREVIEW_COUNT
+    preview_cards = all_projects[:preview_count]
+    preview_projects = [card.view('home') for card in preview_cards]
+    shard_urls = generate_project_preview_shards(all_projects[preview_count:])
+
+    # 每张卡片只渲染一次，桌面端和移动端布局共用
+    cards_html = [
+        generate_card_html(card, 'home', delay=index * 200)
+        for index, card in enumerate(preview_cards, start=1)
+    ]
+
+    return render_fragment(
+        'home/project_preview.html',
+        url_base='home',
         title=title_data.get('title', '项目经历') if title_data else '项目经历',
         projects=preview_projects,
+        cards_html=cards_html,
+        shard_urls=shard_urls,
         total_count=len(all_projects),
-        has_more=len(all_projects) > 3
+        has_more=len(all_projects) > preview_count
     )
 
 def scan_and_generate_projects_and_home():
@@ -3,27 +3,25 @@
 """
 简历页面生成器
 生成独立的简历页面，包含PDF预览和下载功能
+预览使用构建时渲染的前几页缩略图，完整 PDF 在用户点击后才加载
 """
 
-from pathlib import Path
 import shutil
-from jinja2 import Environment, FileSystemLoader
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
+from scripts.common.assets import store_asset
+from scripts.common.config import setup_template_env
+from scripts.common.output import write_html
+from scripts.common.pdf import format_pdf_date, get_pdf_info
+from scripts.common.site import data_path, html_path
+
+# 预览缩略图默认页数（frame.json 中用 preview_pages 设置）
+DEFAULT_PREVIEW_PAGES = 1
 
 def load_resume_config():
     """加载简历页面配置"""
     from scripts.common.config import load_frame_config
 
-    # 加载简历页面框架配置
-    frame_config = load_frame_config('resume')
+    # 加载简历页面框架配置（导出为渲染用字典）
+    frame_config = load_frame_config('resume').as_dict()
 
     # 确保PDF路径正确
     if 'pdf_path' not in frame_config:
@@ -31,13 +29,36 @@ def load_resume_config():
 
     return frame_config
 
-def generate_resume_page_html():
-    """生成简历页面HTML"""
+def build_resume_preview(config):
+    """
+    提取简历 PDF 的页数、文档信息和缩略图，缩略图放入内容寻址存储
+
+    Returns:
+        dict: {'page_count', 'updated', 'author', 'pages': [{'url', 'width', 'height'}]}，PDF 不存在时返回 None
+    """
+    info = get_pdf_info(data_path("resume", config['pdf_path']), config.get('preview_pages', DEFAULT_PREVIEW_PAGES))
+    if info is None:
+        return None
+
+    metadata = info['metadata']
+    return {
+        'page_count': info['page_count'],
+        'updated': format_pdf_date(metadata.get('modified') or metadata.get('created')),
+        'author': metadata.get('author', ''),
+        'pages': [
+            {'url': f"../{store_asset(page['file'])}", 'width': page['width'], 'height': page['height']}
+            for page in info['pages']
+        ],
+    }
+
+def generate_resume_page_html(preview=None):
+    """生成简历页面HTML（preview 为 build_resume_preview 的结果）"""
     # 设置模板环境
     env = setup_template_env()
 
     # 加载配置
     config = load_resume_config()
+    config['preview'] = preview
 
     # 生成各部分HTML
     nav_html = generate_resume_nav_html(env, config)
@@ -100,23 +121,23 @@ def generate_resume_footer_html(env, config):
 
 def generate_resume_page():
     """生成简历页面并保存到文件"""
-    root_dir = Path(__file__).parent.parent.parent.parent
-    
-    # 生成HTML内容
-    html_content = generate_resume_page_html()
+    # 生成HTML内容（先提取 PDF 缩略图和页数）
+    preview = build_resume_preview(load_resume_config())
+    html_content = generate_resume_page_html(preview)
 
     # 保存到文件 - 生成到 html/resume/index.html
-    output_dir = root_dir / "html" / "resume"
+    output_dir = html_path("resume")
     output_file = output_dir / "index.html"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_html(output_file, html_content)
 
     print(f"简历页面 HTML 已生成: {output_file}")
+    if preview and not preview['pages']:
+        print("ℹ️ 未安装 PyMuPDF 或 pdftoppm，简历预览不显示缩略图")
     
     # 复制PDF文件到html/resume/目录
-    pdf_source = root_dir / "data" / "resume" / "resume.pdf"
+    pdf_source = data_path("resume", "resume.pdf")
     pdf_target = output_dir / "resume.pdf"
     
     if pdf_source.exists():
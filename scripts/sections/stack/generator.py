@@ -5,27 +5,9 @@ Stack 技术栈模块生成器
 生成主页技术栈预览
 """
 
-from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-import json
-
-def setup_template_env():
-    """设置 Jinja2 模板环境"""
-    template_dir = Path(__file__).parent.parent.parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
-
-def load_json_file(file_path):
-    """加载 JSON 文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"加载 {file_path} 失败: {e}")
-        return None
+from scripts.common.config import load_json_file
+from scripts.common.fragments import render_fragment
+from scripts.common.site import data_path
 
 def get_tech_icon(tech_name):
     """智能识别技术图标"""
@@ -110,13 +92,9 @@ def get_tech_icon(tech_name):
 
 def generate_stack_preview_html():
     """生成技术栈预览区域HTML"""
-    # 设置模板环境
-    env = setup_template_env()
-
     # 读取配置
-    root_dir = Path(__file__).parent.parent.parent.parent
-    title_file = root_dir / "data" / "stack" / "title.json"
-    stack_file = root_dir / "data" / "stack" / "stack.json"
+    title_file = data_path("stack", "title.json")
+    stack_file = data_path("stack", "stack.json")
 
     title_config = load_json_file(title_file)
     stack_data = load_json_file(stack_file)
@@ -130,8 +108,9 @@ def generate_stack_preview_html():
     for tech_name in stack_data.keys():
         icon_map[tech_name] = get_tech_icon(tech_name)
 
-    template = env.get_template('home/stack_preview.html')
-    return template.render(
+    return render_fragment(
+        'home/stack_preview.html',
+        url_base='home',
         title=title_config.get('title', '技术栈'),
         subtitle=title_config.get('subtitle', '技术栈介绍'),
         stack_data=stack_data,
@@ -0,0 +1,139 @@
+// 由 python gen.py 根据输出文件生成，请勿手工修改
+{% if enabled %}
+// 整体修订号：预缓存的文件变化时随之变化，浏览器据此安装新版本
+const REVISION = "{{ revision }}";
+const PRECACHE = "precache";
+const RUNTIME = "pages";
+const RUNTIME_MAX_ENTRIES = 50;
+const OFFLINE_FALLBACK = "home.html";
+
+// [相对站点根目录的路径, 内容修订号]
+const PRECACHE_ENTRIES = {{ entries|tojson }};
+
+const SCOPE = self.registration.scope;
+const toUrl = (path) => new URL(path, SCOPE).href;
+const REVISIONS = new Map(PRECACHE_ENTRIES.map(([path, revision]) => [toUrl(path), revision]));
+
+// 缓存的响应带上修订号，安装新版本时只重新下载修订号变化的文件
+async function withRevision(response, revision) {
+    const headers = new Headers(response.headers);
+    headers.delete("Content-Encoding");
+    headers.delete("Content-Length");
+    headers.set("X-Precache-Revision", revision);
+    return new Response(await response.blob(), {
+        status: response.status,
+        statusText: response.statusText,
+        headers
+    });
+}
+
+self.addEventListener("install", (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        await Promise.all([...REVISIONS].map(async ([url, revision]) => {
+            const cached = await cache.match(url);
+            if (cached && cached.headers.get("X-Precache-Revision") === revision) {
+                return;
+            }
+            const response = await fetch(url, { cache: "no-cache" });
+            if (!response.ok) {
+                throw new Error(`预缓存失败 ${url}: ${response.status}`);
+            }
+            await cache.put(url, await withRevision(response, revision));
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener("activate", (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        for (const request of await cache.keys()) {
+            if (!REVISIONS.has(request.url)) {
+                await cache.delete(request);
+            }
+        }
+        for (const name of await caches.keys()) {
+            if (name !== PRECACHE && name !== RUNTIME) {
+                await caches.delete(name);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+async function trimRuntimeCache(cache) {
+    const keys = await cache.keys();
+    for (const request of keys.slice(0, Math.max(0, keys.length - RUNTIME_MAX_ENTRIES))) {
+        await cache.delete(request);
+    }
+}
+
+// 页面：先返回缓存，同时在后台向服务器重新验证并更新缓存
+async function staleWhileRevalidate(event, url) {
+    const cached = await caches.match(url);
+    const network = fetch(event.request).then(async (response) => {
+        if (response.ok && response.type === "basic" && !response.redirected) {
+            if (REVISIONS.has(url)) {
+                const cache = await caches.open(PRECACHE);
+                await cache.put(url, await withRevision(response.clone(), REVISIONS.get(url)));
+            } else {
+                const cache = await caches.open(RUNTIME);
+                await cache.put(url, response.clone());
+                await trimRuntimeCache(cache);
+            }
+        }
+        return response;
+    });
+
+    if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+    }
+    try {
+        return await network;
+    } catch (error) {
+        const fallback = event.request.mode === "navigate" ? await caches.match(toUrl(OFFLINE_FALLBACK)) : null;
+        return fallback || Response.error();
+    }
+}
+
+// 带内容哈希的资源：内容不会变化，直接使用缓存
+async function cacheFirst(event, url) {
+    return (await caches.match(url)) || fetch(event.request);
+}
+
+self.addEventListener("fetch", (event) => {
+    const request = event.request;
+    if (request.method !== "GET") {
+        return;
+    }
+    const url = new URL(request.url);
+    url.search = "";
+    url.hash = "";
+    if (url.origin !== self.location.origin || !url.href.startsWith(SCOPE)) {
+        return;
+    }
+    if (url.pathname.endsWith("/")) {
+        url.pathname += url.href === SCOPE ? "home.html" : "index.html";
+    }
+
+    if (request.mode === "navigate" || url.pathname.endsWith(".html")) {
+        event.respondWith(staleWhileRevalidate(event, url.href));
+    } else if (REVISIONS.has(url.href)) {
+        event.respondWith(cacheFirst(event, url.href));
+    }
+});
+{% else %}
+// Service Worker 已关闭：清空缓存并注销，之后的请求直接访问服务器
+self.addEventListener("install", () => self.skipWaiting());
+
+self.addEventListener("activate", (event) => {
+    event.waitUntil((async () => {
+        for (const name of await caches.keys()) {
+            await caches.delete(name);
+        }
+        await self.registration.unregister();
+    })());
+});
+{% endif %}